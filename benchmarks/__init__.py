@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""benchmarks.
+
+Performance benchmarks for Narmer. Run them with:
+
+    $ python -m benchmarks --output results.json
+
+and compare two runs with:
+
+    $ python -m benchmarks --compare old.json new.json
+"""
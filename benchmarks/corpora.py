@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""benchmarks.corpora.
+
+Reproducible corpora of German words for benchmarking:
+
+    - short -- random words of 2 to 6 letters
+    - long -- random compounds of 15 to 40 letters
+    - pathological -- words that stress the longest & most context-dependent
+      rules, unmatched characters, and combining marks
+    - realistic -- Zipf-distributed surnames & place names, with variants
+
+Each corpus is a function of the number of words & a seed.
+"""
+
+from __future__ import unicode_literals
+
+import random
+from collections import OrderedDict
+
+from six.moves import range
+
+# letters, weighted roughly by their frequency in German text
+_LETTERS = ('e' * 17 + 'n' * 10 + 'i' * 8 + 's' * 7 + 'r' * 7 + 'a' * 6 +
+            't' * 6 + 'd' * 5 + 'h' * 5 + 'u' * 4 + 'l' * 3 + 'c' * 3 +
+            'g' * 3 + 'm' * 3 + 'o' * 3 + 'b' * 2 + 'w' * 2 + 'f' * 2 +
+            'k' + 'z' + 'p' + 'v' + 'ü' + 'ä' + 'ö' + 'ß' + 'j' + 'y' + 'x' +
+            'q')
+
+_SYLLABLES = ('sch', 'ein', 'ung', 'ach', 'ich', 'tsch', 'ber', 'ger',
+              'stein', 'burg', 'haus', 'bach', 'tion', 'lich', 'keit', 'heit',
+              'quel', 'pf', 'chs', 'nk', 'ieh', 'äu', 'eu', 'ck', 'tz', 'dt',
+              'ph', 'th', 'ss', 'ah', 'oh', 'üh')
+
+_PATHOLOGICAL = ('TZSCH' * 8, 'SCH' * 12, 'TIELL' * 6, 'QUQUQUA' * 3,
+                 'IEHIEHIEH' * 3, 'CHSCHENCHS' * 3, '1848-1918 --/\'"',
+                 'ü' * 16, 'ÂÊÎÔÛ' * 4, 'Ssssssssssssssss',
+                 'A' * 40, 'DSCHDSCHDSCH' * 3, 'HHHHHHHHHHHHHHHH')
+
+_NAMES = ('Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer',
+          'Wagner', 'Becker', 'Schulz', 'Hoffmann', 'Schäfer', 'Koch',
+          'Bauer', 'Richter', 'Klein', 'Wolf', 'Schröder', 'Neumann',
+          'Schwarz', 'Zimmermann', 'Braun', 'Krüger', 'Hofmann', 'Hartmann',
+          'Lange', 'Schmitt', 'Werner', 'Schmitz', 'Krause', 'Meier',
+          'Lehmann', 'Schmid', 'Schulze', 'Maier', 'Köhler', 'Herrmann',
+          'König', 'Walter', 'Mayer', 'Huber', 'Kaiser', 'Fuchs', 'Peters',
+          'Lang', 'Scholz', 'Möller', 'Weiß', 'Jung', 'Hahn', 'Schubert',
+          'Vogel', 'Friedrich', 'Keller', 'Günther', 'Frank', 'Berger',
+          'Winkler', 'Roth', 'Beck', 'Lorenz', 'Baumann', 'Franke', 'Albrecht',
+          'Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt', 'Stuttgart',
+          'Düsseldorf', 'Leipzig', 'Dortmund', 'Essen', 'Bremen', 'Dresden',
+          'Hannover', 'Nürnberg', 'Duisburg', 'Bochum', 'Wuppertal',
+          'Bielefeld', 'Bonn', 'Münster', 'Mannheim', 'Karlsruhe',
+          'Augsburg', 'Wiesbaden', 'Mönchengladbach', 'Gelsenkirchen',
+          'Aachen', 'Braunschweig', 'Chemnitz', 'Kiel', 'Halle', 'Magdeburg',
+          'Freiburg', 'Krefeld', 'Mainz', 'Lübeck', 'Erfurt', 'Oberhausen',
+          'Rostock', 'Kassel', 'Hagen', 'Potsdam', 'Saarbrücken', 'Hamm',
+          'Ludwigshafen', 'Oldenburg', 'Mülheim', 'Osnabrück', 'Leverkusen',
+          'Heidelberg', 'Darmstadt', 'Solingen', 'Regensburg', 'Herne',
+          'Paderborn', 'Neuss', 'Ingolstadt', 'Offenbach', 'Fürth', 'Ulm',
+          'Heilbronn', 'Pforzheim', 'Würzburg', 'Wolfsburg', 'Göttingen',
+          'Bottrop', 'Reutlingen', 'Erlangen', 'Bremerhaven', 'Koblenz',
+          'Bergisch Gladbach', 'Remscheid', 'Trier', 'Recklinghausen',
+          'Jena', 'Moers', 'Salzgitter', 'Siegen', 'Gütersloh', 'Hildesheim',
+          'Hanau', 'Kaiserslautern', 'Nietzsche', 'Tschechien')
+
+
+def short_words(count, seed=0):
+    """Return random words of 2 to 6 letters.
+
+    :param int count: the number of words
+    :param int seed: the random seed
+    :returns: the words
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    return [''.join(rng.choice(_LETTERS) for _ in range(rng.randint(2, 6)))
+            for _ in range(count)]
+
+
+def long_words(count, seed=0):
+    """Return random compounds of 15 to 40 letters.
+
+    :param int count: the number of words
+    :param int seed: the random seed
+    :returns: the words
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    words = []
+    for _ in range(count):
+        length = rng.randint(15, 40)
+        word = ''
+        while len(word) < length:
+            if rng.random() < 0.5:
+                word += rng.choice(_SYLLABLES)
+            else:
+                word += rng.choice(_LETTERS)
+        words.append(word[:length].capitalize())
+    return words
+
+
+def pathological_words(count, seed=0):
+    """Return words that stress the rule engine.
+
+    :param int count: the number of words
+    :param int seed: the random seed
+    :returns: the words
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    return [rng.choice(_PATHOLOGICAL) for _ in range(count)]
+
+
+def realistic_words(count, seed=0):
+    """Return Zipf-distributed surnames & place names, with variants.
+
+    About one word in ten is a spelling variant of a name, as produced by
+    case changes & common substitutions.
+
+    :param int count: the number of words
+    :param int seed: the random seed
+    :returns: the words
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(_NAMES) + 1)]
+    total = sum(weights)
+    cumulative = []
+    running = 0
+    for weight in weights:
+        running += weight / total
+        cumulative.append(running)
+
+    words = []
+    for _ in range(count):
+        point = rng.random()
+        index = next((i for i, bound in enumerate(cumulative)
+                      if point <= bound), len(_NAMES) - 1)
+        word = _NAMES[index]
+        if rng.random() < 0.1:
+            word = rng.choice((word.upper(), word.lower(),
+                               word.replace('ü', 'ue').replace('ö', 'oe'),
+                               word.replace('ei', 'ey'),
+                               word.replace('ß', 'ss')))
+        words.append(word)
+    return words
+
+
+CORPORA = OrderedDict((('short', short_words),
+                       ('long', long_words),
+                       ('pathological', pathological_words),
+                       ('realistic', realistic_words)))
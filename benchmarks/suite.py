@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""benchmarks.suite.
+
+The benchmark suite times:
+
+    - each period function (nhg_ipa, enhg_ipa, mhg_ipa, ohg_ipa) and
+      german_ipa dispatch, on each corpus of benchmarks.corpora
+    - narmer.stats.weissman, on the general case & each of its special cases
+    - loading each period's compiled rule table from a rule artifact, as on
+      a cold start (reading the artifact included), against compiling it
+      from its rules
+
+Each benchmark makes repeat timed passes over its inputs and records the
+minimum & median time per item, and the items per second of the fastest
+pass. The transcription cache is disabled throughout, so every call does the
+full work.
+
+Results are saved as JSON, together with the commit, Python version &
+platform they were measured on, so that runs can be compared over time.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from timeit import default_timer
+
+from narmer.phonetic import _PERIOD_RULES, _compile_rules, _load_compiled, \
+    _read_rule_artifact, build_rule_artifact, disable_cache, enable_cache, \
+    enhg_ipa, german_ipa, get_cache, mhg_ipa, nhg_ipa, ohg_ipa
+from narmer.stats import weissman
+
+from six.moves import range
+
+from .corpora import CORPORA
+
+_PERIOD_FUNCTIONS = OrderedDict((('nhg', nhg_ipa), ('enhg', enhg_ipa),
+                                 ('mhg', mhg_ipa), ('ohg', ohg_ipa)))
+
+
+def _time_passes(func, items, repeat):
+    """Time repeated passes of func over items.
+
+    :param function func: a function of one argument
+    :param list items: the arguments
+    :param int repeat: the number of passes
+    :returns: the benchmark record
+    :rtype: dict
+    """
+    times = []
+    for _ in range(repeat):
+        start = default_timer()
+        for item in items:
+            func(item)
+        times.append((default_timer() - start) / len(items))
+    times.sort()
+    return OrderedDict((('items', len(items)),
+                        ('repeat', repeat),
+                        ('min_s', times[0]),
+                        ('median_s', times[len(times) // 2]),
+                        ('items_per_s', 1 / times[0] if times[0] else None)))
+
+
+def _weissman_cases(count, seed=0):
+    """Return argument tuples for weissman.
+
+    :param int count: the number of tuples per case
+    :param int seed: the random seed
+    :returns: the cases, by name
+    :rtype: OrderedDict
+    """
+    rng = random.Random(seed)
+    general = [(rng.uniform(1, 10), rng.uniform(0.01, 100),
+                rng.uniform(1, 10), rng.uniform(0.01, 100))
+               for _ in range(count)]
+    return OrderedDict((
+        ('general', general),
+        ('equal_times', [(r_tar, t_src, r_src, t_src)
+                         for r_tar, _, r_src, t_src in general]),
+        ('unit_target_time', [(r_tar, 1, r_src, t_src)
+                              for r_tar, _, r_src, t_src in general]),
+        ('equal_ratios', [(r_src, t_tar, r_src, t_src)
+                          for _, t_tar, r_src, t_src in general])))
+
+
+def bench_phonetic(size=2000, repeat=5, seed=0):
+    """Benchmark the period functions & german_ipa dispatch.
+
+    :param int size: the number of words per corpus
+    :param int repeat: the number of passes per benchmark
+    :param int seed: the corpus seed
+    :returns: the benchmark records, by name
+    :rtype: OrderedDict
+    """
+    results = OrderedDict()
+    for corpus, generate in CORPORA.items():
+        words = generate(size, seed)
+        for period, func in _PERIOD_FUNCTIONS.items():
+            results['phonetic.{}_ipa.{}'.format(period, corpus)] = \
+                _time_passes(func, words, repeat)
+            results['phonetic.german_ipa.{}.{}'.format(period, corpus)] = \
+                _time_passes(lambda word, p=period: german_ipa(word, p),
+                             words, repeat)
+    return results
+
+
+def bench_stats(size=10000, repeat=5, seed=0):
+    """Benchmark narmer.stats.weissman.
+
+    :param int size: the number of argument tuples per case
+    :param int repeat: the number of passes per benchmark
+    :param int seed: the argument seed
+    :returns: the benchmark records, by name
+    :rtype: OrderedDict
+    """
+    results = OrderedDict()
+    for case, args in _weissman_cases(size, seed).items():
+        results['stats.weissman.' + case] = \
+            _time_passes(lambda arg: weissman(*arg), args, repeat)
+    return results
+
+
+def bench_rules(size=200, repeat=5):
+    """Benchmark loading compiled rule tables against compiling them.
+
+    Each load reads the artifact, as a new process does, and loads one
+    period's table from it.
+
+    :param int size: the number of loads or compilations per pass
+    :param int repeat: the number of passes per benchmark
+    :returns: the benchmark records, by name
+    :rtype: OrderedDict
+    """
+    results = OrderedDict()
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = build_rule_artifact(os.path.join(tmpdir, 'rules.bin'))
+        for period in _PERIOD_FUNCTIONS:
+            results['rules.compile.' + period] = _time_passes(
+                lambda _, rules=_PERIOD_RULES[period][0]:
+                _compile_rules(rules), range(size), repeat)
+            results['rules.load.' + period] = _time_passes(
+                lambda _, period=period:
+                _load_compiled(period, _read_rule_artifact(path)),
+                range(size), repeat)
+    finally:
+        shutil.rmtree(tmpdir)
+    return results
+
+
+def _commit():
+    """Return the current git commit, if any.
+
+    :returns: the commit hash, or None
+    :rtype: str
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.STDOUT).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(size=2000, repeat=5, seed=0):
+    """Run the benchmark suite.
+
+    :param int size: the number of words per corpus (weissman uses five
+        times as many argument tuples, and the rule tables a tenth as many
+        loads & compilations)
+    :param int repeat: the number of passes per benchmark
+    :param int seed: the corpus seed
+    :returns: the metadata & benchmark records
+    :rtype: OrderedDict
+    """
+    cache = get_cache()
+    disable_cache()
+    try:
+        benchmarks = bench_phonetic(size, repeat, seed)
+        benchmarks.update(bench_stats(size * 5, repeat, seed))
+        benchmarks.update(bench_rules(max(size // 10, 1), repeat))
+    finally:
+        if cache is not None:
+            enable_cache(cache=cache)
+
+    meta = OrderedDict((
+        ('commit', _commit()),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+        ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+        ('size', size),
+        ('repeat', repeat),
+        ('seed', seed)))
+    return OrderedDict((('meta', meta), ('benchmarks', benchmarks)))
+
+
+def compare(old, new):
+    """Compare two sets of benchmark results.
+
+    :param dict old: the baseline results, as returned by run
+    :param dict new: the results to compare against the baseline
+    :returns: the report lines, giving the ratio of new to old time per item
+        for each benchmark present in both
+    :rtype: list
+    """
+    lines = ['{:<40} {:>12} {:>12} {:>7}'.format('benchmark', 'old (us)',
+                                                 'new (us)', 'ratio')]
+    for name, record in new['benchmarks'].items():
+        if name not in old['benchmarks']:
+            continue
+        before = old['benchmarks'][name]['min_s']
+        after = record['min_s']
+        lines.append('{:<40} {:>12.3f} {:>12.3f} {:>7.2f}'.format(
+            name, before * 1e6, after * 1e6,
+            after / before if before else float('inf')))
+    return lines
+
+
+def _load(path):
+    """Load benchmark results from a JSON file.
+
+    :param str path: the file path
+    :returns: the results
+    :rtype: dict
+    """
+    with io.open(path, 'r', encoding='utf-8') as resultfile:
+        return json.load(resultfile, object_pairs_hook=OrderedDict)
+
+
+def main(argv=None):
+    """Run the benchmark suite from the command line.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark the narmer transcribers & stats functions.')
+    parser.add_argument('-o', '--output',
+                        help='JSON file to save the results to')
+    parser.add_argument('-n', '--size', type=int, default=2000,
+                        help='words per corpus (default: 2000)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='timed passes per benchmark (default: 5)')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='corpus seed (default: 0)')
+    parser.add_argument('--quick', action='store_true',
+                        help='use 200 words & 3 passes, for a smoke test')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two saved results & exit')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print('\n'.join(compare(_load(args.compare[0]),
+                                _load(args.compare[1]))))
+        return 0
+
+    if args.quick:
+        args.size, args.repeat = 200, 3
+    results = run(args.size, args.repeat, args.seed)
+    for name, record in results['benchmarks'].items():
+        print('{:<40} {:>10.3f} us {:>12.0f} /s'.format(
+            name, record['min_s'] * 1e6, record['items_per_s'] or 0))
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as resultfile:
+            resultfile.write(json.dumps(results, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,4 +24,72 @@ This library contains code I'm using for research, in particular dissertation
 research & experimentation.
 
 Further documentation to come...
+
+The most commonly used functions & classes of the submodules are available
+as attributes of the package, e.g. narmer.german_ipa & narmer.weissman. Each
+submodule is imported only when one of its attributes is first used, so
+importing narmer itself is nearly free.
 """
+
+import sys
+from importlib import import_module
+
+# attribute: the submodule that defines it
+_LAZY_ATTRIBUTES = {}
+for _module, _names in (
+        ('phonetic', ('german_ipa', 'german_ipa_many', 'german_ipa_column',
+                      'german_ipa_periods', 'german_ipa_periods_many',
+                      'german_ipa_tokens', 'german_ipa_text', 'nhg_ipa',
+                      'enhg_ipa', 'mhg_ipa', 'ohg_ipa', 'ipa_phonemes',
+                      'ipa_encode', 'ipa_decode', 'phoneme_inventory',
+                      'IncrementalTranscriber', 'IPACache', 'RuleProfile',
+                      'enable_cache', 'disable_cache', 'get_cache')),
+        ('stats', ('weissman', 'weissman_bootstrap', 'compression_benchmark',
+                   'compression_table', 'RunningStats', 'QuantileSketch')),
+        ('clusters', ('ipa_clusters', 'Cluster')),
+        ('distance', ('levenshtein', 'phonetic_distance',
+                      'phonetic_distance_many', 'BKTree')),
+        ('lexicon', ('build_lexicon', 'Lexicon')),
+        ('lsh', ('MinHash', 'LSHIndex', 'near_duplicates')),
+        ('sharedcache', ('SharedIPACache',))):
+    for _name in _names:
+        _LAZY_ATTRIBUTES[_name] = _module
+del _module, _names, _name
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    """Import & return a lazily loaded attribute.
+
+    :param str name: the attribute name
+    :returns: the attribute
+    :raises AttributeError: if there is no such attribute
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(
+            __name__, name))
+    value = getattr(import_module('.' + _LAZY_ATTRIBUTES[name], __name__),
+                    name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Return the attributes of the package, including lazy ones.
+
+    :returns: the attribute names
+    :rtype: list
+    """
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module __getattr__ (PEP 562) is unavailable, so import eagerly, except
+    # for modules whose optional dependencies are missing
+    for _name in __all__:
+        try:
+            __getattr__(_name)
+        except ImportError:
+            pass
+    del _name  # pylint: disable=undefined-loop-variable
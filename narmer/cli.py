@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.cli.
+
+The cli module implements the narmer-ipa command, which transcribes German
+words, one per line, read from files or stdin:
+
+    $ narmer-ipa --period mhg words.txt > words.tsv
+
+Input is processed one line at a time and output is written in batches, so
+memory use is constant regardless of the size of the input. Repeated words,
+in any of the input files, are served from a bounded LRU cache.
+
+It is also the entry point of the narmer-server command (see narmer.server),
+which it checks can run on this version of Python before importing it.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import io
+import json
+import sys
+
+from .phonetic import IPACache, _period_function
+
+_FORMATS = ('tsv', 'jsonl')
+
+
+def _open_input(path, encoding):
+    """Open an input file, or stdin for '-'.
+
+    :param str path: the file path, or '-' for stdin
+    :param str encoding: the input encoding
+    :returns: a text file object
+    :rtype: file
+    """
+    if path == '-':
+        return io.open(sys.stdin.fileno(), 'r', encoding=encoding,
+                       closefd=False)
+    return io.open(path, 'r', encoding=encoding)
+
+
+def _open_output(path, encoding, buffer_size):
+    """Open an output file, or stdout for '-'.
+
+    :param str path: the file path, or '-' for stdout
+    :param str encoding: the output encoding
+    :param int buffer_size: the size of the output buffer, in bytes
+    :returns: a text file object
+    :rtype: file
+    """
+    if path == '-':
+        return io.open(sys.stdout.fileno(), 'w', encoding=encoding,
+                       buffering=buffer_size, closefd=False)
+    return io.open(path, 'w', encoding=encoding, buffering=buffer_size)
+
+
+def _format_tsv(word, ipa):
+    """Format a word & its IPA as a tab-separated line.
+
+    :param str word: the word
+    :param str ipa: the word's IPA
+    :returns: the formatted line
+    :rtype: str
+    """
+    return word + '\t' + ipa + '\n'
+
+
+def _format_jsonl(word, ipa):
+    """Format a word & its IPA as a JSON line.
+
+    :param str word: the word
+    :param str ipa: the word's IPA
+    :returns: the formatted line
+    :rtype: str
+    """
+    return json.dumps({'word': word, 'ipa': ipa}, ensure_ascii=False) + '\n'
+
+
+def transcribe_stream(lines, out, period='nhg', fmt='tsv', batch_size=4096,
+                      cache_size=65536, cache=None):
+    """Transcribe a stream of words, one per line, and write the results.
+
+    :param iterable lines: the input lines
+    :param file out: a text file object to write to
+    :param str period: a period of German, as in german_ipa
+    :param str fmt: the output format, either tsv or jsonl
+    :param int batch_size: the number of output lines to write at a time
+    :param int cache_size: the maximum number of transcriptions to cache
+    :param IPACache cache: a cache to use, e.g. one shared by several
+        streams, in place of a new IPACache of cache_size
+    :returns: the number of words transcribed
+    :rtype: int
+    :raises ValueError: if fmt is not a supported format
+    """
+    transcribe = _period_function(period)
+    if fmt not in _FORMATS:
+        raise ValueError('Value of fmt must be one of ' + ', '.join(_FORMATS))
+    formatter = _format_tsv if fmt == 'tsv' else _format_jsonl
+    if cache is None:
+        cache = IPACache(cache_size)
+
+    count = 0
+    batch = []
+    for line in lines:
+        word = line.rstrip('\r\n')
+        ipa = cache.get(period, word)
+        if ipa is None:
+            ipa = transcribe(word)
+            cache.put(period, word, ipa)
+        batch.append(formatter(word, ipa))
+        if len(batch) >= batch_size:
+            out.write(''.join(batch))
+            del batch[:]
+        count += 1
+    out.write(''.join(batch))
+    return count
+
+
+def _parser():
+    """Return the argument parser for narmer-ipa.
+
+    :returns: the argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='narmer-ipa',
+        description='Transcribe German words, one per line, to IPA.')
+    parser.add_argument('files', nargs='*', default=['-'], metavar='FILE',
+                        help='input files (default: stdin)')
+    parser.add_argument('-p', '--period', default='nhg',
+                        choices=('nhg', 'enhg', 'mhg', 'ohg'),
+                        help='period of German (default: nhg)')
+    parser.add_argument('-f', '--format', default='tsv', choices=_FORMATS,
+                        help='output format (default: tsv)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='output file (default: stdout)')
+    parser.add_argument('--input-encoding', default='utf-8',
+                        help='input encoding (default: utf-8)')
+    parser.add_argument('--output-encoding', default='utf-8',
+                        help='output encoding (default: utf-8)')
+    parser.add_argument('--batch-size', type=int, default=4096,
+                        help='lines written per batch (default: 4096)')
+    parser.add_argument('--buffer-size', type=int, default=1 << 20,
+                        help='output buffer size in bytes (default: 1MiB)')
+    parser.add_argument('--cache-size', type=int, default=65536,
+                        help='transcriptions cached (default: 65536)')
+    return parser
+
+
+def main(argv=None):
+    """Run the narmer-ipa command.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    args = _parser().parse_args(argv)
+    # one cache serves all of the input files
+    cache = IPACache(args.cache_size)
+    out = _open_output(args.output, args.output_encoding, args.buffer_size)
+    try:
+        for path in args.files:
+            infile = _open_input(path, args.input_encoding)
+            try:
+                transcribe_stream(infile, out, args.period, args.format,
+                                  args.batch_size, cache=cache)
+            finally:
+                infile.close()
+    finally:
+        out.close()
+    return 0
+
+
+def server_main(argv=None):
+    """Run the narmer-server command, if this version of Python supports it.
+
+    narmer.server requires Python 3.7 or later, and cannot be imported on
+    earlier versions, so the version is checked first.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    if sys.version_info < (3, 7):
+        sys.stderr.write('narmer-server requires Python 3.7 or later; this '
+                         'is Python {}.{}.\n'.format(*sys.version_info[:2]))
+        return 1
+    from .server import main as run_server
+
+    return run_server(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.clusters.
+
+The clusters module groups word lists of any size by pronunciation, i.e. into
+clusters of the words that share a transcription, with their frequencies:
+
+    - ipa_clusters streams the clusters of an iterable of words
+    - the narmer-clusters command writes the clusters of a word list as JSON
+      lines:
+
+    $ narmer-clusters --memory 1024 -j 8 names.txt > clusters.jsonl
+
+Words are counted in memory until the memory budget is reached; then the
+distinct words counted so far are transcribed, optionally in parallel,
+sorted by transcription, and spilled as a run of (ipa, word, count) records
+to a temporary file. Finally, the runs are merged, in several passes if
+there are too many to merge at once, and the clusters are streamed from the
+merged records in order of transcription. Input that fits within the budget
+is never written to disk.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import heapq
+import io
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+from collections import namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+from .cli import _open_input, _open_output
+from .phonetic import _chunks, _period_function, _transcribe_chunk, \
+    german_ipa_many
+
+Cluster = namedtuple('Cluster', ('ipa', 'count', 'words'))
+
+# the approximate memory, beyond the word itself, used by each distinct word
+# while counting & spilling: its dict entry & count, its transcription, and
+# its record
+_ENTRY_SIZE = 256
+# the number of records written, & read back, at a time
+_BLOCK_SIZE = 1024
+# the greatest number of runs merged at once, which bounds open files
+_MAX_FAN_IN = 512
+
+
+def ipa_clusters(words, period='nhg', memory=256 << 20, processes=1,
+                 chunksize=10000, tmpdir=None):
+    """Return the clusters of words that share a transcription.
+
+    :param iterable words: the German words to cluster
+    :param str period: a period of German, as in german_ipa
+    :param int memory: the approximate memory budget, in bytes, of words
+        counted between spills and of runs being merged; worker processes
+        and the words of the current cluster are not included
+    :param int processes: the number of worker processes to transcribe
+        with, as in german_ipa_many; a single pool of workers transcribes
+        every run
+    :param int chunksize: the number of words sent to a worker at a time
+    :param str tmpdir: the directory in which to spill runs (default: the
+        system's temporary directory)
+    :returns: the clusters, in code point order of their transcriptions;
+        each is a Cluster of the transcription, the total count, and the
+        (word, count) pairs, in code point order of the words
+    :rtype: generator
+    :raises ValueError: if period is not a supported period or memory,
+        processes, or chunksize is not positive
+
+    >>> for cluster in ipa_clusters(['Meyer', 'Maier', 'Meier', 'Meyer']):
+    ...     print(cluster)
+    Cluster(ipa='maier', count=4, words=[('Maier', 1), ('Meier', 1), \
+('Meyer', 2)])
+    """
+    _period_function(period)
+    if memory < 1:
+        raise ValueError('memory must be a positive integer.')
+    if (processes is not None and processes < 1) or chunksize < 1:
+        raise ValueError('processes and chunksize must be positive.')
+    return _clusters(words, period.lower(), memory, processes, chunksize,
+                     tmpdir)
+
+
+def _clusters(words, period, memory, processes, chunksize, tmpdir):
+    """Yield the clusters of words, as described in ipa_clusters.
+
+    :param iterable words: the German words to cluster
+    :param str period: a (lower-case) period of German
+    :param int memory: the approximate memory budget, in bytes
+    :param int processes: the number of worker processes to transcribe with
+    :param int chunksize: the number of words sent to a worker at a time
+    :param str tmpdir: the directory in which to spill runs
+    :returns: the clusters
+    :rtype: generator
+    """
+    fan_in = max(2, min(_MAX_FAN_IN, memory // (_BLOCK_SIZE * _ENTRY_SIZE)))
+    directory = None
+    runs = []
+    pool = None
+    if processes != 1:
+        import multiprocessing
+
+        # Pool is a context manager only on Python 3
+        # pylint: disable-next=consider-using-with
+        pool = multiprocessing.Pool(processes)
+    try:
+        counts = {}
+        used = 0
+        for word in words:
+            if word in counts:
+                counts[word] += 1
+                continue
+            counts[word] = 1
+            used += sys.getsizeof(word) + _ENTRY_SIZE
+            if used >= memory:
+                if directory is None:
+                    directory = tempfile.mkdtemp(prefix='narmer-',
+                                                 dir=tmpdir)
+                runs.append(_write_run(
+                    _sorted_records(counts, period, pool, chunksize),
+                    directory))
+                counts = {}
+                used = 0
+
+        records = _sorted_records(counts, period, pool, chunksize)
+        del counts
+        if pool is not None:
+            pool.close()
+        if runs:
+            if records:
+                runs.append(_write_run(records, directory))
+            del records
+            records = _merge_runs(runs, directory, fan_in)
+
+        for ipa, group in groupby(records, itemgetter(0)):
+            cluster = [(word, count) for _, word, count in group]
+            yield Cluster(ipa, sum(count for _, count in cluster), cluster)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _sorted_records(counts, period, pool, chunksize):
+    """Transcribe counted words & return their records, sorted.
+
+    :param dict counts: the words & their counts
+    :param str period: a (lower-case) period of German
+    :param multiprocessing.pool.Pool pool: the worker processes to
+        transcribe with, or None to transcribe in this process
+    :param int chunksize: the number of words sent to a worker at a time
+    :returns: the (ipa, word, count) records, sorted
+    :rtype: list
+    """
+    if pool is None:
+        ipas = german_ipa_many(counts, period)
+    else:
+        ipas = []
+        tasks = ((period, chunk) for chunk in _chunks(counts, chunksize))
+        for chunk in pool.imap(_transcribe_chunk, tasks):
+            ipas.extend(chunk)
+    records = [(ipa, word, count)
+               for ipa, (word, count) in zip(ipas, counts.items())]
+    records.sort()
+    return records
+
+
+def _write_run(records, directory):
+    """Write sorted records to a new run file.
+
+    :param iterable records: the (ipa, word, count) records
+    :param str directory: the directory in which to create the file
+    :returns: the path of the run file
+    :rtype: str
+    """
+    handle, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with io.open(handle, 'wb') as run:
+        for block in _chunks(records, _BLOCK_SIZE):
+            marshal.dump(block, run)
+    return path
+
+
+def _read_run(path):
+    """Yield the records of a run file, a block at a time.
+
+    :param str path: the path of the run file
+    :returns: the (ipa, word, count) records
+    :rtype: generator
+    """
+    with io.open(path, 'rb') as run:
+        while True:
+            try:
+                block = marshal.load(run)
+            except EOFError:
+                return
+            for record in block:
+                yield record
+
+
+def _merge_runs(runs, directory, fan_in):
+    """Merge run files, combining the counts of repeated words.
+
+    Runs are merged fan_in at a time into new runs until at most fan_in
+    remain, which are then merged as they are read.
+
+    :param list runs: the paths of the run files
+    :param str directory: the directory in which to create new runs
+    :param int fan_in: the greatest number of runs to merge at once
+    :returns: the merged (ipa, word, count) records, sorted
+    :rtype: generator
+    """
+    while len(runs) > fan_in:
+        group, runs = runs[:fan_in], runs[fan_in:]
+        runs.append(_write_run(_merge(group), directory))
+        for path in group:
+            os.remove(path)
+    return _merge(runs)
+
+
+def _merge(runs):
+    """Merge run files as they are read, combining repeated words.
+
+    :param list runs: the paths of the run files
+    :returns: the merged (ipa, word, count) records, sorted
+    :rtype: generator
+    """
+    records = heapq.merge(*[_read_run(path) for path in runs])
+    for (ipa, word), group in groupby(records, itemgetter(0, 1)):
+        yield ipa, word, sum(record[2] for record in group)
+
+
+def main(argv=None):
+    """Run the narmer-clusters command.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog='narmer-clusters',
+        description='Group the words of a word list by pronunciation.')
+    parser.add_argument('wordlist', nargs='?', default='-',
+                        help='word list, one word per line (default: stdin)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='output file (default: stdout)')
+    parser.add_argument('-p', '--period', default='nhg',
+                        choices=('nhg', 'enhg', 'mhg', 'ohg'),
+                        help='period of German (default: nhg)')
+    parser.add_argument('-m', '--memory', type=int, default=256,
+                        help='memory budget in MiB (default: 256)')
+    parser.add_argument('-j', '--processes', type=int, default=1,
+                        help='worker processes (default: 1)')
+    parser.add_argument('--min-words', type=int, default=1,
+                        help='omit clusters of fewer distinct words '
+                        '(default: 1)')
+    parser.add_argument('--tmpdir', default=None,
+                        help='directory for temporary files')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='word list encoding (default: utf-8)')
+    args = parser.parse_args(argv)
+
+    infile = _open_input(args.wordlist, args.encoding)
+    out = _open_output(args.output, 'utf-8', 1 << 20)
+    try:
+        for cluster in ipa_clusters((line.rstrip('\r\n') for line in infile),
+                                    args.period, args.memory << 20,
+                                    args.processes, tmpdir=args.tmpdir):
+            if len(cluster.words) >= args.min_words:
+                out.write(json.dumps(cluster._asdict(), ensure_ascii=False) +
+                          '\n')
+    finally:
+        infile.close()
+        out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.distance.
+
+The distance module implements distance measures over transcriptions and
+indices for searching by them, including:
+
+    - levenshtein
+    - phonetic_distance & phonetic_distance_many
+    - BKTree
+"""
+
+from __future__ import division, unicode_literals
+
+import heapq
+import sys
+from collections import namedtuple
+
+from .phonetic import _period_function, ipa_phonemes
+
+if sys.version_info[0] < 3:  # pragma: no cover
+    from six.moves import range  # pylint: disable=redefined-builtin
+
+
+def levenshtein(src, tar):
+    """Return the Levenshtein distance between two strings.
+
+    :param str src: the source string
+    :param str tar: the target string
+    :returns: the number of insertions, deletions, and substitutions needed
+        to transform src into tar
+    :rtype: int
+
+    >>> levenshtein('kol', 'kool')
+    1
+    >>> levenshtein('ʃmit', 'ʃmidt')
+    1
+    >>> levenshtein('myller', 'miler')
+    2
+    """
+    if len(src) < len(tar):
+        src, tar = tar, src
+    if not tar:
+        return len(src)
+
+    prev = list(range(len(tar) + 1))
+    for i, src_char in enumerate(src, 1):
+        curr = [i]
+        for j, tar_char in enumerate(tar, 1):
+            curr.append(min(prev[j] + 1, curr[j - 1] + 1,
+                            prev[j - 1] + (src_char != tar_char)))
+        prev = curr
+    return prev[-1]
+
+
+# Consonant features: (place, manner, voiced), where place runs from
+# 0 (bilabial) through 6 (glottal) and manner from 0 (stop) through
+# 5 (approximant/trill).
+_CONSONANTS = {
+    'p': (0, 0, 0), 'b': (0, 0, 1), 'm': (0, 3, 1), 'w': (0, 5, 1),
+    'pf': (0.5, 1, 0), 'f': (1, 2, 0), 'v': (1, 2, 1),
+    't': (2, 0, 0), 'd': (2, 0, 1), 'ts': (2, 1, 0), 's': (2, 2, 0),
+    'z': (2, 2, 1), 'n': (2, 3, 1), 'l': (2, 4, 1), 'r': (2, 5, 1),
+    'tʃ': (3, 1, 0), 'dʒ': (3, 1, 1), 'ʃ': (3, 2, 0), 'ʒ': (3, 2, 1),
+    'ç': (4, 2, 0), 'j': (4, 5, 1),
+    'k': (5, 0, 0), 'g': (5, 0, 1), 'x': (5, 2, 0), 'ŋ': (5, 3, 1),
+    'h': (6, 2, 0),
+}
+_CONSONANT_WEIGHTS = (0.5 / 6, 0.5 / 5, 0.25)
+
+# Vowel features: (height, backness, rounded), where height runs from
+# 0 (open) to 1 (close) and backness from 0 (front) to 1 (back).
+_VOWELS = {
+    'a': (0, 0.5, 0), 'ɛ': (0.33, 0, 0), 'e': (0.67, 0, 0), 'i': (1, 0, 0),
+    'o': (0.67, 1, 1), 'u': (1, 1, 1), 'ø': (0.67, 0, 1), 'y': (1, 0, 1),
+}
+# the weights of the onset's & the offset's vowel features, which together
+# weigh as much as a monophthong's, and of the long & diphthong features
+_VOWEL_WEIGHTS = (0.25, 0.25, 0.125, 0.25, 0.25, 0.125, 0.2, 0.2)
+
+_substitution_costs = {}  # pylint: disable=invalid-name
+
+
+def _vowel_features(phoneme):
+    """Return the features of a vowel or diphthong, or None.
+
+    The features of a diphthong's onset & offset are kept apart, so that
+    e.g. ie & ei differ; a monophthong's onset & offset are the same.
+
+    :param str phoneme: the phoneme
+    :returns: (onset height, onset backness, onset rounded, offset height,
+        offset backness, offset rounded, long, diphthong)
+    :rtype: tuple
+    """
+    long_mark = phoneme.endswith('ː')
+    vowels = phoneme.rstrip('ː')
+    if not 0 < len(vowels) < 3 or \
+            any(vowel not in _VOWELS for vowel in vowels):
+        return None
+    return (_VOWELS[vowels[0]] + _VOWELS[vowels[-1]] +
+            (int(long_mark), int(len(vowels) > 1)))
+
+
+def _substitution_cost(src, tar):
+    """Return the cost of substituting one phoneme for another.
+
+    The cost is the weighted L1 distance between the phonemes' features,
+    capped at 1 (the cost of an insertion or deletion). Substitutions between
+    a vowel and a consonant, or involving an unknown phoneme, cost 1. Since
+    a capped metric is still a metric, so is phonetic_distance.
+
+    :param str src: the source phoneme
+    :param str tar: the target phoneme
+    :returns: the substitution cost
+    :rtype: float
+    """
+    if src == tar:
+        return 0
+    cost = _substitution_costs.get((src, tar))
+    if cost is None:
+        if src in _CONSONANTS and tar in _CONSONANTS:
+            src_feat, tar_feat = _CONSONANTS[src], _CONSONANTS[tar]
+            weights = _CONSONANT_WEIGHTS
+        else:
+            src_feat, tar_feat = _vowel_features(src), _vowel_features(tar)
+            weights = _VOWEL_WEIGHTS
+        if src_feat is None or tar_feat is None:
+            cost = 1
+        else:
+            cost = min(1, sum(weight * abs(src_val - tar_val)
+                              for weight, src_val, tar_val
+                              in zip(weights, src_feat, tar_feat)))
+        _substitution_costs[(src, tar)] = _substitution_costs[(tar, src)] = \
+            cost
+    return cost
+
+
+def _banded_distance(src, tar, max_distance):
+    """Return the weighted edit distance between two phoneme sequences.
+
+    Since insertions & deletions cost 1, an alignment that strays more than
+    max_distance cells from the diagonal costs more than max_distance, so
+    only a band of that width around the diagonal is computed, and the
+    computation stops as soon as every cell in a row exceeds max_distance.
+
+    :param list src: the source phonemes
+    :param list tar: the target phonemes
+    :param float max_distance: the maximum distance of interest, or None
+    :returns: the distance, or inf if it exceeds max_distance
+    :rtype: float
+    """
+    inf = float('inf')
+    src_len, tar_len = len(src), len(tar)
+    if max_distance is None:
+        band = max(src_len, tar_len)
+    elif abs(src_len - tar_len) > max_distance:
+        return inf
+    else:
+        band = int(max_distance)
+
+    prev = [col if col <= band else inf for col in range(tar_len + 1)]
+    for row in range(1, src_len + 1):
+        src_phoneme = src[row - 1]
+        low = max(1, row - band)
+        high = min(tar_len, row + band)
+        curr = [inf] * (tar_len + 1)
+        if row <= band:
+            curr[0] = row
+        for col in range(low, high + 1):
+            curr[col] = min(prev[col] + 1, curr[col - 1] + 1,
+                            prev[col - 1] +
+                            _substitution_cost(src_phoneme, tar[col - 1]))
+        if max_distance is not None and \
+                min(curr[low - 1:high + 1]) > max_distance:
+            return inf
+        prev = curr
+
+    if max_distance is not None and prev[tar_len] > max_distance:
+        return inf
+    return prev[tar_len]
+
+
+def phonetic_distance(src, tar, max_distance=None):
+    """Return the phoneme-aware weighted edit distance between transcriptions.
+
+    The transcriptions are split into phonemes with ipa_phonemes, so that
+    e.g. tʃ and aː are single units. Insertions and deletions cost 1;
+    substitutions cost between 0 and 1, according to the similarity of the
+    phonemes' articulatory features.
+
+    :param str src: the source transcription, as returned by german_ipa
+    :param str tar: the target transcription
+    :param float max_distance: if given, computation stops as soon as the
+        distance is known to exceed this bound
+    :returns: the distance, or inf if it exceeds max_distance
+    :rtype: float
+
+    >>> phonetic_distance('tʃeçin', 'tʃeçin')
+    0
+    >>> phonetic_distance('bot', 'pot')
+    0.25
+    >>> round(phonetic_distance('tʃa', 'ta'), 3)
+    0.183
+    >>> phonetic_distance('myller', 'ʃmit', max_distance=2)
+    inf
+    """
+    return _banded_distance(ipa_phonemes(src), ipa_phonemes(tar),
+                            max_distance)
+
+
+def phonetic_distance_many(src, targets, max_distance=None):
+    """Return the phonetic distances between one and many transcriptions.
+
+    The source is split into phonemes only once, and with max_distance
+    given, targets differing too much in length are rejected without any
+    dynamic programming.
+
+    :param str src: the source transcription, as returned by german_ipa
+    :param iterable targets: the target transcriptions
+    :param float max_distance: if given, distances exceeding this bound are
+        reported as inf
+    :returns: the distances, in the order of targets
+    :rtype: list
+
+    >>> phonetic_distance_many('bot', ['bot', 'pot', 'boːt', 'kartofel'], 1)
+    [0, 0.25, 0.2, inf]
+    """
+    src_phonemes = ipa_phonemes(src)
+    return [_banded_distance(src_phonemes, ipa_phonemes(tar), max_distance)
+            for tar in targets]
+
+
+SearchResult = namedtuple('SearchResult', ('matches', 'visited'))
+
+
+class BKTree(object):
+    """A Burkhard-Keller tree over the transcriptions of a word collection.
+
+    Each node holds one distinct transcription and the words that share it.
+    Searches use the triangle inequality to skip subtrees that cannot hold a
+    match, so the metric must be a true metric (e.g. levenshtein or
+    phonetic_distance).
+
+    Searches return a SearchResult, whose matches are (distance, word) pairs,
+    ordered by distance and then by word, and whose visited count is the
+    number of nodes whose distance to the query was computed.
+
+    >>> tree = BKTree(['Müller', 'Mueller', 'Miller', 'Schmidt', 'Schmitt'])
+    >>> tree.within('Möller', 1).matches
+    [(1, 'Miller'), (1, 'Müller')]
+    >>> tree.nearest('Schmid', 2).matches
+    [(1, 'Schmidt'), (2, 'Schmitt')]
+    """
+
+    def __init__(self, words=(), period='nhg', metric=levenshtein):
+        """Initialize BKTree.
+
+        :param iterable words: the initial words of the collection
+        :param str period: a period of German, as in german_ipa
+        :param function metric: the distance between two transcriptions
+        """
+        self._transcribe = _period_function(period)
+        self._metric = metric
+        # a node is [transcription, words, {distance: child node}]
+        self._root = None
+        self._nodes = 0
+        self._words = 0
+        self.update(words)
+
+    def add(self, word):
+        """Add a word to the tree.
+
+        :param str word: the word to add
+        :returns: True if the word was added, False if already present
+        :rtype: bool
+        """
+        ipa = self._transcribe(word)
+        if self._root is None:
+            self._root = [ipa, [word], {}]
+            self._nodes = self._words = 1
+            return True
+
+        node = self._root
+        while True:
+            dist = self._metric(ipa, node[0])
+            if dist == 0:
+                if word in node[1]:
+                    return False
+                node[1].append(word)
+                self._words += 1
+                return True
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [ipa, [word], {}]
+                self._nodes += 1
+                self._words += 1
+                return True
+            node = child
+
+    def update(self, words):
+        """Add words to the tree.
+
+        :param iterable words: the words to add
+        """
+        for word in words:
+            self.add(word)
+
+    def within(self, word, max_distance, transcribed=False):
+        """Return the words within a distance of word.
+
+        :param str word: the query word
+        :param float max_distance: the maximum distance of a match
+        :param bool transcribed: if True, word is a transcription already
+        :returns: the matches & the number of nodes visited
+        :rtype: SearchResult
+        """
+        ipa = word if transcribed else self._transcribe(word)
+        matches = []
+        visited = 0
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            dist = self._metric(ipa, node[0])
+            visited += 1
+            if dist <= max_distance:
+                matches.extend((dist, match) for match in node[1])
+            for edge, child in node[2].items():
+                if dist - max_distance <= edge <= dist + max_distance:
+                    stack.append(child)
+        matches.sort()
+        return SearchResult(matches, visited)
+
+    def nearest(self, word, k=1, transcribed=False):
+        """Return the k words nearest to word.
+
+        Words tied with the kth nearest at the same distance are included,
+        so more than k matches may be returned.
+
+        :param str word: the query word
+        :param int k: the number of nearest words to return
+        :param bool transcribed: if True, word is a transcription already
+        :returns: the matches & the number of nodes visited
+        :rtype: SearchResult
+        """
+        ipa = word if transcribed else self._transcribe(word)
+        best = []
+        visited = 0
+        radius = float('inf')
+        # the queue is ordered by the lower bound on the distance of any
+        # node in a subtree; the counter breaks ties without comparing nodes
+        queue = [(0, 0, self._root)] if self._root is not None else []
+        counter = 1
+        while queue:
+            bound, _, node = heapq.heappop(queue)
+            if bound > radius:
+                break
+            dist = self._metric(ipa, node[0])
+            visited += 1
+            if dist <= radius:
+                best.extend((dist, match) for match in node[1])
+                best.sort()
+                if len(best) >= k:
+                    radius = best[k - 1][0]
+                    best = [match for match in best if match[0] <= radius]
+            for edge, child in node[2].items():
+                child_bound = abs(dist - edge)
+                if child_bound <= radius:
+                    heapq.heappush(queue, (child_bound, counter, child))
+                    counter += 1
+        return SearchResult(best, visited)
+
+    def __len__(self):
+        """Return the number of words in the tree.
+
+        :returns: the number of words
+        :rtype: int
+        """
+        return self._words
+
+    @property
+    def node_count(self):
+        """Return the number of nodes (distinct transcriptions) in the tree.
+
+        :returns: the number of nodes
+        :rtype: int
+        """
+        return self._nodes
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.lexicon.
+
+The lexicon module implements prebuilt, memory-mapped transcription lexicons:
+
+    - build_lexicon writes the transcriptions of a word list to a file
+    - Lexicon looks words up in such a file, falling back to german_ipa
+
+A lexicon file consists of:
+
+    - a header: the magic bytes NARMLEX, a format version byte, the period
+      (ASCII, NUL-padded to 8 bytes), and the number of entries (uint64)
+    - the offsets of the words within the word data (count+1 uint64s)
+    - the offsets of the IPA within the IPA data (count+1 uint64s)
+    - the word data: the UTF-8 encoded words, in byte-wise sorted order
+    - the IPA data: the UTF-8 encoded transcriptions, in the same order
+
+All integers are little-endian. Opening a lexicon reads only the header; the
+rest of the file is paged in by the OS as it is searched, so the pages are
+shared among all processes that open the same file.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import io
+import mmap
+import struct
+import sys
+
+from .cli import _open_output
+from .phonetic import _period_function, german_ipa_many
+
+_MAGIC = b'NARMLEX'
+_VERSION = 1
+_HEADER = struct.Struct('<7sB8sQ')
+_OFFSET = struct.Struct('<Q')
+
+
+def build_lexicon(words, path, period='nhg', processes=1):
+    """Build a lexicon file of the transcriptions of words.
+
+    :param iterable words: the German words to include
+    :param str path: the path of the lexicon file to write
+    :param str period: a period of German, as in german_ipa
+    :param int processes: the number of worker processes to use, as in
+        german_ipa_many
+    :returns: the number of distinct words written
+    :rtype: int
+    """
+    _period_function(period)
+    keys = sorted({word.encode('utf-8') for word in words})
+    ipas = german_ipa_many((key.decode('utf-8') for key in keys), period,
+                           generator=True, processes=processes)
+    values = [ipa.encode('utf-8') for ipa in ipas]
+
+    with io.open(path, 'wb') as lexfile:
+        lexfile.write(_HEADER.pack(_MAGIC, _VERSION,
+                                   period.lower().encode('ascii'),
+                                   len(keys)))
+        for blobs in (keys, values):
+            offset = 0
+            lexfile.write(_OFFSET.pack(offset))
+            for blob in blobs:
+                offset += len(blob)
+                lexfile.write(_OFFSET.pack(offset))
+        for blobs in (keys, values):
+            for blob in blobs:
+                lexfile.write(blob)
+    return len(keys)
+
+
+class Lexicon(object):
+    """A memory-mapped transcription lexicon, as built by build_lexicon.
+
+    Lookups binary search the memory-mapped file; words not in the lexicon
+    are transcribed with the lexicon's period function.
+    """
+
+    def __init__(self, path):
+        """Initialize Lexicon.
+
+        :param str path: the path of the lexicon file
+        :raises ValueError: if the file is not a lexicon file
+        """
+        with io.open(path, 'rb') as lexfile:
+            self._map = mmap.mmap(lexfile.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError('{} is not a lexicon file.'.format(path))
+        magic, version, period, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError('{} is not a version {} lexicon file.'
+                             .format(path, _VERSION))
+
+        self.period = period.rstrip(b'\0').decode('ascii')
+        self._transcribe = _period_function(self.period)
+        self._count = count
+        self._word_offsets = _HEADER.size
+        self._ipa_offsets = self._word_offsets + (count + 1) * _OFFSET.size
+        self._words = self._ipa_offsets + (count + 1) * _OFFSET.size
+        self._ipas = self._words + self._offset(self._word_offsets, count)
+
+    def _offset(self, table, index):
+        """Return an entry from one of the offset tables.
+
+        :param int table: the position of the offset table in the file
+        :param int index: the index of the entry
+        :returns: the offset
+        :rtype: int
+        """
+        return _OFFSET.unpack_from(self._map, table + index * _OFFSET.size)[0]
+
+    def _entry(self, table, data, index):
+        """Return the bytes of one word or IPA entry.
+
+        :param int table: the position of the offset table in the file
+        :param int data: the position of the data in the file
+        :param int index: the index of the entry
+        :returns: the UTF-8 encoded entry
+        :rtype: bytes
+        """
+        return self._map[data + self._offset(table, index):
+                         data + self._offset(table, index + 1)]
+
+    def _find(self, word):
+        """Return the index of word in the lexicon, or -1.
+
+        :param str word: the word to find
+        :returns: the index of the word
+        :rtype: int
+        """
+        key = word.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(self._word_offsets, self._words, mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._count and self._entry(self._word_offsets, self._words,
+                                             low) == key:
+            return low
+        return -1
+
+    def get(self, word, default=None):
+        """Return the lexicon's transcription of word, or default.
+
+        :param str word: the word to look up
+        :param object default: the value to return if word is not in the
+            lexicon
+        :returns: the word's IPA
+        :rtype: str
+        """
+        index = self._find(word)
+        if index < 0:
+            return default
+        return self._entry(self._ipa_offsets, self._ipas,
+                           index).decode('utf-8')
+
+    def lookup(self, word):
+        """Return the transcription of word, transcribing it if not present.
+
+        :param str word: the word to look up
+        :returns: the word's IPA
+        :rtype: str
+        """
+        ipa = self.get(word)
+        if ipa is None:
+            ipa = self._transcribe(word)
+        return ipa
+
+    def words(self):
+        """Yield the words of the lexicon, in byte-wise sorted order.
+
+        :returns: the words
+        :rtype: generator
+        """
+        for index in range(self._count):
+            yield self._entry(self._word_offsets, self._words,
+                              index).decode('utf-8')
+
+    def close(self):
+        """Close the memory map."""
+        self._map.close()
+
+    def __contains__(self, word):
+        """Return True if word is in the lexicon.
+
+        :param str word: the word to look up
+        :returns: whether the word is in the lexicon
+        :rtype: bool
+        """
+        return self._find(word) >= 0
+
+    def __len__(self):
+        """Return the number of words in the lexicon.
+
+        :returns: the number of words
+        :rtype: int
+        """
+        return self._count
+
+    def __enter__(self):
+        """Enter a context.
+
+        :returns: the lexicon
+        :rtype: Lexicon
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Exit a context, closing the memory map.
+
+        :param args: the exception details, if any
+        """
+        self.close()
+
+
+def main(argv=None):
+    """Run the narmer-lexicon command, which builds a lexicon file.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog='narmer-lexicon',
+        description='Build a transcription lexicon from a word list.')
+    parser.add_argument('wordlist', help='word list, one word per line')
+    parser.add_argument('lexicon', help='lexicon file to write')
+    parser.add_argument('-p', '--period', default='nhg',
+                        choices=('nhg', 'enhg', 'mhg', 'ohg'),
+                        help='period of German (default: nhg)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='word list encoding (default: utf-8)')
+    parser.add_argument('-j', '--processes', type=int, default=1,
+                        help='worker processes (default: 1)')
+    args = parser.parse_args(argv)
+
+    with io.open(args.wordlist, 'r', encoding=args.encoding) as wordlist:
+        count = build_lexicon((line.rstrip('\r\n') for line in wordlist),
+                              args.lexicon, args.period, args.processes)
+    out = _open_output('-', 'utf-8', 1 << 10)
+    try:
+        out.write('{} words written to {}\n'.format(count, args.lexicon))
+    finally:
+        out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
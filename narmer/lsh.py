@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.lsh.
+
+The lsh module implements near-duplicate detection on pronunciation, using
+MinHash signatures over the character n-grams of transcriptions and banded
+locality-sensitive hashing (LSH):
+
+    - MinHash computes signatures, as numpy uint32 arrays
+    - LSHIndex groups identical signatures, buckets the groups by band &
+      yields candidate pairs of groups
+    - lsh_threshold estimates the Jaccard similarity at which a pair becomes
+      more likely than not to be a candidate
+
+This module requires numpy.
+"""
+
+from __future__ import division, unicode_literals
+
+import sys
+import zlib
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+from .phonetic import german_ipa_many
+
+if sys.version_info[0] < 3:  # pragma: no cover
+    from six.moves import range  # pylint: disable=redefined-builtin
+
+
+def lsh_threshold(bands, rows):
+    """Return the approximate similarity threshold of an LSH configuration.
+
+    A pair whose signatures have Jaccard similarity s becomes a candidate with
+    probability 1 - (1 - s^rows)^bands, which rises most steeply near
+    (1/bands)^(1/rows). More bands raise recall; more rows reduce the
+    number of candidates.
+
+    :param int bands: the number of bands
+    :param int rows: the number of rows per band
+    :returns: the approximate threshold
+    :rtype: float
+
+    >>> round(lsh_threshold(32, 4), 3)
+    0.42
+    >>> round(lsh_threshold(16, 8), 3)
+    0.707
+    """
+    return (1 / bands) ** (1 / rows)
+
+
+class MinHash(object):
+    """MinHash signatures over the n-grams of transcriptions.
+
+    N-grams are taken from the transcription, padded with n-1 '#' characters
+    on each side, and hashed with CRC-32, so signatures are reproducible
+    across processes and runs. Each of the num_perm hash functions is a
+    multiply-add-shift hash with 64-bit random parameters drawn from seed.
+    """
+
+    def __init__(self, num_perm=128, ngram=2, seed=0, period='nhg',
+                 batch_size=4096):
+        """Initialize MinHash.
+
+        :param int num_perm: the number of hash functions (signature length)
+        :param int ngram: the length of the n-grams
+        :param int seed: the seed of the hash function parameters
+        :param str period: a period of German, as in german_ipa
+        :param int batch_size: the number of words hashed at a time by
+            signatures, which bounds its working memory
+        """
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.period = period
+        self.batch_size = batch_size
+        rng = np.random.RandomState(seed)  # pylint: disable=no-member
+        # multiply-add-shift hashing requires an odd multiplier
+        self._mult = rng.randint(0, 1 << 62, num_perm, dtype=np.uint64) * \
+            np.uint64(2) + np.uint64(1)
+        self._add = rng.randint(0, 1 << 62, num_perm, dtype=np.uint64)
+        self._ngram_hashes = {}
+
+    def _hashes(self, ipa):
+        """Return the CRC-32 hashes of the padded n-grams of ipa.
+
+        :param str ipa: a transcription
+        :returns: the n-gram hashes
+        :rtype: list
+        """
+        hashes = self._ngram_hashes.get(ipa)
+        if hashes is None:
+            padded = '#' * (self.ngram - 1) + ipa + '#' * (self.ngram - 1)
+            grams = {padded[i:i + self.ngram]
+                     for i in range(len(padded) - self.ngram + 1)}
+            # an empty transcription with n=1 has no n-grams
+            hashes = sorted(zlib.crc32(gram.encode('utf-8')) & 0xFFFFFFFF
+                            for gram in grams or ('',))
+            if len(self._ngram_hashes) < 1 << 16:
+                self._ngram_hashes[ipa] = hashes
+        return hashes
+
+    def signatures(self, words, transcribed=False):
+        """Return the MinHash signatures of words.
+
+        :param iterable words: the words
+        :param bool transcribed: if True, words are transcriptions already
+        :returns: a (len(words), num_perm) array of signatures
+        :rtype: numpy.ndarray
+        """
+        words = list(words)
+        if transcribed:
+            ipas = words
+        else:
+            ipas = german_ipa_many(words, self.period)
+
+        result = np.empty((len(ipas), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(ipas), self.batch_size):
+            batch = [self._hashes(ipa)
+                     for ipa in ipas[start:start + self.batch_size]]
+            flat = np.fromiter((value for hashes in batch for value in hashes),
+                               dtype=np.uint64)
+            offsets = np.cumsum([0] + [len(hashes) for hashes in batch[:-1]])
+            # overflow is intended: the products are taken modulo 2^64
+            with np.errstate(over='ignore'):
+                permuted = (flat[:, None] * self._mult + self._add) >> \
+                    np.uint64(32)
+            result[start:start + len(batch)] = np.minimum.reduceat(
+                permuted, offsets, axis=0)
+        return result
+
+    def signature(self, word, transcribed=False):
+        """Return the MinHash signature of a word.
+
+        :param str word: the word
+        :param bool transcribed: if True, word is a transcription already
+        :returns: the signature
+        :rtype: numpy.ndarray
+        """
+        return self.signatures([word], transcribed)[0]
+
+    @staticmethod
+    def jaccard(sig1, sig2):
+        """Estimate the Jaccard similarity of two signatures.
+
+        :param numpy.ndarray sig1: a signature
+        :param numpy.ndarray sig2: a signature of the same length
+        :returns: the fraction of positions at which the signatures agree
+        :rtype: float
+        """
+        return float(np.mean(sig1 == sig2))
+
+
+class LSHIndex(object):
+    """A banded LSH index over MinHash signatures.
+
+    Each signature is split into bands of rows values; signatures that agree
+    on every value of any one band share a bucket and are candidates.
+    Signatures are identified by the order in which they were added.
+
+    Identical signatures, e.g. those of the many occurrences of a common
+    name, are collapsed into a group, which is bucketed once, so that the
+    cost of finding candidates does not grow quadratically with the number
+    of occurrences. Groups are identified by the order in which their first
+    signatures were added.
+    """
+
+    def __init__(self, bands=32, rows=4):
+        """Initialize LSHIndex.
+
+        :param int bands: the number of bands
+        :param int rows: the number of rows per band; bands * rows must equal
+            the signature length
+        """
+        self.bands = bands
+        self.rows = rows
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+        # signature: group id, and, by group id, the ids of its signatures
+        self._group_ids = {}
+        self._groups = []
+        self._size = 0
+
+    def _band_keys(self, signatures):
+        """Return the bucket keys of signatures, one array per band.
+
+        :param numpy.ndarray signatures: a 2-D array of signatures
+        :returns: for each band, an array of per-signature keys
+        :rtype: list
+        :raises ValueError: if the signatures have the wrong length
+        """
+        signatures = np.ascontiguousarray(signatures, dtype=np.uint32)
+        if signatures.shape[1] != self.bands * self.rows:
+            raise ValueError('Signatures must have bands * rows = {} values.'
+                             .format(self.bands * self.rows))
+        band_type = np.dtype((np.void, 4 * self.rows))
+        return [signatures[:, band * self.rows:(band + 1) * self.rows]
+                .copy().view(band_type).ravel()
+                for band in range(self.bands)]
+
+    def add(self, signatures):
+        """Add signatures to the index.
+
+        :param numpy.ndarray signatures: a 2-D array of signatures
+        :returns: the ids assigned to the signatures
+        :rtype: range
+        """
+        signatures = np.atleast_2d(signatures)
+        band_keys = [keys.tolist() for keys in self._band_keys(signatures)]
+        signatures = np.ascontiguousarray(signatures, dtype=np.uint32)
+        first = self._size
+        for offset, signature in enumerate(signatures):
+            key = signature.tobytes()
+            group = self._group_ids.get(key)
+            if group is None:
+                group = self._group_ids[key] = len(self._groups)
+                self._groups.append([])
+                for buckets, keys in zip(self._buckets, band_keys):
+                    buckets[keys[offset]].append(group)
+            self._groups[group].append(first + offset)
+        self._size += len(signatures)
+        return range(first, self._size)
+
+    def query(self, signature):
+        """Return the ids of the candidates for a signature.
+
+        :param numpy.ndarray signature: a signature
+        :returns: the ids of signatures sharing a bucket with it
+        :rtype: set
+        """
+        groups = set()
+        for buckets, keys in zip(self._buckets,
+                                 self._band_keys(np.atleast_2d(signature))):
+            groups.update(buckets.get(keys.tolist()[0], ()))
+        candidates = set()
+        for group in groups:
+            candidates.update(self._groups[group])
+        return candidates
+
+    def groups(self):
+        """Return the groups of identical signatures.
+
+        :returns: by group id, the ids of the group's signatures, in order
+        :rtype: list
+        """
+        return [list(group) for group in self._groups]
+
+    def candidate_pairs(self):
+        """Return all pairs of groups that share at least one bucket.
+
+        The signatures within a group, being identical, are candidates of
+        one another, and are not paired.
+
+        :returns: the (smaller group id, larger group id) pairs
+        :rtype: set
+        """
+        pairs = set()
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                for i, first in enumerate(bucket):
+                    for second in bucket[i + 1:]:
+                        pairs.add((first, second))
+        return pairs
+
+    def __len__(self):
+        """Return the number of signatures in the index.
+
+        :returns: the number of signatures
+        :rtype: int
+        """
+        return self._size
+
+
+def near_duplicates(words, bands=32, rows=4, ngram=2, seed=0, period='nhg'):
+    """Return the groups of a word list & the candidate near-duplicate pairs.
+
+    Words are grouped by their signatures, so words with the same
+    transcription share a group; each distinct transcription is hashed and
+    bucketed once.
+
+    :param list words: the words
+    :param int bands: the number of LSH bands
+    :param int rows: the number of rows per band
+    :param int ngram: the length of the n-grams
+    :param int seed: the seed of the hash function parameters
+    :param str period: a period of German, as in german_ipa
+    :returns: the groups, each a list of the indices of its words, in order,
+        and the (smaller group index, larger group index) pairs of candidate
+        groups
+    :rtype: tuple
+
+    >>> groups, pairs = near_duplicates(['Meyer', 'Maier', 'Müller',
+    ...                                  'Mueller', 'Schmidt', 'Schmitt'])
+    >>> groups
+    [[0, 1], [2], [3], [4], [5]]
+    >>> sorted(pairs)
+    [(1, 2), (3, 4)]
+    """
+    ipas = OrderedDict()
+    for i, ipa in enumerate(german_ipa_many(words, period)):
+        ipas.setdefault(ipa, []).append(i)
+    minhash = MinHash(bands * rows, ngram, seed, period)
+    index = LSHIndex(bands, rows)
+    index.add(minhash.signatures(ipas, transcribed=True))
+    members = list(ipas.values())
+    groups = [sorted(i for ipa in group for i in members[ipa])
+              for group in index.groups()]
+    return groups, index.candidate_pairs()
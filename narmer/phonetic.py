@@ -21,17 +21,840 @@
 The phonetic module implements phonetic algorithms including:
 
     - german_ipa
+    - german_ipa_many
+    - german_ipa_column
+    - german_ipa_periods & german_ipa_periods_many
+    - german_ipa_tokens & german_ipa_text
+    - IncrementalTranscriber
+    - RuleProfile
+    - ipa_phonemes
+    - ipa_encode & ipa_decode, with phoneme_inventory
+
+Transcriptions may optionally be cached, with enable_cache.
+
+Transcriptions may also be encoded compactly as bytes, one per phoneme (as
+split by ipa_phonemes), each of which is the phoneme's index in its period's
+phoneme inventory. The inventories are fixed: phonemes may be added to their
+ends, but never removed or reordered, so encoded transcriptions remain
+valid across versions. NHG, ENHG, and OHG share an inventory of 37
+phonemes; MHG, which marks vowel length, has one of 52.
+
+Each period of German is described by a rule table. A rule is a tuple of:
+
+    - the grapheme sequence to match (and consume)
+    - the left context: '' for any, '#' for word-initial only, or a string of
+      characters, one of which must immediately precede the match
+    - the right context: a tuple of strings, each of which is a class of
+      characters, one of which must appear at the corresponding position
+      immediately following the match
+    - the IPA output
+
+Rule tables are compiled into a first-character dispatch structure, within
+which the longest grapheme sequences are tried first and rules of equal length
+are tried in table order. Characters matched by no rule are dropped. When
+the package is built, the compiled tables are written to a versioned rule
+artifact, with build_rule_artifact, from which they are loaded when current.
 """
 
 from __future__ import division, unicode_literals
 
+import io
+import os
+import sys
 import unicodedata
+from collections import OrderedDict, namedtuple
+from itertools import islice
+from timeit import default_timer
+
+if sys.version_info[0] < 3:  # pragma: no cover
+    from six import text_type
+else:
+    text_type = str  # pylint: disable=invalid-name
+
+_NHG_VOWELS = 'AEIOUYÄÖÜ'
+_MHG_VOWELS = 'AEIOUYÄÖÜÆŒĀĒĪŌŪË'
+_OHG_VOWELS = 'AEIOUĀĒĪŌŪË'
+
+# phonemes written with two characters in the period rules' IPA output
+_MULTIGRAPH_PHONEMES = frozenset(('tʃ', 'dʒ', 'ts', 'pf',
+                                  'ai', 'au', 'ei', 'ie', 'øy', 'yu'))
+
+# the phoneme inventories, i.e. every phoneme that ipa_phonemes can find in a
+# period's transcriptions, in ID order; see ipa_encode
+_HIGH_GERMAN_PHONEMES = (
+    # consonants
+    'p', 'b', 't', 'd', 'k', 'g', 'pf', 'ts', 'tʃ', 'dʒ', 'f', 'v', 's', 'z',
+    'ʃ', 'ç', 'x', 'h', 'm', 'n', 'ŋ', 'l', 'r', 'j',
+    # vowels
+    'a', 'e', 'i', 'o', 'u', 'y', 'ø',
+    # diphthongs
+    'ai', 'au', 'ei', 'ie', 'øy', 'yu',
+)
+_MHG_PHONEMES = (
+    # consonants
+    'p', 'b', 't', 'd', 'k', 'g', 'pf', 'ts', 'tʃ', 'dʒ', 'f', 'v', 'w', 's',
+    'z', 'ʃ', 'x', 'h', 'm', 'n', 'ŋ', 'l', 'r', 'j',
+    # vowels
+    'a', 'aː', 'e', 'eː', 'ɛ', 'ɛː', 'i', 'iː', 'o', 'oː', 'u', 'uː', 'y',
+    'yː', 'ø', 'øː',
+    # diphthongs
+    'ai', 'aiː', 'au', 'auː', 'ei', 'eiː', 'ie', 'ieː', 'øy', 'øyː', 'yu',
+    'yuː',
+)
+_PHONEME_INVENTORIES = {'nhg': _HIGH_GERMAN_PHONEMES,
+                        'enhg': _HIGH_GERMAN_PHONEMES,
+                        'mhg': _MHG_PHONEMES,
+                        'ohg': _HIGH_GERMAN_PHONEMES}
+
+# a phoneme, as split by ipa_phonemes
+_PHONEME_TOKEN = '(?s)(?:' + '|'.join(sorted(_MULTIGRAPH_PHONEMES)) + '|.)ː?'
+
+_CIRCUMFLEX_TO_MACRON = dict(zip((ord(_) for _ in 'ÂÊÎÔÛ'), 'ĀĒĪŌŪ'))
+
+
+def _high_german_rules(vowels):
+    """Return the NHG-style rule table, using the supplied vowel class.
+
+    :param str vowels: the characters treated as vowels in contexts
+    :returns: a rule table
+    :rtype: tuple
+    """
+    return (
+        # Consonants
+        ('B', '', (), 'b'),
+        ('CHS', '', (), 'ks'),
+        ('CH', '', ('E', 'N'), 'ç'),
+        ('CH', 'AOU', (), 'x'),
+        ('CH', '', (), 'ç'),
+        ('CK', '', (), 'k'),
+        ('C', '', ('ÄEI',), 'ts'),
+        ('C', '', (), 'k'),
+        ('DSCH', '', (), 'dʒ'),
+        ('DT', '', (), 't'),
+        ('D', '', (), 'd'),
+        ('F', '', (), 'f'),
+        ('G', 'I', (), 'ç'),
+        ('G', '', (), 'g'),
+        # H after vowels should already be covered by the vowel rules
+        ('H', '', (), 'h'),
+        ('J', '', (), 'j'),
+        ('K', '', (), 'k'),
+        ('L', '', (), 'l'),
+        ('M', '', (), 'm'),
+        ('NG', '', (), 'ŋ'),
+        ('NK', '', (), 'ŋk'),
+        ('N', '', (), 'n'),
+        ('PH', '', (), 'f'),
+        ('P', '', (), 'p'),
+        ('QU', '', (vowels,), 'kv'),
+        ('Q', '', (), 'k'),
+        ('R', '', (), 'r'),
+        ('SCH', '', (), 'ʃ'),
+        ('SS', '', (), 's'),
+        ('S', '#', ('PT',), 'ʃ'),
+        ('S', '', (vowels,), 'z'),
+        ('S', '', (), 's'),
+        ('TZSCH', '', (), 'tʃ'),
+        ('TSCH', '', (), 'tʃ'),
+        ('TI', '', ('O', 'N'), 'tsi'),
+        ('TI', '', ('Ä', 'R'), 'tsi'),
+        ('TI', '', ('A', 'L'), 'tsi'),
+        ('TI', '', ('E', 'L', 'L'), 'tsi'),
+        ('TZ', '', (), 'ts'),
+        ('TH', '', (), 't'),
+        ('T', '', (), 't'),
+        ('V', '', (), 'f'),
+        ('W', '', (), 'v'),
+        ('X', '', (), 'ks'),
+        ('ZSCH', '', (), 'tʃ'),
+        ('Z', '', (), 'ts'),
+        # Vowels -- little attention is paid to length or tenseness
+        # -Diphthongs first
+        ('EI', '', (), 'ai'),
+        ('AI', '', (), 'ai'),
+        ('EY', '', (), 'ai'),
+        ('AY', '', (), 'ai'),
+        ('EU', '', (), 'øy'),
+        ('ÄU', '', (), 'øy'),
+        ('AU', '', (), 'au'),
+        # -Monophthongs following
+        ('AA', '', (), 'a'),
+        ('AH', '', (), 'a'),
+        ('A', '', (), 'a'),
+        ('EE', '', (), 'e'),
+        ('EH', '', (), 'e'),
+        ('E', '', (), 'e'),
+        ('IEH', '', (), 'i'),
+        ('IE', '', (), 'i'),
+        ('IH', '', (), 'i'),
+        ('I', '', (), 'i'),
+        ('OO', '', (), 'o'),
+        ('OH', '', (), 'o'),
+        ('O', '', (), 'o'),
+        ('UH', '', (), 'u'),
+        ('U', '', (), 'u'),
+        ('Y', '', (), 'y'),
+        ('ÄH', '', (), 'e'),
+        ('Ä', '', (), 'e'),
+        ('ÖH', '', (), 'ø'),
+        ('Ö', '', (), 'ø'),
+        ('ÜH', '', (), 'y'),
+        ('Ü', '', (), 'y'),
+    )
+
+
+_NHG_RULES = _high_german_rules(_NHG_VOWELS)
+
+_ENHG_RULES = _NHG_RULES
+
+_MHG_RULES = (
+    # Consonants
+    ('B', '', (), 'b'),
+    ('CH', '', (), 'x'),
+    ('CK', '', (), 'k'),
+    ('C', '', (), 'k'),
+    ('DSCH', '', (), 'dʒ'),
+    ('DT', '', (), 't'),
+    ('D', '', (), 'd'),
+    ('F', '', (), 'f'),
+    ('G', '', (), 'g'),
+    ('H', _MHG_VOWELS, (_MHG_VOWELS,), 'h'),
+    ('H', '', (), 'x'),
+    ('J', '', (), 'j'),
+    ('K', '', (), 'k'),
+    ('L', '', (), 'l'),
+    ('M', '', (), 'm'),
+    ('NG', '', (), 'ŋg'),
+    ('NK', '', (), 'ŋk'),
+    ('N', '', (), 'n'),
+    ('PH', '', (), 'pf'),
+    ('P', '', (), 'p'),
+    ('QU', '', (_MHG_VOWELS,), 'kv'),
+    ('Q', '', (), 'k'),
+    ('R', '', (), 'r'),
+    ('SCH', '', (), 'ʃ'),
+    ('SS', '', (), 's'),
+    ('SC', '', (), 'ʃ'),
+    ('SK', '', (), 'ʃ'),
+    ('S', '#', ('PT',), 'ʃ'),
+    ('S', '', (_MHG_VOWELS,), 'z'),
+    ('S', '', (), 's'),
+    ('TZSCH', '', (), 'tʃ'),
+    ('TSCH', '', (), 'tʃ'),
+    ('TI', '', ('O', 'N'), 'tsi'),
+    ('TI', '', ('Ä', 'R'), 'tsi'),
+    ('TI', '', ('A', 'L'), 'tsi'),
+    ('TI', '', ('E', 'L', 'L'), 'tsi'),
+    ('TZ', '', (), 'ts'),
+    ('TH', '', (), 't'),
+    ('T', '', (), 't'),
+    ('V', '', (), 'f'),
+    ('W', '', (), 'w'),
+    ('X', '', (), 'ks'),
+    ('ZSCH', '', (), 'tʃ'),
+    ('Z', '', (), 'ts'),
+    # Vowels -- little attention is paid to length or tenseness
+    # -Diphthongs first
+    ('EI', '', (), 'ei'),
+    ('EY', '', (), 'ei'),
+    ('AI', '', (), 'ai'),
+    ('AY', '', (), 'ai'),
+    ('IE', '', (), 'ie'),
+    ('AU', '', (), 'au'),
+    ('ÜE', '', (), 'yu'),
+    ('ÖU', '', (), 'øy'),
+    ('EU', '', (), 'øy'),
+    ('OI', '', (), 'øy'),
+    # -Monophthongs following
+    ('IU', '', (), 'yː'),
+    ('AE', '', (), 'ɛː'),
+    ('OE', '', (), 'øː'),
+    ('Ā', '', (), 'aː'),
+    ('AA', '', (), 'aː'),
+    ('A', '', (), 'a'),
+    ('Ē', '', (), 'eː'),
+    ('EE', '', (), 'eː'),
+    ('E', '', (), 'e'),
+    ('Ī', '', (), 'iː'),
+    ('II', '', (), 'iː'),
+    ('I', '', (), 'i'),
+    ('Ō', '', (), 'oː'),
+    ('OO', '', (), 'oː'),
+    ('O', '', (), 'o'),
+    ('Ū', '', (), 'uː'),
+    ('UU', '', (), 'uː'),
+    ('U', '', (), 'u'),
+    ('Y', '', (), 'y'),
+    ('Æ', '', (), 'ɛː'),
+    ('Ä', '', (), 'ɛ'),
+    ('Œ', '', (), 'øː'),
+    ('Ö', '', (), 'ø'),
+    ('Ü', '', (), 'y'),
+    ('Ë', '', (), 'ɛ'),
+)
+
+_OHG_RULES = _high_german_rules(_OHG_VOWELS)
+
+
+def _compile_rules(rules):
+    """Compile a rule table into a first-character dispatch structure.
+
+    :param tuple rules: a rule table, as described in the module docstring
+    :returns: a triple of: a dict mapping characters that have only a
+        single, unconditional, one-character rule directly to their IPA; a
+        dict mapping every other initial character to its candidate rules as
+        (graphemes, length, left context, right context, IPA) tuples, longest
+        graphemes first; and the span of the rules, i.e. the greatest number
+        of characters, from the current one on, that any rule examines
+    :rtype: tuple
+    """
+    candidates = {}
+    span = 1
+    for graphemes, left, right, ipa in rules:
+        candidates.setdefault(graphemes[0], []).append(
+            (graphemes, len(graphemes), left, tuple(right), ipa)
+        )
+        span = max(span, len(graphemes) + len(right))
+
+    simple = {}
+    dispatch = {}
+    for char, char_rules in candidates.items():
+        if len(char_rules) == 1 and char_rules[0][1:4] == (1, '', ()):
+            simple[char] = char_rules[0][4]
+        else:
+            # sort is stable, so equal-length rules keep their table order
+            char_rules.sort(key=lambda rule: -rule[1])
+            dispatch[char] = tuple(char_rules)
+    return simple, dispatch, span
+
+
+def _right_context_matches(word, pos, right):
+    """Return True if the right context matches word at pos.
+
+    :param str word: the normalized word
+    :param int pos: the index of the first character following the match
+    :param tuple right: the right context of the rule
+    :returns: whether each following character is in its respective class
+    :rtype: bool
+    """
+    if pos + len(right) > len(word):
+        return False
+    for offset, chars in enumerate(right):
+        if word[pos + offset] not in chars:
+            return False
+    return True
+
+
+def _transcribe(word, table):
+    """Transcribe a normalized word according to a compiled rule table.
+
+    :param str word: the normalized (upper-case) word
+    :param tuple table: a compiled rule table, as returned by _compile_rules
+    :returns: the word's IPA equivalent
+    :rtype: str
+    """
+    return _transcribe_span(word, table, 0, len(word))[0]
+
+
+def _transcribe_span(word, table, pos, stop):
+    """Transcribe part of a normalized word according to a rule table.
+
+    Rules are applied at each position from pos until stop is reached; the
+    last rule applied may consume characters beyond stop.
+
+    :param str word: the normalized (upper-case) word
+    :param tuple table: a compiled rule table, as returned by _compile_rules
+    :param int pos: the position at which to begin
+    :param int stop: the position before which the last rule must be applied
+    :returns: the IPA of the span & the position following it
+    :rtype: tuple
+    """
+    simple, dispatch = table[:2]
+    ipa = []
+    while pos < stop:
+        char = word[pos]
+        if char in simple:
+            ipa.append(simple[char])
+            pos += 1
+            continue
+
+        for graphemes, size, left, right, out in dispatch.get(char, ()):
+            if size > 1 and not word.startswith(graphemes, pos):
+                continue
+            if left:
+                if left == '#':
+                    if pos:
+                        continue
+                elif not pos or word[pos - 1] not in left:
+                    continue
+            if right and not _right_context_matches(word, pos + size, right):
+                continue
+            ipa.append(out)
+            pos += size
+            break
+        else:
+            pos += 1
+
+    return ''.join(ipa), pos
+
+
+def _match_rule(word, rules, pos):
+    """Return the first of a character's rules to apply at a position.
+
+    This is the rule search of _transcribe_span, for RuleProfile.
+
+    :param str word: the normalized (upper-case) word
+    :param tuple rules: the dispatched rules of the character at pos
+    :param int pos: the position at which to apply a rule
+    :returns: the (graphemes, left, right, ipa) of the rule & its size; if
+        no rule applies, the ipa is None & the size is 1
+    :rtype: tuple
+    """
+    for graphemes, size, left, right, out in rules:
+        if size > 1 and not word.startswith(graphemes, pos):
+            continue
+        if left:
+            if left == '#':
+                if pos:
+                    continue
+            elif not pos or word[pos - 1] not in left:
+                continue
+        if right and not _right_context_matches(word, pos + size, right):
+            continue
+        return (graphemes, left, right, out), size
+    return (word[pos], '', (), None), 1
+
+
+def _normalize(word):
+    """Return the upper-cased, NFKC-normalized form of a word.
+
+    :param str word: the word to normalize
+    :returns: the normalized word
+    :rtype: str
+    """
+    word = unicodedata.normalize('NFKC', text_type(word.upper()))
+    return word.replace('ß', 'SS')
+
+
+class _LazyDict(dict):
+    """A dict whose values are built when their keys are first looked up.
+
+    Present keys are looked up at the speed of a plain dict.
+    """
+
+    def __init__(self, build):
+        """Initialize _LazyDict.
+
+        :param function build: a function returning the value of a key
+        """
+        super(_LazyDict, self).__init__()
+        self._build = build
+
+    def __missing__(self, key):
+        """Build, store, and return the value of a key.
+
+        :param key: the key
+        :returns: the value
+        """
+        value = self[key] = self._build(key)
+        return value
+
+
+# period: (rule table, whether circumflexes are read as macrons)
+_PERIOD_RULES = {'nhg': (_NHG_RULES, False),
+                 'enhg': (_ENHG_RULES, False),
+                 'mhg': (_MHG_RULES, True),
+                 'ohg': (_OHG_RULES, True)}
+
+
+# the version of the compiled rule table structure; increment it whenever
+# _compile_rules or the engine's use of its result changes, so that rule
+# artifacts built by earlier versions are ignored
+_ENGINE_VERSION = 1
+
+# the rule artifact that build_rule_artifact writes into the package when it
+# is built; None disables loading
+_RULES_ARTIFACT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'rules.bin')
+_ARTIFACT_MAGIC = b'NARMRUL'
+_ARTIFACT_FORMAT = 1
+# magic, format, engine version, Python major & minor version
+_ARTIFACT_HEADER = '<7sBHBB'
+
+
+def _rules_digest(rules):
+    """Return a digest of a rule table.
+
+    :param tuple rules: a rule table, as described in the module docstring
+    :returns: the CRC-32 of the table's marshalled form
+    :rtype: int
+    """
+    # marshal & zlib are built in, so importing them is nearly free
+    import marshal
+    import zlib
+
+    # version 2 of the marshal format does not depend on object identity
+    return zlib.crc32(marshal.dumps(rules, 2)) & 0xFFFFFFFF
+
+
+def _source_stamp():
+    """Return the modification time & size of this module's source.
+
+    The modification time is in whole seconds, as copies made when the
+    package is built & installed preserve no more.
+
+    :returns: the modification time & size, or None if unknown
+    :rtype: tuple
+    """
+    try:
+        stat = os.stat(__file__)
+    except (NameError, OSError):
+        return None
+    return int(stat.st_mtime), stat.st_size
+
+
+def _artifact_header():
+    """Return the header that a current rule artifact begins with.
+
+    :returns: the header
+    :rtype: bytes
+    """
+    import struct
+
+    return struct.pack(_ARTIFACT_HEADER, _ARTIFACT_MAGIC, _ARTIFACT_FORMAT,
+                       _ENGINE_VERSION, sys.version_info[0],
+                       sys.version_info[1])
+
+
+def build_rule_artifact(path):
+    """Write the compiled rule tables of all periods to a rule artifact.
+
+    The package's build step writes the artifact into the package, from which
+    each period's compiled table is loaded when the period is first used,
+    rather than compiled from its rules. An artifact written by another
+    engine version or Python version is ignored, as is the table of any
+    period whose rules have changed since the artifact was written: as with
+    .pyc files, the rules are taken to be unchanged if the modification time
+    & size of this module's source are; if not, each period's rules are
+    compared with the digest stored for them. Ignored tables are compiled in
+    memory; the artifact is never written at run time.
+
+    The artifact consists of a header (the magic bytes NARMRUL, the format
+    version, the engine version, and the Python major & minor versions, as
+    little-endian integers), followed by the marshalled tuple of the source
+    stamp and a dict mapping each period to the digest of its rules & its
+    marshalled compiled table.
+
+    :param str path: the path of the artifact
+    :returns: the path of the artifact
+    :rtype: str
+    """
+    import marshal
+
+    tables = {}
+    for period, (rules, _) in _PERIOD_RULES.items():
+        tables[period] = (_rules_digest(rules),
+                          marshal.dumps(_compile_rules(rules)))
+    with io.open(path, 'wb') as artifact:
+        artifact.write(_artifact_header() +
+                       marshal.dumps((_source_stamp(), tables)))
+    return path
+
+
+def _read_rule_artifact(path):
+    """Read the compiled tables of a rule artifact, if it is current.
+
+    :param str path: the path of the artifact
+    :returns: a dict mapping each period to the digest its rules must have,
+        or None if they are unchanged, & its marshalled compiled table;
+        empty if the artifact is missing or not current
+    :rtype: dict
+    """
+    import marshal
+
+    header = _artifact_header()
+    try:
+        with io.open(path, 'rb') as artifact:
+            data = artifact.read()
+        if not data.startswith(header):
+            return {}
+        stamp, tables = marshal.loads(data[len(header):])
+    except (EOFError, EnvironmentError, TypeError, ValueError):
+        return {}
+    if stamp is not None and stamp == _source_stamp():
+        return {period: (None, table)
+                for period, (_, table) in tables.items()}
+    return tables
+
+
+# path: the compiled tables of the rule artifact there, read once
+_RULE_ARTIFACTS = _LazyDict(_read_rule_artifact)
+
+
+def _load_compiled(period, tables):
+    """Load a period's compiled rule table from a rule artifact's tables.
+
+    :param str period: a (lower-case) period of German
+    :param dict tables: the compiled tables, as read by _read_rule_artifact
+    :returns: the compiled rule table, or None if it is absent or stale
+    :rtype: tuple
+    """
+    import marshal
+
+    digest, table = tables.get(period, (None, None))
+    if table is None or (digest is not None and
+                         digest != _rules_digest(_PERIOD_RULES[period][0])):
+        return None
+    try:
+        return marshal.loads(table)
+    except (EOFError, TypeError, ValueError):
+        return None
+
+
+def _compile_period(period):
+    """Load a period's compiled rule table from the artifact, or compile it.
+
+    :param str period: a (lower-case) period of German
+    :returns: the compiled rule table & whether circumflexes are read as
+        macrons
+    :rtype: tuple
+    """
+    rules, macrons = _PERIOD_RULES[period]
+    table = None
+    if _RULES_ARTIFACT is not None:
+        table = _load_compiled(period, _RULE_ARTIFACTS[_RULES_ARTIFACT])
+    if table is None:
+        table = _compile_rules(rules)
+    return table, macrons
+
+
+def _compile_pattern(pattern):
+    """Compile a regular expression.
+
+    :param str pattern: the regular expression
+    :returns: the compiled pattern
+    :rtype: re.Pattern
+    """
+    import re
 
-from six import text_type
-from six.moves import range
+    return re.compile(pattern, re.UNICODE)
 
 
-def german_ipa(word, period='nhg'):
+def _phoneme_ids(period):
+    """Return the IDs of a period's phonemes.
+
+    :param str period: a (lower-case) period of German
+    :returns: a dict mapping each phoneme of the period's inventory to its ID
+    :rtype: dict
+    """
+    return {phoneme: code
+            for code, phoneme in enumerate(_PHONEME_INVENTORIES[period])}
+
+
+# rule tables, patterns & phoneme IDs are built on first use, to keep imports
+# fast
+# period: (compiled rule table, whether circumflexes are read as macrons)
+_TABLES = _LazyDict(_compile_period)
+_PATTERNS = _LazyDict(_compile_pattern)
+_PHONEME_IDS = _LazyDict(_phoneme_ids)
+
+
+# period: (an earlier period whose transcription it shares, and a pattern
+# that, if found in the normalized word, prevents sharing); NHG & OHG differ
+# only in the vowels that may follow S and QU, and in circumflexes
+_SHARED_PERIODS = {
+    'enhg': ('nhg', None),
+    'ohg': ('nhg', '(?:S|QU)[{}ÂÊÎÔÛ]'.format(''.join(
+        sorted(set(_NHG_VOWELS) ^ set(_OHG_VOWELS))))),
+}
+
+
+def _transcribe_period(period, word):
+    """Transcribe a word according to a period's rules, bypassing the cache.
+
+    :param str period: a (lower-case) period of German
+    :param str word: the German word to transcribe to IPA
+    :returns: the German word's approximate IPA equivalent
+    :rtype: str
+    """
+    table, macrons = _TABLES[period]
+    word = _normalize(word)
+    if macrons:
+        word = word.translate(_CIRCUMFLEX_TO_MACRON)
+    return _transcribe(word, table)
+
+
+def _ipa(period, word):
+    """Transcribe a word according to a period's rules, using the cache.
+
+    :param str period: a (lower-case) period of German
+    :param str word: the German word to transcribe to IPA
+    :returns: the German word's approximate IPA equivalent
+    :rtype: str
+    """
+    cache = _cache
+    if cache is None:
+        return _transcribe_period(period, word)
+    ipa = cache.get(period, word)
+    if ipa is None:
+        ipa = _transcribe_period(period, word)
+        cache.put(period, word, ipa)
+    return ipa
+
+
+CacheInfo = namedtuple('CacheInfo',
+                       ('hits', 'misses', 'evictions', 'maxsize', 'currsize'))
+
+
+class IPACache(object):
+    """A bounded, least-recently-used cache of transcriptions.
+
+    Entries are keyed on (period, word), so a single cache serves all of the
+    period functions. Use enable_cache to install a cache, after which
+    german_ipa, german_ipa_many, and the period functions consult it.
+    """
+
+    def __init__(self, maxsize=65536):
+        """Initialize IPACache.
+
+        :param int maxsize: the maximum number of entries to retain
+        """
+        # threading is imported only once a cache is created
+        import threading
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resize(maxsize)
+
+    def get(self, period, word):
+        """Return the cached transcription of word, or None.
+
+        :param str period: a (lower-case) period of German
+        :param str word: the German word
+        :returns: the cached IPA, or None if it is not cached
+        :rtype: str
+        """
+        key = (period, word)
+        with self._lock:
+            ipa = self._entries.pop(key, None)
+            if ipa is None:
+                self.misses += 1
+                return None
+            # re-insert to mark the entry as most recently used
+            self._entries[key] = ipa
+            self.hits += 1
+            return ipa
+
+    def put(self, period, word, ipa):
+        """Add a transcription to the cache, evicting the LRU entry if full.
+
+        :param str period: a (lower-case) period of German
+        :param str word: the German word
+        :param str ipa: the word's IPA transcription
+        """
+        key = (period, word)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = ipa
+            self._evict(self._maxsize)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize):
+        """Change the maximum size, evicting LRU entries as necessary.
+
+        :param int maxsize: the maximum number of entries to retain
+        :raises ValueError: if maxsize is not positive
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive integer.')
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict(maxsize)
+
+    def info(self):
+        """Return the cache's statistics.
+
+        :returns: the hits, misses, evictions, maxsize, and current size
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self._maxsize, len(self._entries))
+
+    def __len__(self):
+        """Return the number of cached entries.
+
+        :returns: the number of cached entries
+        :rtype: int
+        """
+        return len(self._entries)
+
+    def _evict(self, maxsize):
+        """Evict least recently used entries until at most maxsize remain.
+
+        The caller must hold the lock.
+
+        :param int maxsize: the number of entries to retain
+        """
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+_cache = None  # pylint: disable=invalid-name
+
+
+def enable_cache(maxsize=65536, cache=None):
+    """Enable caching of transcriptions.
+
+    :param int maxsize: the maximum number of entries of the new cache
+    :param object cache: a cache object to install, in place of a new
+        IPACache; it must provide get(period, word) and put(period, word, ipa)
+        methods
+    :returns: the installed cache
+    :rtype: IPACache
+
+    >>> cache = enable_cache(maxsize=2)
+    >>> german_ipa('Kohl')
+    'kol'
+    >>> german_ipa('Kohl')
+    'kol'
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+    >>> disable_cache()
+    """
+    global _cache  # pylint: disable=global-statement,invalid-name
+    if cache is None:
+        cache = IPACache(maxsize)
+    _cache = cache
+    return cache
+
+
+def disable_cache():
+    """Disable caching of transcriptions and discard the current cache."""
+    global _cache  # pylint: disable=global-statement,invalid-name
+    _cache = None
+
+
+def get_cache():
+    """Return the installed cache, or None if caching is disabled.
+
+    :returns: the installed cache
+    :rtype: IPACache
+    """
+    return _cache
+
+
+def german_ipa(word, period='nhg', encoded=False):
     """Convert German to IPA.
 
     Wrapper for other, more specific functions to convert
@@ -45,8 +868,10 @@ def german_ipa(word, period='nhg'):
         - mhg -- Middle High German
         - ohg -- Old High German
 
+    :param bool encoded: if True, the transcription is returned encoded, as
+        by ipa_encode
     :returns: the German word's approximate IPA equivalent
-    :rtype: str
+    :rtype: str or bytes
 
     >>> german_ipa('Ehre')
     'ere'
@@ -58,18 +883,945 @@ def german_ipa(word, period='nhg'):
     'ʃiller'
     >>> german_ipa('Tschechien')
     'tʃeçin'
+    >>> list(german_ipa('Tschechien', encoded=True))
+    [8, 25, 15, 26, 19]
     """
-    period_map = {'nhg': nhg_ipa,
-                  'enhg': enhg_ipa,
-                  'mhg': mhg_ipa,
-                  'ohg': ohg_ipa}
+    if encoded:
+        return ipa_encode(_period_function(period)(word), period)
+    return _period_function(period)(word)
+
+
+def german_ipa_many(words, period='nhg', generator=False, processes=1,
+                    chunksize=10000, encoded=False):
+    """Convert a sequence of German words to IPA.
+
+    The period is resolved only once and each distinct word in the sequence
+    is transcribed only once, which makes this much faster than calling
+    german_ipa on each word when the input contains many repetitions.
+
+    If processes is other than 1, the words are split into chunks of
+    chunksize words, which are transcribed in parallel by a pool of worker
+    processes. Words are deduplicated within each chunk.
+
+    :param iterable words: the German words to transcribe to IPA
+    :param str period: a period of German, as in german_ipa
+    :param bool generator: if True, a generator that yields the
+        transcriptions lazily is returned, rather than a list
+    :param int processes: the number of worker processes to use; if None,
+        the number of CPUs is used
+    :param int chunksize: the number of words sent to a worker at a time
+    :param bool encoded: if True, the transcriptions are encoded, as by
+        ipa_encode
+    :returns: the German words' approximate IPA equivalents, in input order
+    :rtype: list or generator
+    :raises ValueError: if processes or chunksize is not positive
+
+    >>> german_ipa_many(['Ehre', 'Kohl', 'Ehre'])
+    ['ere', 'kol', 'ere']
+    >>> list(german_ipa_many(['Ehre', 'Kohl'], 'mhg', generator=True))
+    ['exre', 'koxl']
+    >>> german_ipa_many(['Ehre', 'Kohl'], encoded=True) == [
+    ...     ipa_encode('ere'), ipa_encode('kol')]
+    True
+    """
+    transcribe = _period_function(period)
+    if processes == 1:
+        results = _german_ipa_iter(words, transcribe,
+                                   period if encoded else None)
+    else:
+        if (processes is not None and processes < 1) or chunksize < 1:
+            raise ValueError('processes and chunksize must be positive.')
+        results = _german_ipa_pool_iter(words, period.lower(), processes,
+                                        chunksize)
+        if encoded:
+            results = (ipa_encode(ipa, period) for ipa in results)
+    if generator:
+        return results
+    return list(results)
+
+
+def _german_ipa_iter(words, transcribe, encode_period=None):
+    """Yield the transcriptions of words, transcribing each only once.
+
+    :param iterable words: the German words to transcribe to IPA
+    :param function transcribe: the period function to apply
+    :param str encode_period: if not None, the period whose inventory is
+        used to encode the transcriptions, as by ipa_encode
+    :returns: the German words' approximate IPA equivalents, in input order
+    :rtype: generator
+    """
+    seen = {}
+    for word in words:
+        ipa = seen.get(word)
+        if ipa is None:
+            ipa = transcribe(word)
+            if encode_period is not None:
+                ipa = ipa_encode(ipa, encode_period)
+            seen[word] = ipa
+        yield ipa
+
+
+def _german_ipa_pool_iter(words, period, processes, chunksize):
+    """Yield the transcriptions of words, transcribed by a process pool.
+
+    :param iterable words: the German words to transcribe to IPA
+    :param str period: a (lower-case) period of German
+    :param int processes: the number of worker processes to use
+    :param int chunksize: the number of words sent to a worker at a time
+    :returns: the German words' approximate IPA equivalents, in input order
+    :rtype: generator
+    """
+    import multiprocessing
+
+    # Pool is a context manager only on Python 3
+    # pylint: disable-next=consider-using-with
+    pool = multiprocessing.Pool(processes)
+    try:
+        tasks = ((period, chunk) for chunk in _chunks(words, chunksize))
+        for ipas in pool.imap(_transcribe_chunk, tasks):
+            for ipa in ipas:
+                yield ipa
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _transcribe_chunk(task):
+    """Transcribe a chunk of words in a worker process.
+
+    :param tuple task: a (lower-case) period & a list of words
+    :returns: the words' approximate IPA equivalents
+    :rtype: list
+    """
+    period, words = task
+    return list(_german_ipa_iter(words, _PERIODS[period]))
+
+
+def _chunks(iterable, size):
+    """Yield successive lists of up to size items from iterable.
+
+    :param iterable iterable: the items to split
+    :param int size: the maximum number of items per chunk
+    :returns: lists of items
+    :rtype: generator
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def german_ipa_periods(word, periods=None):
+    """Convert a German word to IPA for several periods at once.
+
+    The word is normalized only once (and its circumflexes replaced only
+    once), and periods whose rules would make identical decisions for the
+    word reuse the transcription of an earlier period: ENHG always shares
+    NHG's result, and OHG does unless S or QU is followed by one of the
+    vowels on which their rules' contexts differ.
+
+    :param str word: the German word to transcribe to IPA
+    :param iterable periods: the periods of German, as in german_ipa (by
+        default, all periods)
+    :returns: the word's approximate IPA equivalent for each period, in the
+        order requested (on Python 3.7+, where dicts preserve order)
+    :rtype: dict
+
+    >>> list(german_ipa_periods('Sêle').items())
+    [('nhg', 'sle'), ('enhg', 'sle'), ('mhg', 'zeːle'), ('ohg', 'zle')]
+    >>> list(german_ipa_periods('Nacht', ('mhg', 'NHG')).items())
+    [('mhg', 'naxt'), ('nhg', 'naxt')]
+    """
+    return _german_ipa_periods(word, _period_plan(periods))
+
+
+def german_ipa_periods_many(words, periods=None):
+    """Convert a sequence of German words to IPA for several periods at once.
+
+    Each distinct word is transcribed only once, as by german_ipa_periods.
+
+    :param iterable words: the German words to transcribe to IPA
+    :param iterable periods: the periods of German, as in german_ipa (by
+        default, all periods)
+    :returns: for each word, in input order, a dict of its IPA for each
+        period
+    :rtype: list
+
+    >>> german_ipa_periods_many(['Kohl', 'Kohl'])
+    [{'nhg': 'kol', 'enhg': 'kol', 'mhg': 'koxl', 'ohg': 'kol'}, \
+{'nhg': 'kol', 'enhg': 'kol', 'mhg': 'koxl', 'ohg': 'kol'}]
+    """
+    plan = _period_plan(periods)
+    seen = {}
+    results = []
+    for word in words:
+        ipas = seen.get(word)
+        if ipas is None:
+            ipas = seen[word] = _german_ipa_periods(word, plan)
+        results.append(dict(ipas))
+    return results
+
+
+def _period_plan(periods):
+    """Return the validated plan for transcribing a word for several periods.
+
+    :param iterable periods: periods of German, or None for all periods
+    :returns: the lower-case names of the periods, in the order requested,
+        and the (period, table, macrons, shared period, blocking pattern)
+        steps for computing their transcriptions, in canonical order
+    :rtype: tuple
+    :raises ValueError: if any period is not a supported period
+    """
+    if periods is None:
+        names = tuple(_PERIODS)
+    else:
+        names = tuple(period.lower() for period in periods)
+        for period in names:
+            _period_function(period)
+    steps = []
+    for period in _PERIODS:
+        if period in names:
+            shared, blocker = _SHARED_PERIODS.get(period, (None, None))
+            if shared not in names:
+                shared = None
+            if blocker is not None:
+                blocker = _PATTERNS[blocker]
+            steps.append((period,) + _TABLES[period] + (shared, blocker))
+    return names, steps
+
+
+def _german_ipa_periods(word, plan):
+    """Transcribe a word for several periods, sharing work among them.
+
+    :param str word: the German word to transcribe to IPA
+    :param tuple plan: the plan, as returned by _period_plan
+    :returns: the word's approximate IPA equivalent for each period
+    :rtype: dict
+    """
+    names, steps = plan
+    normalized = _normalize(word)
+    translated = None
+    computed = {}
+    for period, table, macrons, shared, blocker in steps:
+        if shared is not None and (blocker is None or
+                                   not blocker.search(normalized)):
+            computed[period] = computed[shared]
+        elif macrons:
+            if translated is None:
+                translated = normalized.translate(_CIRCUMFLEX_TO_MACRON)
+            computed[period] = _transcribe(translated, table)
+        else:
+            computed[period] = _transcribe(normalized, table)
+    return {period: computed[period] for period in names}
+
+
+# the number of elements of an object array transcribed at a time
+_COLUMN_BLOCK = 1 << 14
+
 
+def german_ipa_column(values, period='nhg'):
+    """Convert a column of German words to IPA.
+
+    The column is factorized into its unique values, each of which is
+    transcribed once, and the results are scattered back into a column of
+    the same length. Nulls (None, NaN, & pandas.NA) are preserved.
+
+    The type of the result follows the type of the input:
+
+        - pyarrow Array or ChunkedArray -- a pyarrow array of the same type,
+          computed by dictionary-encoding the input
+        - pandas Series, Index, or extension array -- a pandas object of the
+          same kind, with the same index & string dtype as the input
+        - numpy array -- a numpy array of the same shape; bytes ('S')
+          arrays must be decoded first, e.g. with numpy.char.decode
+        - any other iterable -- a list
+
+    None of numpy, pandas, or pyarrow is required, except to process an
+    input of the corresponding type.
+
+    :param iterable values: the column of German words to transcribe to IPA
+    :param str period: a period of German, as in german_ipa
+    :returns: the German words' approximate IPA equivalents
+    :rtype: same as values, or list
+    :raises TypeError: if values is a numpy array of bytes
+
+    >>> german_ipa_column(['Ehre', None, 'Kohl', 'Ehre'])
+    ['ere', None, 'kol', 'ere']
+    """
+    transcribe = _period_function(period)
+    library = type(values).__module__.partition('.')[0]
+    if library == 'pyarrow':
+        return _german_ipa_arrow(values, transcribe)
+    if library == 'pandas':
+        return _german_ipa_pandas(values, transcribe)
+    if library == 'numpy':
+        return _german_ipa_numpy(values, transcribe)
+    return list(_german_ipa_nullable_iter(values, transcribe))
+
+
+def _german_ipa_nullable_iter(values, transcribe, seen=None):
+    """Yield the transcriptions of values, passing nulls through as None.
+
+    :param iterable values: the German words to transcribe to IPA
+    :param function transcribe: the period function to apply
+    :param dict seen: transcriptions already computed for other blocks
+    :returns: the German words' approximate IPA equivalents, in input order
+    :rtype: generator
+    """
+    if seen is None:
+        seen = {}
+    for value in values:
+        # NaN is the only value not equal to itself
+        # pylint: disable-next=comparison-with-itself
+        if value is None or value != value:
+            yield None
+            continue
+        ipa = seen.get(value)
+        if ipa is None:
+            ipa = seen[value] = transcribe(value)
+        yield ipa
+
+
+def _german_ipa_arrow(values, transcribe, seen=None):
+    """Transcribe a pyarrow Array or ChunkedArray column.
+
+    :param values: the pyarrow column of German words
+    :param function transcribe: the period function to apply
+    :param dict seen: transcriptions already computed for other chunks
+    :returns: the German words' approximate IPA equivalents
+    :rtype: pyarrow.Array or pyarrow.ChunkedArray
+    """
+    import pyarrow  # pylint: disable=import-error
+
+    if seen is None:
+        seen = {}
+    if isinstance(values, pyarrow.ChunkedArray):
+        chunks = [_german_ipa_arrow(chunk, transcribe, seen)
+                  for chunk in values.chunks]
+        value_type = values.type
+        if pyarrow.types.is_dictionary(value_type):
+            value_type = value_type.value_type
+        return pyarrow.chunked_array(chunks, type=value_type)
+
+    if pyarrow.types.is_dictionary(values.type):
+        encoded = values
+    else:
+        encoded = values.dictionary_encode()
+    ipas = []
+    for word in encoded.dictionary.to_pylist():
+        ipa = seen.get(word)
+        if ipa is None:
+            ipa = seen[word] = transcribe(word)
+        ipas.append(ipa)
+    # taking with a null index yields null, so nulls are preserved
+    return pyarrow.array(ipas, type=encoded.dictionary.type).take(
+        encoded.indices)
+
+
+def _german_ipa_pandas(values, transcribe):
+    """Transcribe a pandas Series, Index, or extension array column.
+
+    :param values: the pandas column of German words
+    :param function transcribe: the period function to apply
+    :returns: the German words' approximate IPA equivalents
+    :rtype: pandas.Series, pandas.Index, or pandas extension array
+    """
+    import numpy  # pylint: disable=import-error
+    import pandas  # pylint: disable=import-error
+
+    codes, uniques = pandas.factorize(values)
+    ipas = [transcribe(word) for word in uniques]
+    # nulls are coded -1, which selects the trailing None
+    ipas.append(None)
+    result = numpy.array(ipas, dtype=object)[codes]
+
+    dtype = values.dtype
+    if dtype == object or not pandas.api.types.is_string_dtype(dtype):
+        dtype = object
+    if isinstance(values, pandas.Series):
+        return pandas.Series(result, index=values.index, name=values.name,
+                             dtype=dtype)
+    if isinstance(values, pandas.Index):
+        return pandas.Index(result, name=values.name, dtype=dtype)
+    return pandas.array(result, dtype=dtype)
+
+
+def _german_ipa_numpy(values, transcribe):
+    """Transcribe a numpy array column.
+
+    :param numpy.ndarray values: the column of German words
+    :param function transcribe: the period function to apply
+    :returns: the German words' approximate IPA equivalents
+    :rtype: numpy.ndarray
+    :raises TypeError: if values is an array of bytes
+    """
+    import numpy  # pylint: disable=import-error
+
+    if values.dtype.kind == 'S':
+        raise TypeError('german_ipa_column requires str, not bytes; decode '
+                        'the array first, e.g. with numpy.char.decode.')
+    if values.dtype.kind == 'U':
+        uniques, inverse = numpy.unique(values, return_inverse=True)
+        ipas = numpy.array([transcribe(word) for word in uniques.tolist()],
+                           dtype=str)
+        return ipas[inverse].reshape(values.shape)
+
+    # objects are converted & transcribed a block at a time, so that no
+    # list of the whole column is built
+    flat = values.reshape(-1)
+    result = numpy.empty(flat.size, dtype=object)
+    seen = {}
+    for start in range(0, flat.size, _COLUMN_BLOCK):
+        stop = start + _COLUMN_BLOCK
+        result[start:stop] = list(_german_ipa_nullable_iter(
+            flat[start:stop].tolist(), transcribe, seen))
+    return result.reshape(values.shape)
+
+
+TextToken = namedtuple('TextToken', ('text', 'start', 'end', 'ipa'))
+
+# a word is a run of letters, each possibly followed by combining marks (as
+# in decomposed text), possibly with internal apostrophes (Qu'ran)
+_TEXT_LETTERS = r'(?:[^\W\d_][\u0300-\u036f]*)+'
+_TEXT_TOKEN = (r'(' + _TEXT_LETTERS + r"(?:['’]" + _TEXT_LETTERS + r')*)|'
+               r'[\W\d_]+')
+
+
+def german_ipa_tokens(text, period='nhg', words_only=False):
+    """Tokenize running German text and transcribe its words to IPA.
+
+    Words are runs of letters, possibly joined by apostrophes; every other
+    run of characters (whitespace, digits, punctuation) is a non-word token.
+    Tokens are yielded lazily, so text may be an iterator over the chunks of
+    a large file, which is processed in a single pass with memory bounded by
+    the chunk & token lengths. Words split across chunks are reassembled.
+
+    :param str text: a string, or an iterable of strings (chunks of text)
+    :param str period: a period of German, as in german_ipa
+    :param bool words_only: if True, non-word tokens are not yielded
+    :returns: TextTokens of (text, start, end, ipa), where start & end are
+        offsets into the whole text and ipa is None for non-word tokens
+    :rtype: generator
+    :raises ValueError: if period is not a supported period
+
+    >>> for token in german_ipa_tokens('Der Müller, 3x.'):
+    ...     print(token)
+    TextToken(text='Der', start=0, end=3, ipa='der')
+    TextToken(text=' ', start=3, end=4, ipa=None)
+    TextToken(text='Müller', start=4, end=10, ipa='myller')
+    TextToken(text=', 3', start=10, end=13, ipa=None)
+    TextToken(text='x', start=13, end=14, ipa='ks')
+    TextToken(text='.', start=14, end=15, ipa=None)
+    """
+    transcribe = _period_function(period)
+    if isinstance(text, (str, text_type)):
+        text = (text,)
+    return _german_ipa_token_iter(text, transcribe, words_only)
+
+
+def _german_ipa_token_iter(chunks, transcribe, words_only):
+    """Yield the tokens of chunks of text, as in german_ipa_tokens.
+
+    :param iterable chunks: the chunks of text
+    :param function transcribe: the period function to apply
+    :param bool words_only: if True, non-word tokens are not yielded
+    :returns: TextTokens of (text, start, end, ipa)
+    :rtype: generator
+    """
+    # the transcriptions of the first words seen, bounded so that memory
+    # stays constant over an unbounded stream
+    seen = {}
+    offset = 0
+    carry = ''
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    while chunk is not None:
+        buffer = carry + chunk
+        chunk = next(chunks, None)
+        matches = list(_PATTERNS[_TEXT_TOKEN].finditer(buffer))
+        if chunk is not None and matches:
+            # the last token may continue into the next chunk, e.g. with
+            # the combining marks of its last letter, as may a word followed
+            # only by an apostrophe
+            keep = 1
+            if (len(matches) > 1 and matches[-2].group(1) and
+                    matches[-1].group() in ("'", '’')):
+                keep = 2
+            carry = buffer[matches[-keep].start():]
+            matches = matches[:-keep]
+        else:
+            carry = ''
+        for match in matches:
+            word = match.group(1)
+            if word:
+                ipa = seen.get(word)
+                if ipa is None:
+                    ipa = transcribe(word)
+                    if len(seen) < 1 << 16:
+                        seen[word] = ipa
+            elif words_only:
+                continue
+            else:
+                ipa = None
+            yield TextToken(match.group(), offset + match.start(),
+                            offset + match.end(), ipa)
+        offset += len(buffer) - len(carry)
+
+
+def german_ipa_text(text, period='nhg'):
+    """Transcribe the words of running German text to IPA.
+
+    Non-word tokens are passed through unchanged.
+
+    :param str text: the German text
+    :param str period: a period of German, as in german_ipa
+    :returns: the text, with each word replaced by its approximate IPA
+    :rtype: str
+
+    >>> german_ipa_text('Der Müller, 3x.')
+    'der myller, 3ks.'
+    """
+    return ''.join(token.text if token.ipa is None else token.ipa
+                   for token in german_ipa_tokens(text, period))
+
+
+class IncrementalTranscriber(object):
+    """Transcribe a word to IPA incrementally, as its characters arrive.
+
+    No rule examines more than the preceding character and a few following
+    ones, so the transcription of a prefix is final once enough further
+    characters have arrived. feed() returns that finalized IPA as soon as it
+    is determined, and only the undetermined window is kept as state.
+    flush() ends the word, returning the rest of its IPA.
+
+    The concatenated output of feed() & flush() equals german_ipa on the
+    whole word.
+
+    >>> transcriber = IncrementalTranscriber()
+    >>> [transcriber.feed(char) for char in 'Tschechi']
+    ['', '', '', '', '', 'tʃ', '', '']
+    >>> transcriber.peek()
+    'eçi'
+    >>> transcriber.feed('en') + transcriber.flush()
+    'eçin'
+    """
+
+    def __init__(self, period='nhg'):
+        """Initialize IncrementalTranscriber.
+
+        :param str period: a period of German, as in german_ipa
+        """
+        _period_function(period)
+        self.period = period.lower()
+        self._table, self._macrons = _TABLES[self.period]
+        self._raw = ''
+        self._buffer = ''
+        self._pos = 0
+
+    def reset(self):
+        """Discard the current word, without transcribing its remainder."""
+        self._raw = ''
+        self._buffer = ''
+        self._pos = 0
+
+    def _normalize(self, raw):
+        """Normalize raw input, as the period function would.
+
+        :param str raw: the raw input
+        :returns: the normalized input
+        :rtype: str
+        """
+        word = _normalize(raw)
+        if self._macrons:
+            word = word.translate(_CIRCUMFLEX_TO_MACRON)
+        return word
+
+    def feed(self, chars):
+        """Add characters to the word and return any newly finalized IPA.
+
+        :param str chars: the next characters of the word
+        :returns: the IPA that has become final
+        :rtype: str
+        """
+        raw = self._raw + chars
+        # combining characters may yet compose with the last starter, so
+        # input is normalized only up to the last starter
+        start = len(raw) - 1
+        while start > 0 and unicodedata.combining(raw[start]):
+            start -= 1
+        self._raw = raw[max(start, 0):]
+        self._buffer += self._normalize(raw[:max(start, 0)])
+
+        stop = len(self._buffer) - self._table[2] + 1
+        if stop <= self._pos:
+            return ''
+        ipa, pos = _transcribe_span(self._buffer, self._table, self._pos,
+                                    stop)
+        # retain the preceding character, for rules' left contexts
+        self._buffer = self._buffer[pos - 1:]
+        self._pos = 1
+        return ipa
+
+    def peek(self):
+        """Return the IPA of the rest of the word, were it to end now.
+
+        :returns: the IPA of the characters not yet finalized
+        :rtype: str
+        """
+        buffer = self._buffer + self._normalize(self._raw)
+        return _transcribe_span(buffer, self._table, self._pos,
+                                len(buffer))[0]
+
+    def flush(self):
+        """End the word and return the rest of its IPA.
+
+        :returns: the IPA of the characters not yet finalized
+        :rtype: str
+        """
+        ipa = self.peek()
+        self.reset()
+        return ipa
+
+
+RuleStats = namedtuple('RuleStats', ('period', 'graphemes', 'left', 'right',
+                                     'ipa', 'firings', 'chars', 'time'))
+
+
+# the uninstrumented engine & the active profiles, most recently started last
+_ENGINE = _transcribe_span  # pylint: disable=invalid-name
+_active_profiles = []  # pylint: disable=invalid-name
+
+
+class RuleProfile(object):
+    """Rule-level instrumentation of the transcription engine.
+
+    While a profile is active, every transcription runs through an
+    instrumented copy of the engine, which counts each rule's firings & the
+    characters it consumes and, if timing is on, the time spent matching &
+    applying it. The uninstrumented engine is restored on stopping, so
+    profiling costs nothing when inactive.
+
+    A rule is identified by its period, graphemes, left & right contexts, and
+    IPA. Characters that match no rule are counted under a rule of that
+    character with IPA None. Cached transcriptions (see enable_cache) and
+    those made in worker processes do not run the engine and are not counted;
+    transcriptions that german_ipa_periods shares between periods are counted
+    under the period that computed them.
+
+    When several profiles are active, only the one most recently started is
+    updated; stopping it resumes the one started before it, whatever order
+    the profiles are stopped in.
+
+    >>> with RuleProfile() as profile:
+    ...     _ = nhg_ipa('Schach')
+    >>> [(rule.graphemes, rule.ipa, rule.firings) for rule in profile.stats()]
+    [('SCH', 'ʃ', 1), ('CH', 'x', 1), ('A', 'a', 1)]
+    """
+
+    def __init__(self, timing=False):
+        """Initialize RuleProfile.
+
+        :param bool timing: if True, also record the time spent on each rule
+            and in each period's engine
+        """
+        self.timing = timing
+        import threading
+
+        self._lock = threading.Lock()
+        # the periods of compiled tables, by id, found as they are used
+        self._periods = {}
+        self._rules = {}
+        self._totals = {}
+
+    def start(self):
+        """Start collecting, by installing the instrumented engine.
+
+        :raises RuntimeError: if this profile is already active
+        """
+        global _transcribe_span  # pylint: disable=global-statement
+        if self in _active_profiles:
+            raise RuntimeError('This profile is already active.')
+        _active_profiles.append(self)
+        _transcribe_span = self._transcribe_span
+
+    def stop(self):
+        """Stop collecting.
+
+        The engine of the most recently started profile still active is
+        restored, or else the uninstrumented engine.
+        """
+        global _transcribe_span  # pylint: disable=global-statement
+        if self in _active_profiles:
+            _active_profiles.remove(self)
+            # pylint: disable-next=protected-access
+            _transcribe_span = (_active_profiles[-1]._transcribe_span
+                                if _active_profiles else _ENGINE)
+
+    def clear(self):
+        """Discard the collected counts & times."""
+        with self._lock:
+            self._rules.clear()
+            self._totals.clear()
+
+    def _transcribe_span(self, word, table, pos, stop):
+        """Transcribe part of a word, as _transcribe_span, counting rules.
+
+        :param str word: the normalized (upper-case) word
+        :param tuple table: a compiled rule table, as returned by
+            _compile_rules
+        :param int pos: the position at which to begin
+        :param int stop: the position before which the last rule must be
+            applied
+        :returns: the IPA of the span & the position following it
+        :rtype: tuple
+        """
+        timing = self.timing
+        begin = pos
+        if timing:
+            span_start = default_timer()
+        simple, dispatch = table[:2]
+        ipa = []
+        fired = []
+        while pos < stop:
+            if timing:
+                rule_start = default_timer()
+            char = word[pos]
+            if char in simple:
+                rule = (char, '', (), simple[char])
+                size = 1
+            else:
+                rule, size = _match_rule(word, dispatch.get(char, ()), pos)
+            ipa.append(rule[3] or '')
+            pos += size
+            fired.append((rule, size,
+                          default_timer() - rule_start if timing else 0.0))
+
+        self._record(table, fired, pos - begin,
+                     default_timer() - span_start if timing else 0.0)
+        return ''.join(ipa), pos
+
+    def _record(self, table, fired, chars, elapsed):
+        """Add the rules fired in transcribing a span to the counts.
+
+        :param tuple table: the compiled rule table of the span
+        :param list fired: the (rule, size, seconds) of each rule fired
+        :param int chars: the number of characters transcribed
+        :param float elapsed: the time taken to transcribe the span
+        """
+        period = self._periods.get(id(table))
+        if period is None:
+            self._periods = {id(_TABLES[name][0]): name
+                             for name in _PERIOD_RULES if name in _TABLES}
+            period = self._periods.get(id(table), '')
+        with self._lock:
+            for rule, size, seconds in fired:
+                counts = self._rules.setdefault((period,) + rule, [0, 0, 0.0])
+                counts[0] += 1
+                counts[1] += size
+                counts[2] += seconds
+            totals = self._totals.setdefault(period, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += chars
+            totals[2] += elapsed
+
+    def stats(self, period=None):
+        """Return the statistics of each rule that fired.
+
+        :param str period: if given, only this period's rules are returned
+        :returns: RuleStats tuples, most frequently fired first
+        :rtype: list
+        """
+        with self._lock:
+            stats = [RuleStats(*(rule + tuple(counts)))
+                     for rule, counts in self._rules.items()
+                     if period is None or rule[0] == period.lower()]
+        stats.sort(key=lambda rule: (-rule.firings, -rule.chars))
+        return stats
+
+    def period_totals(self):
+        """Return the totals of each period's engine.
+
+        :returns: for each period, a dict of the engine calls, the characters
+            consumed, and the time spent (0.0 unless timing)
+        :rtype: dict
+        """
+        with self._lock:
+            return {period: {'calls': calls, 'chars': chars, 'time': seconds}
+                    for period, (calls, chars, seconds)
+                    in self._totals.items()}
+
+    def as_dict(self):
+        """Return the collected statistics as plain, JSON-serializable data.
+
+        :returns: for each period, its totals, as in period_totals, and a
+            'rules' list of dicts of each rule's statistics
+        :rtype: dict
+        """
+        result = self.period_totals()
+        for totals in result.values():
+            totals['rules'] = []
+        for rule in self.stats():
+            entry = rule._asdict()
+            entry['right'] = list(rule.right)
+            result[entry.pop('period')]['rules'].append(dict(entry))
+        return result
+
+    def report(self, limit=20):
+        """Return a text report of the most frequently fired rules.
+
+        :param int limit: the number of rules to list, per period
+        :returns: the report
+        :rtype: str
+        """
+        lines = []
+        totals = self.period_totals()
+        for period in sorted(totals, key=lambda name: -totals[name]['chars']):
+            lines.append('{}: {} calls, {} chars, {:.6f} s'.format(
+                period, totals[period]['calls'], totals[period]['chars'],
+                totals[period]['time']))
+            for rule in self.stats(period)[:limit]:
+                context = '{}_{}'.format(rule.left, ''.join(
+                    '[{}]'.format(chars) for chars in rule.right))
+                lines.append('  {:<8} {:<24} {:<6} {:>10} {:>10} {:>12.6f}'
+                             .format(rule.graphemes, context,
+                                     '-' if rule.ipa is None else rule.ipa,
+                                     rule.firings, rule.chars, rule.time))
+        return '\n'.join(lines)
+
+    def __enter__(self):
+        """Enter a context, starting the profile.
+
+        :returns: the profile
+        :rtype: RuleProfile
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        """Exit a context, stopping the profile.
+
+        :param args: the exception details, if any
+        """
+        self.stop()
+
+
+def ipa_phonemes(ipa):
+    """Split a transcription into its phonemes.
+
+    Affricates (e.g. tʃ) and diphthongs (e.g. øy) are single phonemes, and
+    the length mark (ː) belongs to the preceding phoneme.
+
+    :param str ipa: a transcription, as returned by german_ipa
+    :returns: the phonemes of the transcription
+    :rtype: list
+
+    >>> ipa_phonemes('tʃeçin')
+    ['tʃ', 'e', 'ç', 'i', 'n']
+    >>> ipa_phonemes('løvenbrøy')
+    ['l', 'ø', 'v', 'e', 'n', 'b', 'r', 'øy']
+    >>> ipa_phonemes('xuːs')
+    ['x', 'uː', 's']
+    """
+    phonemes = []
+    length = len(ipa)
+    pos = 0
+    while pos < length:
+        size = 2 if ipa[pos:pos + 2] in _MULTIGRAPH_PHONEMES else 1
+        if ipa[pos + size:pos + size + 1] == 'ː':
+            size += 1
+        phonemes.append(ipa[pos:pos + size])
+        pos += size
+    return phonemes
+
+
+def phoneme_inventory(period='nhg'):
+    """Return the phoneme inventory of a period.
+
+    :param str period: a period of German, as in german_ipa
+    :returns: the phonemes that may occur in the period's transcriptions;
+        the index of each is its ID in encoded transcriptions
+    :rtype: tuple
+    :raises ValueError: if period is not a supported period
+
+    >>> phoneme_inventory('mhg')[:6]
+    ('p', 'b', 't', 'd', 'k', 'g')
+    >>> len(phoneme_inventory('nhg')), len(phoneme_inventory('mhg'))
+    (37, 52)
+    """
+    _period_function(period)
+    return _PHONEME_INVENTORIES[period.lower()]
+
+
+def ipa_encode(ipa, period='nhg'):
+    """Encode a transcription as the IDs of its phonemes.
+
+    Each phoneme, as split by ipa_phonemes, is encoded as a single byte: its
+    index in the period's phoneme inventory. So encoded transcriptions are
+    compact, compare & hash as quickly as bytes do, and may be compared
+    phoneme by phoneme with functions on sequences, such as levenshtein.
+
+    :param str ipa: a transcription, as returned by german_ipa for period
+    :param str period: a period of German, as in german_ipa
+    :returns: the phoneme IDs of the transcription
+    :rtype: bytes
+    :raises ValueError: if period is not a supported period, or if ipa has
+        a phoneme not in the period's inventory
+
+    >>> list(ipa_encode('tʃeçin'))
+    [8, 25, 15, 26, 19]
+    >>> list(ipa_encode('xuːs', 'mhg'))
+    [16, 35, 13]
+    """
+    _period_function(period)
     period = period.lower()
-    if period not in period_map:
+    ids = _PHONEME_IDS[period]
+    try:
+        return bytes(bytearray([ids[phoneme] for phoneme in
+                                _PATTERNS[_PHONEME_TOKEN].findall(ipa)]))
+    except KeyError as err:
+        raise ValueError('{!r} is not in the {} phoneme inventory.'
+                         .format(err.args[0], period))
+
+
+def ipa_decode(codes, period='nhg'):
+    """Decode the phoneme IDs of a transcription, as from ipa_encode.
+
+    :param bytes codes: the phoneme IDs; a bytearray, an array('B'), or
+        another iterable of IDs may also be used
+    :param str period: a period of German, as in german_ipa
+    :returns: the transcription
+    :rtype: str
+    :raises ValueError: if period is not a supported period, or if an ID is
+        not in the period's inventory
+
+    >>> ipa_decode(ipa_encode('tʃeçin'))
+    'tʃeçin'
+    >>> ipa_decode([16, 35, 13], 'mhg')
+    'xuːs'
+    """
+    inventory = phoneme_inventory(period)
+    try:
+        return ''.join([inventory[code] for code in bytearray(codes)])
+    except IndexError:
+        raise ValueError('The phoneme IDs must be less than {}.'
+                         .format(len(inventory)))
+
+
+def _period_function(period):
+    """Return the transcription function for a period.
+
+    :param str period: a period of German, as in german_ipa
+    :returns: the period's transcription function
+    :rtype: function
+    :raises ValueError: if period is not a supported period
+    """
+    try:
+        return _PERIODS[period.lower()]
+    except KeyError:
         raise ValueError('Value of period must be one of ' +
-                         ', '.join(period_map.keys()))
-    else:
-        return period_map[period](word)
+                         ', '.join(_PERIODS.keys()))
 
 
 def nhg_ipa(word):
@@ -95,181 +1847,7 @@ def nhg_ipa(word):
     >>> nhg_ipa('Tschechien')
     'tʃeçin'
     """
-    # pylint: disable=too-many-branches
-    _vowels = frozenset('AEIOUYÄÖÜ')
-
-    word = unicodedata.normalize('NFKC', text_type(word.upper()))
-    word = word.replace('ß', 'SS')
-
-    # word = ''.join([c for c in word if c in
-    #                 frozenset('ABCDEFGIKLMNOPQRSTUVXYZ')])
-
-    ipa = ''
-    last = len(word)-1
-    skip = 0
-    for i in range(len(word)):
-        if skip:
-            skip -= 1
-            continue
-
-        # Consonants
-        if word[i] in frozenset('BFJKLMR'):
-            ipa += word[i].lower()
-        elif word[i] == 'C':
-            if word[i:i+2] == 'CH':
-                if word[i:i+3] == 'CHS':
-                    ipa += 'ks'
-                    skip = 2
-                elif word[i:i+4] == 'CHEN':
-                    ipa += 'ç'
-                    skip = 1
-                elif i-1 >= 0 and word[i-1] in frozenset('AOU'):
-                    ipa += 'x'
-                    skip = 1
-                else:
-                    ipa += 'ç'
-                    skip = 1
-            elif word[i:i+2] == 'CK':
-                ipa += 'k'
-                skip = 1
-            elif i != last and word[i+1] in frozenset('ÄEI'):
-                ipa += 'ts'
-            else:
-                ipa += 'k'
-        elif word[i] == 'D':
-            if word[i:i+4] == 'DSCH':
-                ipa += 'dʒ'
-                skip = 3
-            elif word[i:i+2] == 'DT':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 'd'
-        elif word[i] == 'G':
-            if i-1 >= 0 and word[i-1] == 'I':
-                ipa += 'ç'
-            else:
-                ipa += 'g'
-        elif word[i] == 'H':
-            # H after vowels should already be covered by the vowel rules
-            ipa += 'h'
-        elif word[i] == 'N':
-            if word[i:i+2] == 'NG':
-                ipa += 'ŋ'
-                skip = 1
-            elif word[i:i+2] == 'NK':
-                ipa += 'ŋk'
-                skip = 1
-            else:
-                ipa += 'n'
-        elif word[i] == 'P':
-            if word[i:i+2] == 'PH':
-                ipa += 'f'
-                skip = 1
-            else:
-                ipa += 'p'
-        elif word[i] == 'Q':
-            if word[i:i+2] == 'QU' and i+1 != last and word[i+2] in _vowels:
-                ipa += 'kv'
-                skip = 1
-            else:
-                ipa += 'k'
-        elif word[i] == 'S':
-            if word[i:i+2] == 'SS':
-                ipa += 's'
-                skip = 1
-            elif word[i:i+3] == 'SCH':
-                ipa += 'ʃ'
-                skip = 2
-            elif i == 0 and i != last and word[i+1] in frozenset('PT'):
-                ipa += 'ʃ'
-            elif i != last and word[i+1] in _vowels:
-                ipa += 'z'
-            else:
-                ipa += 's'
-        elif word[i] == 'T':
-            if word[i:i+4] == 'TSCH':
-                ipa += 'tʃ'
-                skip = 3
-            elif word[i:i+5] == 'TZSCH':
-                ipa += 'tʃ'
-                skip = 4
-            elif (word[i:i+4] == 'TION' or word[i:i+4] == 'TIÄR' or
-                  word[i:i+4] == 'TIAL' or word[i:i+5] == 'TIELL'):
-                ipa += 'tsi'
-                skip = 1
-            elif word[i:i+2] == 'TZ':
-                ipa += 'ts'
-                skip = 1
-            elif word[i:i+2] == 'TH':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 't'
-        elif word[i] == 'V':
-            ipa += 'f'
-        elif word[i] == 'W':
-            ipa += 'v'
-        elif word[i] == 'X':
-            ipa += 'ks'
-        elif word[i] == 'Z':
-            if word[i:i+4] == 'ZSCH':
-                ipa += 'tʃ'
-                skip = 3
-            else:
-                ipa += 'ts'
-
-        # Vowels -- little attention is paid to length or tenseness
-        # -Diphthongs first
-        elif word[i:i+2] in frozenset(['EI', 'AI', 'EY', 'AY']):
-            ipa += 'ai'
-            skip = 1
-        elif word[i:i+2] in frozenset(['EU', 'ÄU']):
-            ipa += 'øy'
-            skip = 1
-        elif word[i:i+2] == 'AU':
-            ipa += 'au'
-            skip = 1
-
-        # -Monophthongs following
-        elif word[i] == 'A':
-            if word[i:i+2] in frozenset(['AA', 'AH']):
-                skip = 1
-            ipa += 'a'
-        elif word[i] == 'E':
-            if word[i:i+2] in frozenset(['EE', 'EH']):
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'I':
-            if word[i:i+2] in frozenset(['IE', 'IH']):
-                skip = 1
-            if word[i:i+3] == 'IEH':
-                skip = 2
-            ipa += 'i'
-        elif word[i] == 'O':
-            if word[i:i+2] in frozenset(['OO', 'OH']):
-                skip = 1
-            ipa += 'o'
-        elif word[i] == 'U':
-            if word[i:i+2] == 'UH':
-                skip = 1
-            ipa += 'u'
-        elif word[i] == 'Y':
-            ipa += 'y'
-        elif word[i] == 'Ä':
-            if word[i:i+2] == 'ÄH':
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'Ö':
-            if word[i:i+2] == 'ÖH':
-                skip = 1
-            ipa += 'ø'
-        elif word[i] == 'Ü':
-            if word[i:i+2] == 'ÜH':
-                skip = 1
-            ipa += 'y'
-
-    return ipa
+    return _ipa('nhg', word)
 
 
 def enhg_ipa(word):
@@ -281,181 +1859,7 @@ def enhg_ipa(word):
     :returns: the ENHG word's approximate IPA equivalent
     :rtype: str
     """
-    # pylint: disable=too-many-branches
-    _vowels = frozenset('AEIOUYÄÖÜ')
-
-    word = unicodedata.normalize('NFKC', text_type(word.upper()))
-    word = word.replace('ß', 'SS')
-
-    # word = ''.join([c for c in word if c in
-    #                 frozenset('ABCDEFGIKLMNOPQRSTUVXYZ')])
-
-    ipa = ''
-    last = len(word)-1
-    skip = 0
-    for i in range(len(word)):
-        if skip:
-            skip -= 1
-            continue
-
-        # Consonants
-        if word[i] in frozenset('BFJKLMR'):
-            ipa += word[i].lower()
-        elif word[i] == 'C':
-            if word[i:i+2] == 'CH':
-                if word[i:i+3] == 'CHS':
-                    ipa += 'ks'
-                    skip = 2
-                elif word[i:i+4] == 'CHEN':
-                    ipa += 'ç'
-                    skip = 1
-                elif i-1 >= 0 and word[i-1] in frozenset('AOU'):
-                    ipa += 'x'
-                    skip = 1
-                else:
-                    ipa += 'ç'
-                    skip = 1
-            elif word[i:i+2] == 'CK':
-                ipa += 'k'
-                skip = 1
-            elif i != last and word[i+1] in frozenset('ÄEI'):
-                ipa += 'ts'
-            else:
-                ipa += 'k'
-        elif word[i] == 'D':
-            if word[i:i+4] == 'DSCH':
-                ipa += 'dʒ'
-                skip = 3
-            elif word[i:i+2] == 'DT':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 'd'
-        elif word[i] == 'G':
-            if i-1 >= 0 and word[i-1] == 'I':
-                ipa += 'ç'
-            else:
-                ipa += 'g'
-        elif word[i] == 'H':
-            # H after vowels should already be covered by the vowel rules
-            ipa += 'h'
-        elif word[i] == 'N':
-            if word[i:i+2] == 'NG':
-                ipa += 'ŋ'
-                skip = 1
-            elif word[i:i+2] == 'NK':
-                ipa += 'ŋk'
-                skip = 1
-            else:
-                ipa += 'n'
-        elif word[i] == 'P':
-            if word[i:i+2] == 'PH':
-                ipa += 'f'
-                skip = 1
-            else:
-                ipa += 'p'
-        elif word[i] == 'Q':
-            if word[i:i+2] == 'QU' and i+1 != last and word[i+2] in _vowels:
-                ipa += 'kv'
-                skip = 1
-            else:
-                ipa += 'k'
-        elif word[i] == 'S':
-            if word[i:i+2] == 'SS':
-                ipa += 's'
-                skip = 1
-            elif word[i:i+3] == 'SCH':
-                ipa += 'ʃ'
-                skip = 2
-            elif i == 0 and i != last and word[i+1] in frozenset('PT'):
-                ipa += 'ʃ'
-            elif i != last and word[i+1] in _vowels:
-                ipa += 'z'
-            else:
-                ipa += 's'
-        elif word[i] == 'T':
-            if word[i:i+4] == 'TSCH':
-                ipa += 'tʃ'
-                skip = 3
-            elif word[i:i+5] == 'TZSCH':
-                ipa += 'tʃ'
-                skip = 4
-            elif (word[i:i+4] == 'TION' or word[i:i+4] == 'TIÄR' or
-                  word[i:i+4] == 'TIAL' or word[i:i+5] == 'TIELL'):
-                ipa += 'tsi'
-                skip = 1
-            elif word[i:i+2] == 'TZ':
-                ipa += 'ts'
-                skip = 1
-            elif word[i:i+2] == 'TH':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 't'
-        elif word[i] == 'V':
-            ipa += 'f'
-        elif word[i] == 'W':
-            ipa += 'v'
-        elif word[i] == 'X':
-            ipa += 'ks'
-        elif word[i] == 'Z':
-            if word[i:i+4] == 'ZSCH':
-                ipa += 'tʃ'
-                skip = 3
-            else:
-                ipa += 'ts'
-
-        # Vowels -- little attention is paid to length or tenseness
-        # -Diphthongs first
-        elif word[i:i+2] in frozenset(['EI', 'AI', 'EY', 'AY']):
-            ipa += 'ai'
-            skip = 1
-        elif word[i:i+2] in frozenset(['EU', 'ÄU']):
-            ipa += 'øy'
-            skip = 1
-        elif word[i:i+2] == 'AU':
-            ipa += 'au'
-            skip = 1
-
-        # -Monophthongs following
-        elif word[i] == 'A':
-            if word[i:i+2] in frozenset(['AA', 'AH']):
-                skip = 1
-            ipa += 'a'
-        elif word[i] == 'E':
-            if word[i:i+2] in frozenset(['EE', 'EH']):
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'I':
-            if word[i:i+2] in frozenset(['IE', 'IH']):
-                skip = 1
-            if word[i:i+3] == 'IEH':
-                skip = 2
-            ipa += 'i'
-        elif word[i] == 'O':
-            if word[i:i+2] in frozenset(['OO', 'OH']):
-                skip = 1
-            ipa += 'o'
-        elif word[i] == 'U':
-            if word[i:i+2] == 'UH':
-                skip = 1
-            ipa += 'u'
-        elif word[i] == 'Y':
-            ipa += 'y'
-        elif word[i] == 'Ä':
-            if word[i:i+2] == 'ÄH':
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'Ö':
-            if word[i:i+2] == 'ÖH':
-                skip = 1
-            ipa += 'ø'
-        elif word[i] == 'Ü':
-            if word[i:i+2] == 'ÜH':
-                skip = 1
-            ipa += 'y'
-
-    return ipa
+    return _ipa('enhg', word)
 
 
 def mhg_ipa(word):
@@ -467,206 +1871,7 @@ def mhg_ipa(word):
     :returns: the ENHG word's approximate IPA equivalent
     :rtype: str
     """
-    # pylint: disable=too-many-branches
-    _vowels = frozenset('AEIOUYÄÖÜÆŒĀĒĪŌŪË')
-
-    word = unicodedata.normalize('NFKC', text_type(word.upper()))
-    word = word.replace('ß', 'SS')
-
-    for ch_from, ch_to in zip('ÂÊÎÔÛ', 'ĀĒĪŌŪ'):
-        word = word.replace(ch_from, ch_to)
-
-    # word = ''.join([c for c in word if c in
-    #                 frozenset('ABCDEFGIKLMNOPQRSTUVXYZ')])
-
-    ipa = ''
-    last = len(word)-1
-    skip = 0
-    for i in range(len(word)):
-        if skip:
-            skip -= 1
-            continue
-
-        # Consonants
-        if word[i] in frozenset('BFJKLMRW'):
-            ipa += word[i].lower()
-        elif word[i] == 'C':
-            if word[i:i+2] == 'CH':
-                ipa += 'x'
-                skip = 1
-            elif word[i:i+2] == 'CK':
-                ipa += 'k'
-                skip = 1
-            else:
-                ipa += 'k'
-        elif word[i] == 'D':
-            if word[i:i+4] == 'DSCH':
-                ipa += 'dʒ'
-                skip = 3
-            elif word[i:i+2] == 'DT':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 'd'
-        elif word[i] == 'G':
-            if i-1 >= 0 and word[i-1] == 'I':
-                ipa += 'g'
-            else:
-                ipa += 'g'
-        elif word[i] == 'H':
-            if word[i-1:i] in _vowels and word[i+1:i+2] in _vowels:
-                ipa += 'h'
-            else:
-                ipa += 'x'
-        elif word[i] == 'N':
-            if word[i:i+2] == 'NG':
-                ipa += 'ŋg'
-                skip = 1
-            elif word[i:i+2] == 'NK':
-                ipa += 'ŋk'
-                skip = 1
-            else:
-                ipa += 'n'
-        elif word[i] == 'P':
-            if word[i:i+2] == 'PH':
-                ipa += 'pf'
-                skip = 1
-            else:
-                ipa += 'p'
-        elif word[i] == 'Q':
-            if word[i:i+2] == 'QU' and i+1 != last and word[i+2] in _vowels:
-                ipa += 'kv'
-                skip = 1
-            else:
-                ipa += 'k'
-        elif word[i] == 'S':
-            if word[i:i+2] == 'SS':
-                ipa += 's'
-                skip = 1
-            elif word[i:i+3] == 'SCH':
-                ipa += 'ʃ'
-                skip = 2
-            elif word[i:i+2] in frozenset(['SC', 'SK']):
-                ipa += 'ʃ'
-                skip = 1
-            elif i == 0 and i != last and word[i+1] in frozenset('PT'):
-                ipa += 'ʃ'
-            elif i != last and word[i+1] in _vowels:
-                ipa += 'z'
-            else:
-                ipa += 's'
-        elif word[i] == 'T':
-            if word[i:i+4] == 'TSCH':
-                ipa += 'tʃ'
-                skip = 3
-            elif word[i:i+5] == 'TZSCH':
-                ipa += 'tʃ'
-                skip = 4
-            elif (word[i:i+4] == 'TION' or word[i:i+4] == 'TIÄR' or
-                  word[i:i+4] == 'TIAL' or word[i:i+5] == 'TIELL'):
-                ipa += 'tsi'
-                skip = 1
-            elif word[i:i+2] == 'TZ':
-                ipa += 'ts'
-                skip = 1
-            elif word[i:i+2] == 'TH':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 't'
-        elif word[i] == 'V':
-            ipa += 'f'
-        elif word[i] == 'X':
-            ipa += 'ks'
-        elif word[i] == 'Z':
-            if word[i:i+4] == 'ZSCH':
-                ipa += 'tʃ'
-                skip = 3
-            else:
-                ipa += 'ts'
-
-        # Vowels -- little attention is paid to length or tenseness
-        # -Diphthongs first
-        elif word[i:i+2] in frozenset(['EI', 'EY']):
-            ipa += 'ei'
-            skip = 1
-        elif word[i:i+2] in frozenset(['AI', 'AY']):
-            ipa += 'ai'
-            skip = 1
-        elif word[i:i+2] == 'IE':
-            ipa += 'ie'
-            skip = 1
-        elif word[i:i+2] == 'AU':
-            ipa += 'au'
-            skip = 1
-        elif word[i:i+2] == 'ÜE':
-            ipa += 'yu'
-            skip = 1
-        elif word[i:i+2] in frozenset(['ÖU', 'EU', 'OI']):
-            ipa += 'øy'
-            skip = 1
-
-        # -Monophthongs following
-        elif word[i:i+2] == 'IU':
-            skip = 1
-            ipa += 'yː'
-        elif word[i:i+2] == 'AE':
-            skip = 1
-            ipa += 'ɛː'
-        elif word[i:i+2] == 'OE':
-            skip = 1
-            ipa += 'øː'
-        elif word[i] == 'Ā':
-            ipa += 'aː'
-        elif word[i:i+2] == 'AA':
-            skip = 1
-            ipa += 'aː'
-        elif word[i] == 'A':
-            ipa += 'a'
-        elif word[i] == 'Ē':
-            ipa += 'eː'
-        elif word[i:i+2] == 'EE':
-            skip = 1
-            ipa += 'eː'
-        elif word[i] == 'E':
-            ipa += 'e'
-        elif word[i] == 'Ī':
-            ipa += 'iː'
-        elif word[i:i+2] == 'II':
-            skip = 1
-            ipa += 'iː'
-        elif word[i] == 'I':
-            ipa += 'i'
-        elif word[i] == 'Ō':
-            ipa += 'oː'
-        elif word[i:i+2] == 'OO':
-            skip = 1
-            ipa += 'oː'
-        elif word[i] == 'O':
-            ipa += 'o'
-        elif word[i] == 'Ū':
-            ipa += 'uː'
-        elif word[i:i+2] == 'UU':
-            skip = 1
-            ipa += 'uː'
-        elif word[i] == 'U':
-            ipa += 'u'
-        elif word[i] == 'Y':
-            ipa += 'y'
-        elif word[i] == 'Æ':
-            ipa += 'ɛː'
-        elif word[i] == 'Ä':
-            ipa += 'ɛ'
-        elif word[i] == 'Œ':
-            ipa += 'øː'
-        elif word[i] == 'Ö':
-            ipa += 'ø'
-        elif word[i] == 'Ü':
-            ipa += 'y'
-        elif word[i] == 'Ë':
-            ipa += 'ɛ'
-
-    return ipa
+    return _ipa('mhg', word)
 
 
 def ohg_ipa(word):
@@ -678,181 +1883,10 @@ def ohg_ipa(word):
     :returns: the ENHG word's approximate IPA equivalent
     :rtype: str
     """
-    # pylint: disable=too-many-branches
-    _vowels = frozenset('AEIOUĀĒĪŌŪË')
-
-    word = unicodedata.normalize('NFKC', text_type(word.upper()))
-    word = word.replace('ß', 'SS')
-
-    for ch_from, ch_to in zip('ÂÊÎÔÛ', 'ĀĒĪŌŪ'):
-        word = word.replace(ch_from, ch_to)
-
-    # word = ''.join([c for c in word if c in
-    #                 frozenset('ABCDEFGIKLMNOPQRSTUVXYZ')])
-
-    ipa = ''
-    last = len(word)-1
-    skip = 0
-    for i in range(len(word)):
-        if skip:
-            skip -= 1
-            continue
-
-        # Consonants
-        if word[i] in frozenset('BFJKLMR'):
-            ipa += word[i].lower()
-        elif word[i] == 'C':
-            if word[i:i+2] == 'CH':
-                if word[i:i+3] == 'CHS':
-                    ipa += 'ks'
-                    skip = 2
-                elif word[i:i+4] == 'CHEN':
-                    ipa += 'ç'
-                    skip = 1
-                elif i-1 >= 0 and word[i-1] in frozenset('AOU'):
-                    ipa += 'x'
-                    skip = 1
-                else:
-                    ipa += 'ç'
-                    skip = 1
-            elif word[i:i+2] == 'CK':
-                ipa += 'k'
-                skip = 1
-            elif i != last and word[i+1] in frozenset('ÄEI'):
-                ipa += 'ts'
-            else:
-                ipa += 'k'
-        elif word[i] == 'D':
-            if word[i:i+4] == 'DSCH':
-                ipa += 'dʒ'
-                skip = 3
-            elif word[i:i+2] == 'DT':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 'd'
-        elif word[i] == 'G':
-            if i-1 >= 0 and word[i-1] == 'I':
-                ipa += 'ç'
-            else:
-                ipa += 'g'
-        elif word[i] == 'H':
-            # H after vowels should already be covered by the vowel rules
-            ipa += 'h'
-        elif word[i] == 'N':
-            if word[i:i+2] == 'NG':
-                ipa += 'ŋ'
-                skip = 1
-            elif word[i:i+2] == 'NK':
-                ipa += 'ŋk'
-                skip = 1
-            else:
-                ipa += 'n'
-        elif word[i] == 'P':
-            if word[i:i+2] == 'PH':
-                ipa += 'f'
-                skip = 1
-            else:
-                ipa += 'p'
-        elif word[i] == 'Q':
-            if word[i:i+2] == 'QU' and i+1 != last and word[i+2] in _vowels:
-                ipa += 'kv'
-                skip = 1
-            else:
-                ipa += 'k'
-        elif word[i] == 'S':
-            if word[i:i+2] == 'SS':
-                ipa += 's'
-                skip = 1
-            elif word[i:i+3] == 'SCH':
-                ipa += 'ʃ'
-                skip = 2
-            elif i == 0 and i != last and word[i+1] in frozenset('PT'):
-                ipa += 'ʃ'
-            elif i != last and word[i+1] in _vowels:
-                ipa += 'z'
-            else:
-                ipa += 's'
-        elif word[i] == 'T':
-            if word[i:i+4] == 'TSCH':
-                ipa += 'tʃ'
-                skip = 3
-            elif word[i:i+5] == 'TZSCH':
-                ipa += 'tʃ'
-                skip = 4
-            elif (word[i:i+4] == 'TION' or word[i:i+4] == 'TIÄR' or
-                  word[i:i+4] == 'TIAL' or word[i:i+5] == 'TIELL'):
-                ipa += 'tsi'
-                skip = 1
-            elif word[i:i+2] == 'TZ':
-                ipa += 'ts'
-                skip = 1
-            elif word[i:i+2] == 'TH':
-                ipa += 't'
-                skip = 1
-            else:
-                ipa += 't'
-        elif word[i] == 'V':
-            ipa += 'f'
-        elif word[i] == 'W':
-            ipa += 'v'
-        elif word[i] == 'X':
-            ipa += 'ks'
-        elif word[i] == 'Z':
-            if word[i:i+4] == 'ZSCH':
-                ipa += 'tʃ'
-                skip = 3
-            else:
-                ipa += 'ts'
+    return _ipa('ohg', word)
 
-        # Vowels -- little attention is paid to length or tenseness
-        # -Diphthongs first
-        elif word[i:i+2] in frozenset(['EI', 'AI', 'EY', 'AY']):
-            ipa += 'ai'
-            skip = 1
-        elif word[i:i+2] in frozenset(['EU', 'ÄU']):
-            ipa += 'øy'
-            skip = 1
-        elif word[i:i+2] == 'AU':
-            ipa += 'au'
-            skip = 1
 
-        # -Monophthongs following
-        elif word[i] == 'A':
-            if word[i:i+2] in frozenset(['AA', 'AH']):
-                skip = 1
-            ipa += 'a'
-        elif word[i] == 'E':
-            if word[i:i+2] in frozenset(['EE', 'EH']):
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'I':
-            if word[i:i+2] in frozenset(['IE', 'IH']):
-                skip = 1
-            if word[i:i+3] == 'IEH':
-                skip = 2
-            ipa += 'i'
-        elif word[i] == 'O':
-            if word[i:i+2] in frozenset(['OO', 'OH']):
-                skip = 1
-            ipa += 'o'
-        elif word[i] == 'U':
-            if word[i:i+2] == 'UH':
-                skip = 1
-            ipa += 'u'
-        elif word[i] == 'Y':
-            ipa += 'y'
-        elif word[i] == 'Ä':
-            if word[i:i+2] == 'ÄH':
-                skip = 1
-            ipa += 'e'
-        elif word[i] == 'Ö':
-            if word[i:i+2] == 'ÖH':
-                skip = 1
-            ipa += 'ø'
-        elif word[i] == 'Ü':
-            if word[i:i+2] == 'ÜH':
-                skip = 1
-            ipa += 'y'
-
-    return ipa
+_PERIODS = OrderedDict((('nhg', nhg_ipa),
+                        ('enhg', enhg_ipa),
+                        ('mhg', mhg_ipa),
+                        ('ohg', ohg_ipa)))
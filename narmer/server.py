@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+r"""narmer.server.
+
+The server module implements the narmer-server command, a local transcription
+service, so that a single warm process, with a single cache, can serve all
+of the transcription requests on a host:
+
+    $ narmer-server --port 8414
+    $ curl -d '{"words": ["Müller", "Hûs"], "period": "mhg"}' \
+        localhost:8414/transcribe
+    {"ipa": ["myller", "xuːs"]}
+
+The service speaks HTTP/1.1, over TCP or a Unix socket, with these endpoints:
+
+    - POST /transcribe -- the body is a JSON object with either a list of
+      "words" or a single "word", and optionally a "period" (default: nhg);
+      the response is a JSON object with the "ipa" of each word, in order
+    - GET /stats -- the response is a JSON object of the service's
+      statistics, including its p50 & p99 request latencies
+
+Words not in the cache are queued; concurrent requests are coalesced into
+micro-batches of up to max_batch_size words, waiting up to max_wait seconds
+for a batch to fill, and each batch is transcribed in an executor, so the
+event loop stays responsive. The queue is bounded: when it is full, requests
+wait for room, which slows their clients; requests that cannot be queued
+within queue_timeout seconds are refused with status 503.
+
+This module requires Python 3.7 or later; on earlier versions, the
+narmer-server command exits with an error.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from timeit import default_timer
+
+from .phonetic import IPACache, _period_function
+from .stats import RunningStats
+
+_EXECUTORS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large',
+            503: 'Service Unavailable'}
+
+
+class OverloadedError(Exception):
+    """Raised when a request cannot be queued within the queue timeout."""
+
+
+def _transcribe_batch(batch):
+    """Transcribe a batch of requests, in an executor.
+
+    :param list batch: (period, words) pairs
+    :returns: for each pair, the IPA of its words
+    :rtype: list
+    """
+    results = []
+    seen = {}
+    for period, words in batch:
+        transcribe = _period_function(period)
+        ipas = []
+        for word in words:
+            key = (period, word)
+            ipa = seen.get(key)
+            if ipa is None:
+                ipa = seen[key] = transcribe(word)
+            ipas.append(ipa)
+        results.append(ipas)
+    return results
+
+
+class TranscriptionServer(object):
+    """An asyncio transcription service with micro-batching.
+
+    Use transcribe to make requests directly, or start to serve them over
+    HTTP. Statistics are accumulated from start until close.
+    """
+
+    def __init__(self, max_batch_size=256, max_wait=0.002, max_queue=1024,
+                 queue_timeout=5.0, workers=1, executor='thread',
+                 cache_size=65536, max_body=1 << 20):
+        """Initialize TranscriptionServer.
+
+        :param int max_batch_size: the greatest number of words per batch
+            (a single larger request forms a batch of its own)
+        :param float max_wait: the greatest time, in seconds, that a batch
+            waits to fill
+        :param int max_queue: the greatest number of queued requests
+        :param float queue_timeout: the greatest time, in seconds, that a
+            request waits to be queued, or None to wait indefinitely
+        :param int workers: the number of batches transcribed concurrently,
+            and of executor workers
+        :param str executor: 'thread' or 'process'
+        :param int cache_size: the maximum number of transcriptions to cache
+        :param int max_body: the greatest request body size, in bytes
+        :raises ValueError: if executor is not a supported executor
+        """
+        if executor not in _EXECUTORS:
+            raise ValueError('Value of executor must be one of process, '
+                             'thread')
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.workers = workers
+        self.max_body = max_body
+        self._executor_type = _EXECUTORS[executor]
+        self._cache = IPACache(cache_size)
+        self._executor = None
+        self._queue = None
+        self._tasks = []
+        self._servers = []
+        self._reset_stats()
+
+    def _reset_stats(self):
+        """Reset the statistics."""
+        self._latency = RunningStats(relative_accuracy=0.01)
+        self._batch_sizes = RunningStats()
+        self._requests = 0
+        self._words = 0
+        self._rejected = 0
+
+    async def start(self, host='127.0.0.1', port=8414, path=None):
+        """Start the batch workers and, if asked, serve HTTP.
+
+        :param str host: the host to listen on, for TCP
+        :param int port: the port to listen on, or None not to listen on TCP
+        :param str path: the path of a Unix socket to listen on, if any
+        :returns: the listening sockets
+        :rtype: list
+        """
+        if self._executor_type is ProcessPoolExecutor:
+            # forked workers would inherit, and hold open, the connections
+            self._executor = ProcessPoolExecutor(
+                self.workers, multiprocessing.get_context('spawn'))
+        else:
+            self._executor = ThreadPoolExecutor(self.workers)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._reset_stats()
+        self._tasks = [asyncio.ensure_future(self._batch_worker())
+                       for _ in range(self.workers)]
+        if port is not None:
+            self._servers.append(await asyncio.start_server(
+                self._handle, host, port))
+        if path is not None:
+            self._servers.append(await asyncio.start_unix_server(
+                self._handle, path))
+        return [sock for server in self._servers for sock in server.sockets]
+
+    async def close(self):
+        """Stop serving and stop the batch workers."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def transcribe(self, words, period='nhg'):
+        """Transcribe words, via the cache & the batch queue.
+
+        :param list words: the German words to transcribe to IPA
+        :param str period: a period of German, as in german_ipa
+        :returns: the words' approximate IPA equivalents
+        :rtype: list
+        :raises ValueError: if period is not a supported period
+        :raises OverloadedError: if the request cannot be queued in time
+        """
+        start = default_timer()
+        _period_function(period)
+        period = period.lower()
+        ipas = [self._cache.get(period, word) for word in words]
+        misses = list({word: None for word, ipa in zip(words, ipas)
+                       if ipa is None})
+        if misses:
+            future = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(
+                    self._queue.put((period, misses, future)),
+                    self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                raise OverloadedError('The request queue is full.')
+            transcribed = dict(zip(misses, await future))
+            for word, ipa in transcribed.items():
+                self._cache.put(period, word, ipa)
+            ipas = [transcribed[word] if ipa is None else ipa
+                    for word, ipa in zip(words, ipas)]
+        self._requests += 1
+        self._words += len(words)
+        self._latency.add(default_timer() - start)
+        return ipas
+
+    async def _batch_worker(self):
+        """Coalesce queued requests into batches and transcribe them."""
+        loop = asyncio.get_running_loop()
+        carried = None
+        while True:
+            # a request that would have overfilled the last batch begins this
+            batch = [carried or await self._queue.get()]
+            carried = None
+            size = len(batch[0][1])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(),
+                                                      timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if size + len(item[1]) > self.max_batch_size:
+                    carried = item
+                    break
+                batch.append(item)
+                size += len(item[1])
+
+            self._batch_sizes.add(size)
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, _transcribe_batch,
+                    [(period, words) for period, words, _ in batch])
+            except Exception as exc:  # pylint: disable=broad-except
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for (_, _, future), ipas in zip(batch, results):
+                    if not future.done():
+                        future.set_result(ipas)
+
+    def stats(self):
+        """Return the statistics of the service.
+
+        :returns: the numbers of requests, words, rejected requests, and
+            queued requests; the request latency summary, in seconds; the
+            batch size summary; and the cache statistics (summaries are as
+            from RunningStats.summary, but with None for NaN)
+        :rtype: dict
+        """
+        summaries = {}
+        for name, stats in (('latency', self._latency),
+                            ('batch_size', self._batch_sizes)):
+            # JSON has no NaN, as for the stdev of fewer than 2 samples
+            summaries[name] = {
+                key: None if isinstance(value, float) and math.isnan(value)
+                else value for key, value in stats.summary().items()}
+        return {'requests': self._requests,
+                'words': self._words,
+                'rejected': self._rejected,
+                'queued': self._queue.qsize() if self._queue else 0,
+                'latency': summaries['latency'],
+                'batch_size': summaries['batch_size'],
+                'cache': self._cache.info()._asdict()}
+
+    async def _respond(self, request):
+        """Respond to an HTTP request.
+
+        :param tuple request: the method, target, and body of the request
+        :returns: the status & the response object
+        :rtype: tuple
+        """
+        method, target, body = request
+        target = target.split('?', 1)[0]
+        if target == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'Use GET.'}
+            return 200, self.stats()
+        if target != '/transcribe':
+            return 404, {'error': 'Not found.'}
+        if method != 'POST':
+            return 405, {'error': 'Use POST.'}
+
+        try:
+            query = json.loads(body.decode('utf-8'))
+            if 'words' in query:
+                words = query['words']
+            else:
+                words = [query['word']]
+            period = query.get('period', 'nhg')
+            if not (isinstance(words, list) and
+                    all(isinstance(word, str) for word in words) and
+                    isinstance(period, str)):
+                raise TypeError
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return 400, {'error': 'The body must be a JSON object with a '
+                                  'list of "words" or a "word", and '
+                                  'optionally a "period".'}
+        try:
+            return 200, {'ipa': await self.transcribe(words, period)}
+        except ValueError as exc:
+            return 400, {'error': str(exc)}
+        except OverloadedError as exc:
+            return 503, {'error': str(exc)}
+
+    async def _handle(self, reader, writer):
+        """Serve the HTTP requests of a connection.
+
+        :param asyncio.StreamReader reader: the connection's reader
+        :param asyncio.StreamWriter writer: the connection's writer
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if not header.strip():
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0) or 0)
+                if length > self.max_body:
+                    await self._write(writer, 413, {'error': 'Too large.'},
+                                      False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = (headers.get('connection', '').lower() !=
+                              'close' and version == 'HTTP/1.1')
+                status, result = await self._respond((method, target, body))
+                await self._write(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer, status, result, keep_alive):
+        """Write an HTTP response.
+
+        :param asyncio.StreamWriter writer: the connection's writer
+        :param int status: the status code
+        :param dict result: the response object
+        :param bool keep_alive: whether to keep the connection open
+        """
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        head = ('HTTP/1.1 {} {}\r\n'
+                'Content-Type: application/json; charset=utf-8\r\n'
+                'Content-Length: {}\r\n'
+                'Connection: {}\r\n\r\n').format(
+                    status, _REASONS[status], len(body),
+                    'keep-alive' if keep_alive else 'close')
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def _serve(server, args):
+    """Serve until cancelled.
+
+    :param TranscriptionServer server: the server
+    :param argparse.Namespace args: the command line arguments
+    """
+    sockets = await server.start(args.host, None if args.unix else args.port,
+                                 args.unix)
+    for sock in sockets:
+        sys.stderr.write('Serving on {}\n'.format(sock.getsockname()))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """Run the narmer-server command.
+
+    :param list argv: the command line arguments (default: sys.argv[1:])
+    :returns: the exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog='narmer-server',
+        description='Serve German to IPA transcription over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='host to listen on (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8414,
+                        help='TCP port to listen on (default: 8414)')
+    parser.add_argument('-u', '--unix', metavar='PATH',
+                        help='Unix socket to listen on, instead of TCP')
+    parser.add_argument('--max-batch-size', type=int, default=256,
+                        help='words per batch (default: 256)')
+    parser.add_argument('--max-wait', type=float, default=2.0,
+                        help='ms a batch waits to fill (default: 2)')
+    parser.add_argument('--max-queue', type=int, default=1024,
+                        help='queued requests (default: 1024)')
+    parser.add_argument('--queue-timeout', type=float, default=5.0,
+                        help='s a request waits to be queued (default: 5)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='concurrent batches (default: 1)')
+    parser.add_argument('--executor', default='thread',
+                        choices=sorted(_EXECUTORS),
+                        help='executor type (default: thread)')
+    parser.add_argument('--cache-size', type=int, default=65536,
+                        help='transcriptions cached (default: 65536)')
+    args = parser.parse_args(argv)
+
+    server = TranscriptionServer(args.max_batch_size, args.max_wait / 1000,
+                                 args.max_queue, args.queue_timeout,
+                                 args.workers, args.executor,
+                                 args.cache_size)
+    try:
+        asyncio.run(_serve(server, args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.sharedcache.
+
+The sharedcache module implements SharedIPACache, a transcription cache in
+shared memory, which all of the processes on a host can read and add to, so
+that, e.g., the workers of a prefork web server warm and hold a single cache
+rather than one each:
+
+    >>> from narmer.phonetic import disable_cache, enable_cache, german_ipa
+    >>> cache = SharedIPACache(maxsize=1024)
+    >>> _ = enable_cache(cache=cache)
+    >>> german_ipa('Kohl')
+    'kol'
+    >>> other = SharedIPACache(cache.name)  # e.g., in another process
+    >>> other.get('nhg', 'Kohl')
+    'kol'
+    >>> other.close()
+    >>> disable_cache()
+    >>> cache.close()
+    >>> cache.unlink()
+
+Create the cache before forking workers, or attach to it by name in each
+worker, and install it in each with enable_cache(cache=...).
+
+The cache is a fixed-size hash table of maxsize slots of slot_size bytes,
+grouped into sets of ways consecutive slots. A (period, word) key hashes to
+one set, and is stored in the set's first empty slot or else in place of its
+least recently used entry, as recorded by a clock shared by all processes.
+So the memory used is fixed, and eviction is LRU within each set. Entries
+whose UTF-8 encoded period, word, and IPA exceed slot_size - 24 bytes are
+not cached.
+
+No locks are taken: each slot is guarded by a sequence number, which is odd
+while the slot is being written, and a checksum of its contents, so that a
+reader never returns an entry torn by a concurrent writer, but treats it as
+a miss. Concurrent writers to the same slot may lose one of their entries.
+
+This module requires Python 3.8 or later.
+"""
+
+from __future__ import unicode_literals
+
+import struct
+import time
+from zlib import crc32
+
+from .phonetic import CacheInfo
+
+_MAGIC = b'NARMSHM'
+_VERSION = 1
+# magic, version, number of slots, slot size, ways, clock; the block is
+# only shared within a host, so native byte order is used throughout
+_HEADER = struct.Struct('=7sBIIII')
+_CLOCK = 5
+_ARENA = 16
+# each slot begins with 6 words: its sequence number, stamp, key tag,
+# checksum, key length, and value length
+_SLOT_WORDS = 6
+_MASK = 0xFFFFFFFF
+
+
+def _attach(name):
+    """Attach to an existing shared memory block, without owning it.
+
+    :param str name: the name of the shared memory block
+    :returns: the shared memory block
+    :rtype: multiprocessing.shared_memory.SharedMemory
+    """
+    from multiprocessing import shared_memory
+
+    try:
+        # pylint: disable-next=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # before Python 3.13, attaching registers the block with the resource
+    # tracker, which would unlink it when this process exits; unregistering
+    # it instead would also unregister it for the creator, if the two share
+    # a tracker, so registration is suppressed
+    tracker = getattr(shared_memory, 'resource_tracker', None)
+    if tracker is None:
+        return shared_memory.SharedMemory(name)
+    register = tracker.register
+    tracker.register = _no_register
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        tracker.register = register
+
+
+def _no_register(name, rtype):  # pylint: disable=unused-argument
+    """Register nothing with the resource tracker.
+
+    :param str name: the name of the resource
+    :param str rtype: the type of the resource
+    """
+
+
+class SharedIPACache(object):
+    """A bounded transcription cache in shared memory.
+
+    The cache provides the get & put methods of IPACache, so it can be
+    installed with enable_cache(cache=...). The hits, misses, and evictions
+    it counts are those of the current process.
+    """
+
+    def __init__(self, name=None, maxsize=65536, slot_size=128, ways=8):
+        """Initialize SharedIPACache.
+
+        If a shared memory block with the given name exists, the cache
+        attaches to it, and its size, slot_size, and ways are those with
+        which it was created; otherwise, a block is created, which this
+        cache owns.
+
+        :param str name: the name of the shared memory block; if None, a new
+            block is created with a unique name
+        :param int maxsize: the number of slots, which is rounded up to a
+            multiple of ways
+        :param int slot_size: the size of each slot, in bytes
+        :param int ways: the number of slots in each set
+        :raises ValueError: if maxsize or ways is not positive, if slot_size
+            is not a multiple of 4 of at least 32, or if the block is not a
+            cache
+        """
+        from multiprocessing import shared_memory
+
+        if maxsize < 1 or ways < 1:
+            raise ValueError('maxsize and ways must be positive integers.')
+        if slot_size < 32 or slot_size % 4:
+            raise ValueError('slot_size must be a multiple of 4 of at least '
+                             '32.')
+
+        slots = -(-maxsize // ways) * ways
+        try:
+            self._shm = shared_memory.SharedMemory(
+                name, create=True, size=4 * _ARENA + slots * slot_size)
+        except FileExistsError:
+            self._shm = _attach(name)
+            self._owner = False
+        else:
+            self._owner = True
+            # the magic is written last, as it marks the header complete
+            _HEADER.pack_into(self._shm.buf, 0, b'\0' * 7, _VERSION, slots,
+                              slot_size, ways, 0)
+            self._shm.buf[:len(_MAGIC)] = _MAGIC
+        self._buf = self._shm.buf
+        self._words = None
+
+        # wait for the creator of the block, if another process, to write
+        # its header
+        deadline = time.time() + 1
+        while True:
+            magic, version, slots, slot_size, ways, _ = _HEADER.unpack_from(
+                self._buf)
+            if magic == _MAGIC or time.time() > deadline:
+                break
+            time.sleep(0.001)
+        if magic != _MAGIC or version != _VERSION or not slots or \
+                len(self._buf) < 4 * _ARENA + slots * slot_size:
+            self.close()
+            raise ValueError('{} is not a version {} cache.'
+                             .format(name, _VERSION))
+
+        self.name = self._shm.name
+        self.maxsize = slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self._sets = slots // ways
+        self._capacity = slot_size - 4 * _SLOT_WORDS
+        # indexing a view of words is much faster than struct
+        self._words = self._buf[:4 * _ARENA + slots * slot_size].cast('I')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, period, word):
+        """Return the cached transcription of word, or None.
+
+        :param str period: a (lower-case) period of German
+        :param str word: the German word
+        :returns: the cached IPA, or None if it is not cached
+        :rtype: str
+        """
+        key = (period + '\0' + word).encode('utf-8')
+        tag = crc32(key)
+        step = self.slot_size >> 2
+        first = _ARENA + (tag % self._sets) * self.ways * step
+        words = self._words
+        for slot in range(first, first + self.ways * step, step):
+            if words[slot + 2] != tag or words[slot + 4] != len(key):
+                continue
+            sequence = words[slot]
+            if sequence & 1:
+                continue
+            start = (slot + _SLOT_WORDS) << 2
+            data = self._buf[start:start + len(key) +
+                             words[slot + 5]].tobytes()
+            # the entry is valid only if no writer began meanwhile
+            if words[slot] != sequence or crc32(data) != words[slot + 3] or \
+                    data[:len(key)] != key:
+                continue
+            words[slot + 1] = words[_CLOCK]
+            self.hits += 1
+            return data[len(key):].decode('utf-8')
+        self.misses += 1
+        return None
+
+    def put(self, period, word, ipa):
+        """Add a transcription to the cache, evicting the set's LRU entry.
+
+        Transcriptions too large for a slot are not added.
+
+        :param str period: a (lower-case) period of German
+        :param str word: the German word
+        :param str ipa: the word's IPA transcription
+        """
+        key = (period + '\0' + word).encode('utf-8')
+        data = key + ipa.encode('utf-8')
+        if len(data) > self._capacity:
+            return
+        tag = crc32(key)
+        step = self.slot_size >> 2
+        first = _ARENA + (tag % self._sets) * self.ways * step
+        words = self._words
+        clock = words[_CLOCK] = (words[_CLOCK] + 1) & _MASK
+
+        target = empty = None
+        oldest, oldest_age = first, -1
+        for slot in range(first, first + self.ways * step, step):
+            start = (slot + _SLOT_WORDS) << 2
+            if not words[slot + 4]:
+                if empty is None:
+                    empty = slot
+            elif words[slot + 2] == tag and words[slot + 4] == len(key) and \
+                    self._buf[start:start + len(key)] == key:
+                target = slot
+                break
+            elif (clock - words[slot + 1]) & _MASK > oldest_age:
+                oldest, oldest_age = slot, (clock - words[slot + 1]) & _MASK
+        if target is None:
+            target = empty
+        if target is None:
+            target = oldest
+            self.evictions += 1
+
+        sequence = words[target] = words[target] | 1
+        words[target + 1] = clock
+        words[target + 2] = tag
+        words[target + 3] = crc32(data)
+        words[target + 4] = len(key)
+        words[target + 5] = len(data) - len(key)
+        start = (target + _SLOT_WORDS) << 2
+        self._buf[start:start + len(data)] = data
+        words[target] = (sequence + 1) & _MASK
+
+    def clear(self):
+        """Remove all entries and reset this process's counters."""
+        zeros = bytes(self.slot_size * self.ways)
+        for start in range(4 * _ARENA, len(self._words) * 4, len(zeros)):
+            self._buf[start:start + len(zeros)] = zeros
+        self._words[_CLOCK] = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return the cache's statistics.
+
+        :returns: this process's hits, misses, and evictions; the number of
+            slots; and the current number of entries
+        :rtype: CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self))
+
+    def close(self):
+        """Detach this process from the shared memory block."""
+        if self._words is not None:
+            self._words.release()
+        self._words = self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the shared memory block, once all processes detach.
+
+        This should be called once, by the process that created the cache.
+        """
+        self._shm.unlink()
+
+    def __len__(self):
+        """Return the number of cached entries.
+
+        This scans every slot.
+
+        :returns: the number of cached entries
+        :rtype: int
+        """
+        return sum(1 for length in
+                   self._words[_ARENA + 4::self.slot_size >> 2] if length)
+
+    def __reduce__(self):
+        """Return the arguments with which to attach to the cache by name.
+
+        :returns: the class & the cache's name
+        :rtype: tuple
+        """
+        return self.__class__, (self.name,)
+
+    def __enter__(self):
+        """Enter a context.
+
+        :returns: the cache
+        :rtype: SharedIPACache
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Exit a context, detaching, and unlinking if this cache created it.
+
+        :param args: the exception details, if any
+        """
+        self.close()
+        if self._owner:
+            self.unlink()
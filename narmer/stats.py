@@ -21,18 +21,42 @@
 The stats module defines functions for calculating various statistical data
 about linguistic objects, including:
 
-    - Weissman score calculation
+    - Weissman score calculation, for scalars or arrays
+    - compression benchmarking, with compression_benchmark, which measures
+      the ratios & times of compressors and scores them
+    - bootstrap confidence intervals of Weissman scores, with
+      weissman_bootstrap
+    - streaming statistics, with RunningStats & QuantileSketch, which
+      summarize samples without keeping them, and merge
 """
 
 from __future__ import division, unicode_literals
 
+import io
 import math
+import numbers
 import sys
+import time
+from collections import OrderedDict, namedtuple
+from functools import partial
+from itertools import chain
+from timeit import default_timer
+
+if sys.version_info[0] < 3:  # pragma: no cover
+    from six import text_type
+    from six.moves import range  # pylint: disable=redefined-builtin
+else:
+    text_type = str  # pylint: disable=invalid-name
 
 
 def weissman(r_tar, t_tar, r_src, t_src, alpha=1.0):
     r"""Calculate Weissman score based on entered statistics.
 
+    Any of the arguments may be an array or sequence, in which case the
+    arguments are broadcast against each other, as by numpy, and an array of
+    scores is returned; this requires numpy. Each score is identical to the
+    score of the corresponding scalar arguments.
+
     The score is:
     :math:`W = α \\cdot \\frac{r_{tar}}{r_{src}} \\cdot
     \\frac{log t_{src}}{log t_{tar}}`
@@ -48,8 +72,10 @@ def weissman(r_tar, t_tar, r_src, t_src, alpha=1.0):
     :param float r_src: a standard algorithm's compression ratio
     :param float t_src: a standard algorithm's compression time
     :param float alpha: a scaling constant (1.0 by default)
-    :returns: the Weissman score
-    :rtype: float
+    :returns: the Weissman score, or an array of scores
+    :rtype: float or numpy.ndarray
+    :raises ValueError: if any time or ratio is not positive; for arrays, the
+        message gives the (broadcast) indices of the invalid values
 
     >>> weissman(1, 1, 1, 1)
     1.0
@@ -61,7 +87,13 @@ def weissman(r_tar, t_tar, r_src, t_src, alpha=1.0):
     2.0
     >>> weissman(1.2, 1.6, 4.8, 5, alpha=2)
     1.7121547710354226
+    >>> weissman([1, 1.2], [1, 1.6], [1, 4.8], 5).tolist()
+    [7248263982714164.0, 0.8560773855177113]
     """
+    if not all(isinstance(arg, numbers.Number)
+               for arg in (r_tar, t_tar, r_src, t_src, alpha)):
+        return _weissman_array(r_tar, t_tar, r_src, t_src, alpha)
+
     if t_tar <= 0 or t_src <= 0:
         raise ValueError('Compression times must be positive values.')
     elif r_tar <= 0 or r_src <= 0:
@@ -75,3 +107,919 @@ def weissman(r_tar, t_tar, r_src, t_src, alpha=1.0):
     if r_src == r_tar:
         return alpha * (math.log(t_src) / math.log(t_tar))
     return alpha * (r_tar / r_src) * (math.log(t_src) / math.log(t_tar))
+
+
+def _invalid_indices(invalid):
+    """Describe the indices at which a boolean array is True.
+
+    :param numpy.ndarray invalid: a boolean array
+    :returns: the first ten indices, as ints for 1-D arrays or tuples
+        otherwise, followed by '...' if there are more
+    :rtype: str
+    """
+    import numpy  # pylint: disable=import-error
+
+    indices = numpy.argwhere(invalid)
+    if invalid.ndim == 1:
+        described = [str(index[0]) for index in indices[:10]]
+    else:
+        described = [str(tuple(index.tolist())) for index in indices[:10]]
+    if len(indices) > 10:
+        described.append('...')
+    return ', '.join(described)
+
+
+def _weissman_array(r_tar, t_tar, r_src, t_src, alpha):
+    """Calculate Weissman scores of broadcast arrays of statistics.
+
+    Logarithms are taken with math.log, whose results numpy.log does not
+    always match in the last place, so that each score is identical to the
+    one the scalar calculation gives. The logarithms are taken before
+    broadcasting, so a scalar baseline time costs one call.
+
+    :param r_tar: the target algorithms' compression ratios
+    :param t_tar: the target algorithms' compression times
+    :param r_src: the standard algorithms' compression ratios
+    :param t_src: the standard algorithms' compression times
+    :param alpha: the scaling constants
+    :returns: the Weissman scores
+    :rtype: numpy.ndarray
+    :raises ValueError: if any time or ratio is not positive
+    """
+    import numpy  # pylint: disable=import-error
+
+    r_tar, t_tar, r_src, t_src, alpha = (
+        numpy.asarray(arg, dtype=numpy.float64)
+        for arg in (r_tar, t_tar, r_src, t_src, alpha))
+    shape = numpy.broadcast(r_tar, t_tar, r_src, t_src, alpha).shape
+    for message, values in (
+            ('Compression times must be positive values.', (t_tar, t_src)),
+            ('Compression ratios must be positive values.', (r_tar, r_src))):
+        invalid = numpy.zeros(shape, dtype=bool)
+        for value in values:
+            invalid |= value <= 0
+        if invalid.any():
+            raise ValueError('{} Invalid at indices: {}'.format(
+                message, _invalid_indices(invalid)))
+
+    # if t_tar == 1, add epsilon to avoid division by log(1) = 0
+    log_tar = numpy.where(t_tar == 1, 1 + sys.float_info.epsilon, t_tar)
+    log_tar, log_src = (
+        numpy.fromiter((math.log(time) for time in times.ravel().tolist()),
+                       dtype=numpy.float64, count=times.size)
+        .reshape(times.shape) for times in (log_tar, t_src))
+
+    ratios = alpha * (r_tar / r_src)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        scores = ratios * (log_src / log_tar)
+    return numpy.where(t_src == t_tar, ratios, scores)
+
+
+class _OneShot(object):
+    """A compressor object that applies a one-shot function on flush."""
+
+    def __init__(self, func):
+        """Initialize _OneShot.
+
+        :param function func: a function compressing bytes to bytes
+        """
+        self._func = func
+        self._chunks = []
+
+    def compress(self, data):
+        """Buffer data.
+
+        :param bytes data: the next chunk of input
+        :returns: no output
+        :rtype: bytes
+        """
+        self._chunks.append(bytes(data))
+        return b''
+
+    def flush(self):
+        """Compress the buffered input.
+
+        :returns: the compressed input
+        :rtype: bytes
+        """
+        data = b''.join(self._chunks)
+        del self._chunks[:]
+        return self._func(data)
+
+
+def one_shot(func):
+    """Adapt a one-shot compression function for compression_benchmark.
+
+    The corpus is buffered in memory & passed to func whole, so the time
+    measured includes only the call of func, but the corpus must fit in
+    memory.
+
+    :param function func: a function compressing bytes to bytes
+    :returns: a compressor factory, as expected by compression_benchmark
+    :rtype: function
+    """
+    return lambda: _OneShot(func)
+
+
+def _compressors():
+    """Return COMPRESSORS, building it when first used.
+
+    COMPRESSORS maps the names of the standard library's compressors (zlib,
+    bz2, and lzma, where available) to their factories; the compression
+    modules are imported only when it is first used.
+
+    :returns: the compressor factories, by name
+    :rtype: OrderedDict
+    """
+    compressors = globals().get('COMPRESSORS')
+    if compressors is None:
+        import bz2
+        import zlib
+
+        compressors = OrderedDict((('zlib', zlib.compressobj),
+                                   ('bz2', bz2.BZ2Compressor)))
+        try:
+            import lzma
+        except ImportError:  # pragma: no cover
+            pass
+        else:
+            compressors['lzma'] = lzma.LZMACompressor
+        globals()['COMPRESSORS'] = compressors
+    return compressors
+
+
+def __getattr__(name):
+    """Return a lazily built attribute, i.e. COMPRESSORS.
+
+    :param str name: the attribute name
+    :returns: the attribute
+    :raises AttributeError: if there is no such attribute
+    """
+    if name == 'COMPRESSORS':
+        return _compressors()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module __getattr__ (PEP 562) is unavailable, so build eagerly
+    COMPRESSORS = _compressors()
+
+_CLOCKS = {'wall': default_timer,
+           'cpu': (time.process_time if hasattr(time, 'process_time')
+                   else time.clock)}  # pylint: disable=no-member
+
+CompressionResult = namedtuple('CompressionResult', (
+    'codec', 'size', 'compressed_size', 'ratio', 'time', 'times', 'weissman'))
+
+
+class _Corpus(object):
+    """A re-readable source of corpus chunks."""
+
+    def __init__(self, corpus, chunk_size):
+        """Initialize _Corpus.
+
+        :param corpus: bytes, a file path, a binary file object, or an
+            iterable of bytes chunks or of file paths
+        :param int chunk_size: the number of bytes to read at a time
+        """
+        self._chunk_size = chunk_size
+        self._data = None
+        self._paths = None
+        self._file = None
+        self._spool = None
+
+        if isinstance(corpus, (bytes, bytearray, memoryview)):
+            self._data = memoryview(corpus)
+        elif isinstance(corpus, text_type) or hasattr(corpus, '__fspath__'):
+            self._paths = [corpus]
+        elif hasattr(corpus, 'read'):
+            self._file = corpus
+            if not (hasattr(corpus, 'seekable') and corpus.seekable()):
+                self._file = self._spool_chunks(iter(
+                    lambda: corpus.read(chunk_size), b''))
+        else:
+            items = iter(corpus)
+            first = next(items, b'')
+            if isinstance(first, text_type) or hasattr(first, '__fspath__'):
+                self._paths = [first] + list(items)
+            else:
+                self._file = self._spool_chunks(chain((first,), items))
+        if self._file is not None:
+            self._start = self._file.tell()
+
+    def _spool_chunks(self, chunks):
+        """Copy chunks to a temporary file, from which they can be re-read.
+
+        :param iterable chunks: the chunks
+        :returns: the temporary file, positioned at its start
+        :rtype: file
+        """
+        import tempfile
+
+        self._spool = tempfile.TemporaryFile()
+        for chunk in chunks:
+            self._spool.write(chunk)
+        self._spool.seek(0)
+        return self._spool
+
+    def chunks(self):
+        """Yield the chunks of the corpus, from its start.
+
+        :returns: the chunks
+        :rtype: generator
+        """
+        size = self._chunk_size
+        if self._data is not None:
+            for start in range(0, len(self._data), size):
+                yield self._data[start:start + size]
+        elif self._paths is not None:
+            for path in self._paths:
+                with io.open(path, 'rb') as corpusfile:
+                    for chunk in iter(partial(corpusfile.read, size), b''):
+                        yield chunk
+        else:
+            self._file.seek(self._start)
+            for chunk in iter(partial(self._file.read, size), b''):
+                yield chunk
+
+    def close(self):
+        """Remove the temporary copy of the corpus, if any."""
+        if self._spool is not None:
+            self._spool.close()
+
+
+def _compress(factory, corpus, clock):
+    """Compress a corpus, timing only the compressor.
+
+    :param function factory: a compressor factory
+    :param _Corpus corpus: the corpus
+    :param function clock: the clock to time with
+    :returns: the corpus size, the compressed size, and the time taken
+    :rtype: tuple
+    """
+    size = compressed = 0
+    elapsed = 0.0
+    compressor = factory()
+    for chunk in corpus.chunks():
+        size += len(chunk)
+        start = clock()
+        compressed += len(compressor.compress(chunk))
+        elapsed += clock() - start
+    start = clock()
+    compressed += len(compressor.flush())
+    elapsed += clock() - start
+    return size, compressed, elapsed
+
+
+def _ratio(size, compressed):
+    """Return a compression ratio.
+
+    :param int size: the uncompressed size
+    :param int compressed: the compressed size
+    :returns: the ratio of the sizes
+    :rtype: float
+    """
+    return size / compressed if compressed else float('inf')
+
+
+def compression_benchmark(corpus, codecs=None, baseline=None, repeats=5,
+                          warmup=1, clock='wall', time_unit=1e-6, alpha=1.0,
+                          chunk_size=1 << 20):
+    """Benchmark compressors on a corpus and score them against a baseline.
+
+    Each codec compresses the whole corpus warmup times untimed and then
+    repeats times timed, and its time is the least of the timed runs. Only
+    the compressor's calls are timed, not the reading of the corpus. The
+    corpus is streamed in chunks; iterators & unseekable files are first
+    copied to a temporary file, so that they can be re-read for each run.
+
+    Codecs are compressor factories, each returning an object with
+    compress(data) & flush() methods, such as zlib.compressobj. The values
+    of COMPRESSORS, i.e. zlib, bz2, and lzma (where available) at their
+    default levels, may be named. Wrap functions compressing bytes to bytes
+    with one_shot.
+
+    The Weissman score depends on the unit of time, and rewards speed only if
+    times exceed one unit, so times are scored in units of time_unit seconds
+    (by default, microseconds).
+
+    :param bytes corpus: bytes, a file path, a binary file object, or an
+        iterable of bytes chunks or of file paths
+    :param list codecs: the names of codecs in COMPRESSORS, or a mapping of
+        names to compressor factories or names in COMPRESSORS (by default, all
+        of COMPRESSORS)
+    :param str baseline: the name of the codec to score against (by default,
+        the first)
+    :param int repeats: the number of timed runs per codec
+    :param int warmup: the number of untimed runs per codec
+    :param str clock: 'wall' for wall-clock time, or 'cpu' for process time
+    :param float time_unit: the unit of time, in seconds, of the times scored
+    :param float alpha: the scaling constant of the Weissman score
+    :param int chunk_size: the number of bytes read from the corpus at a time
+    :returns: a CompressionResult for each codec, in order, giving the
+        compression ratio & the least and all times (in seconds)
+    :rtype: list
+    :raises ValueError: if a codec, the baseline, or the clock is unknown, or
+        repeats is less than 1
+
+    >>> results = compression_benchmark(b'Tschechien ' * 1000, ['zlib', 'bz2'],
+    ...                                 repeats=2)
+    >>> [(result.codec, result.size) for result in results]
+    [('zlib', 11000), ('bz2', 11000)]
+    >>> results[0].weissman
+    1.0
+    """
+    if codecs is None:
+        codecs = _compressors()
+    if not hasattr(codecs, 'items'):
+        codecs = OrderedDict((name, name) for name in codecs)
+    compressors = _compressors()
+    factories = OrderedDict()
+    for name, factory in codecs.items():
+        if isinstance(factory, text_type):
+            if factory not in compressors:
+                raise ValueError('Value of codec must be one of ' +
+                                 ', '.join(compressors))
+            factory = compressors[factory]
+        factories[name] = factory
+    if baseline is None and factories:
+        baseline = next(iter(factories))
+    if baseline not in factories:
+        raise ValueError('The baseline must be one of the codecs.')
+    if clock not in _CLOCKS:
+        raise ValueError('Value of clock must be one of cpu, wall')
+    if repeats < 1:
+        raise ValueError('Value of repeats must be at least 1.')
+
+    source = _Corpus(corpus, chunk_size)
+    measured = OrderedDict()
+    try:
+        for name, factory in factories.items():
+            for _ in range(warmup):
+                _compress(factory, source, _CLOCKS[clock])
+            times = []
+            for _ in range(repeats):
+                size, compressed, elapsed = _compress(factory, source,
+                                                      _CLOCKS[clock])
+                times.append(elapsed)
+            measured[name] = (size, compressed, min(times), tuple(times))
+    finally:
+        source.close()
+
+    base_size, base_compressed, base_time = measured[baseline][:3]
+    results = []
+    for name, (size, compressed, least, times) in measured.items():
+        results.append(CompressionResult(
+            name, size, compressed, _ratio(size, compressed), least, times,
+            weissman(_ratio(size, compressed), max(least / time_unit, 1.0),
+                     _ratio(base_size, base_compressed),
+                     max(base_time / time_unit, 1.0), alpha)))
+    return results
+
+
+def compression_table(results):
+    """Format the results of compression_benchmark as a text table.
+
+    :param list results: CompressionResult tuples
+    :returns: the table
+    :rtype: str
+    """
+    lines = ['{:<12} {:>12} {:>12} {:>8} {:>12} {:>10}'.format(
+        'codec', 'size', 'compressed', 'ratio', 'time (ms)', 'weissman')]
+    for result in results:
+        lines.append('{:<12} {:>12} {:>12} {:>8.3f} {:>12.3f} {:>10.4f}'
+                     .format(result.codec, result.size,
+                             result.compressed_size, result.ratio,
+                             result.time * 1000, result.weissman))
+    return '\n'.join(lines)
+
+
+def _is_numpy(values):
+    """Return True if values is a numpy object.
+
+    :param values: the values
+    :returns: whether values is a numpy object
+    :rtype: bool
+    """
+    return type(values).__module__.partition('.')[0] == 'numpy'
+
+
+class QuantileSketch(object):
+    """A mergeable sketch of a distribution, for estimating its quantiles.
+
+    Values are counted in logarithmically sized buckets, so that each
+    quantile estimate is within a relative error of relative_accuracy of a
+    value of the requested rank, whatever the distribution. The memory used
+    grows with the logarithm of the range of the values, not with their
+    number. Sketches of equal accuracy merge exactly, by adding their
+    counts, so samples may be sketched in separate processes.
+
+    Zero is counted exactly; negative values are sketched like positive ones.
+
+    >>> sketch = QuantileSketch()
+    >>> sketch.update(range(1, 1001))
+    >>> [round(value) for value in sketch.quantiles((0.5, 0.95, 0.99))]
+    [498, 944, 983]
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        """Initialize QuantileSketch.
+
+        :param float relative_accuracy: the bound on the relative error of
+            quantile estimates, between 0 and 1 (exclusive)
+        :raises ValueError: if relative_accuracy is out of range
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('Value of relative_accuracy must be between 0 '
+                             'and 1.')
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zero = 0
+        self.count = 0
+
+    def _key(self, magnitude):
+        """Return the bucket of a positive magnitude.
+
+        :param float magnitude: the magnitude
+        :returns: the bucket key
+        :rtype: int
+        """
+        return int(math.ceil(math.log(magnitude) / self._log_gamma))
+
+    def add(self, value):
+        """Add a sample.
+
+        :param float value: the sample
+        """
+        if value > 0:
+            key = self._key(value)
+            self._positive[key] = self._positive.get(key, 0) + 1
+        elif value < 0:
+            key = self._key(-value)
+            self._negative[key] = self._negative.get(key, 0) + 1
+        elif value == 0:
+            self._zero += 1
+        else:
+            raise ValueError('Samples must not be NaN.')
+        self.count += 1
+
+    def update(self, values):
+        """Add a batch of samples.
+
+        numpy arrays are bucketed with numpy.
+
+        :param iterable values: the samples
+        """
+        if not _is_numpy(values):
+            for value in values:
+                self.add(value)
+            return
+
+        import numpy  # pylint: disable=import-error
+
+        values = numpy.asarray(values, dtype=numpy.float64).ravel()
+        if numpy.isnan(values).any():
+            raise ValueError('Samples must not be NaN.')
+        for buckets, magnitudes in ((self._positive, values[values > 0]),
+                                    (self._negative, -values[values < 0])):
+            keys, counts = numpy.unique(
+                numpy.ceil(numpy.log(magnitudes) / self._log_gamma),
+                return_counts=True)
+            for key, count in zip(keys.astype(numpy.int64).tolist(),
+                                  counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + count
+        self._zero += int((values == 0).sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        """Add the samples of another sketch to this one.
+
+        :param QuantileSketch other: a sketch of equal relative_accuracy
+        :raises ValueError: if the sketches' accuracies differ
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Only sketches of equal relative_accuracy can be '
+                             'merged.')
+        # pylint: disable=protected-access
+        for buckets, others in ((self._positive, other._positive),
+                                (self._negative, other._negative)):
+            for key, count in others.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self._zero += other._zero
+        self.count += other.count
+
+    def _value(self, key):
+        """Return the estimate of the values in a positive bucket.
+
+        :param int key: the bucket key
+        :returns: the estimate
+        :rtype: float
+        """
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantiles(self, quantiles):
+        """Estimate quantiles of the samples.
+
+        The estimate of quantile q is within the relative accuracy of the
+        sample of rank floor(q * (count - 1)), counting from 0.
+
+        :param iterable quantiles: the quantiles, each between 0 and 1
+        :returns: the estimates, in order (None for each if there are no
+            samples)
+        :rtype: list
+        :raises ValueError: if a quantile is out of range
+        """
+        quantiles = list(quantiles)
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError('Quantiles must be between 0 and 1.')
+        if not self.count:
+            return [None] * len(quantiles)
+
+        # buckets in increasing order of value
+        buckets = [(-self._value(key), count) for key, count
+                   in sorted(self._negative.items(), reverse=True)]
+        buckets.append((0.0, self._zero))
+        buckets.extend((self._value(key), count)
+                       for key, count in sorted(self._positive.items()))
+
+        estimates = []
+        for q in quantiles:
+            rank = int(q * (self.count - 1))
+            seen = 0
+            for value, count in buckets:
+                seen += count
+                if seen > rank:
+                    estimates.append(value)
+                    break
+        return estimates
+
+    def quantile(self, q):
+        """Estimate a quantile of the samples.
+
+        :param float q: the quantile, between 0 and 1
+        :returns: the estimate, or None if there are no samples
+        :rtype: float
+        """
+        return self.quantiles((q,))[0]
+
+    def __len__(self):
+        """Return the number of samples.
+
+        :returns: the number of samples
+        :rtype: int
+        """
+        return self.count
+
+
+class RunningStats(object):
+    """Mergeable running statistics of a stream of samples.
+
+    The count, mean & variance are accumulated with Welford's algorithm,
+    and merged, or updated with batches, with the parallel algorithm of
+    Chan et al., so that they are numerically stable without the samples
+    being kept. Minimum & maximum are exact. If relative_accuracy is given,
+    a QuantileSketch of that accuracy is also kept, for p50, p95 & p99.
+
+    Merged statistics equal those of the combined samples, up to floating
+    point rounding.
+
+    >>> stats = RunningStats(relative_accuracy=0.01)
+    >>> stats.add(2)
+    >>> stats.update([4, 4, 4, 5, 5, 7, 9])
+    >>> stats.mean, stats.pvariance, stats.min, stats.max
+    (5.0, 4.0, 2, 9)
+    >>> round(stats.summary()['p50'], 2)
+    4.01
+    """
+
+    def __init__(self, relative_accuracy=None):
+        """Initialize RunningStats.
+
+        :param float relative_accuracy: if given, the relative accuracy of a
+            QuantileSketch of the samples
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = None
+        if relative_accuracy is not None:
+            self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value):
+        """Add a sample.
+
+        :param float value: the sample
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+    def update(self, values):
+        """Add a batch of samples.
+
+        The batch's moments are computed in two passes, with numpy for numpy
+        arrays, and merged.
+
+        :param iterable values: the samples
+        """
+        if _is_numpy(values):
+            import numpy  # pylint: disable=import-error
+
+            values = numpy.asarray(values, dtype=numpy.float64).ravel()
+            if not values.size:
+                return
+            mean = float(values.mean())
+            moments = (len(values), mean, float(((values - mean) ** 2).sum()),
+                       float(values.min()), float(values.max()))
+        else:
+            values = list(values)
+            if not values:
+                return
+            mean = math.fsum(values) / len(values)
+            moments = (len(values), mean,
+                       math.fsum((value - mean) ** 2 for value in values),
+                       min(values), max(values))
+        self._merge_moments(*moments)
+        if self.sketch is not None:
+            self.sketch.update(values)
+
+    def _merge_moments(self, count, mean, m2, minimum, maximum):
+        """Merge the moments of other samples into these statistics.
+
+        :param int count: the number of other samples
+        :param float mean: their mean
+        :param float m2: their sum of squared differences from the mean
+        :param float minimum: their minimum
+        :param float maximum: their maximum
+        """
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        if self.min is None or minimum < self.min:
+            self.min = minimum
+        if self.max is None or maximum > self.max:
+            self.max = maximum
+
+    def merge(self, other):
+        """Add the samples of other statistics to these.
+
+        :param RunningStats other: statistics of other samples
+        :raises ValueError: if only one of the statistics keeps a sketch, or
+            their sketches' accuracies differ
+        """
+        if (self.sketch is None) != (other.sketch is None):
+            raise ValueError('Either both or neither of the statistics must '
+                             'keep a quantile sketch.')
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        self._merge_moments(other.count, other.mean,
+                            other._m2,  # pylint: disable=protected-access
+                            other.min, other.max)
+
+    @property
+    def variance(self):
+        """Return the sample variance.
+
+        :returns: the sample variance, or NaN for fewer than 2 samples
+        :rtype: float
+        """
+        if self.count < 2:
+            return float('nan')
+        return self._m2 / (self.count - 1)
+
+    @property
+    def pvariance(self):
+        """Return the population variance.
+
+        :returns: the population variance, or NaN if there are no samples
+        :rtype: float
+        """
+        if not self.count:
+            return float('nan')
+        return self._m2 / self.count
+
+    @property
+    def stdev(self):
+        """Return the sample standard deviation.
+
+        :returns: the sample standard deviation
+        :rtype: float
+        """
+        return math.sqrt(self.variance)
+
+    def summary(self):
+        """Return a summary of the statistics.
+
+        :returns: the count, mean, stdev, min & max and, if a sketch is kept,
+            p50, p95 & p99, clamped to the exact min & max
+        :rtype: dict
+        """
+        summary = {'count': self.count, 'mean': self.mean,
+                   'stdev': self.stdev, 'min': self.min, 'max': self.max}
+        if self.sketch is not None:
+            for name, value in zip(('p50', 'p95', 'p99'),
+                                   self.sketch.quantiles((0.5, 0.95, 0.99))):
+                if value is not None:
+                    value = min(max(value, self.min), self.max)
+                summary[name] = value
+        return summary
+
+    def __len__(self):
+        """Return the number of samples.
+
+        :returns: the number of samples
+        :rtype: int
+        """
+        return self.count
+
+
+BootstrapInterval = namedtuple('BootstrapInterval', (
+    'score', 'low', 'high', 'confidence', 'resamples'))
+
+_ESTIMATORS = ('mean', 'median', 'min')
+_BOOTSTRAP_BLOCK = 1000
+
+
+def _measurements(ratios, times, name):
+    """Return the measurements of an algorithm as equal-length arrays.
+
+    :param ratios: a compression ratio, or one per run
+    :param times: a compression time, or one per run
+    :param str name: the name of the algorithm, for error messages
+    :returns: the ratios & times, one per run
+    :rtype: tuple
+    :raises ValueError: if the lengths differ or there are no runs
+    """
+    import numpy  # pylint: disable=import-error
+
+    ratios = numpy.atleast_1d(numpy.asarray(ratios, dtype=numpy.float64))
+    times = numpy.atleast_1d(numpy.asarray(times, dtype=numpy.float64))
+    if ratios.ndim != 1 or times.ndim != 1:
+        raise ValueError('The {} measurements must be 1-D.'.format(name))
+    if len(ratios) == 1:
+        ratios = numpy.repeat(ratios, len(times))
+    elif len(times) == 1:
+        times = numpy.repeat(times, len(ratios))
+    if len(ratios) != len(times) or not times.size:
+        raise ValueError('The {} ratios & times must have equal lengths of at '
+                         'least 1.'.format(name))
+    return ratios, times
+
+
+def _estimate(values, estimator):
+    """Apply an estimator along the last axis of an array.
+
+    :param numpy.ndarray values: the values
+    :param str estimator: mean, median, or min
+    :returns: the estimates
+    :rtype: numpy.ndarray
+    """
+    import numpy  # pylint: disable=import-error
+
+    return getattr(numpy, estimator)(values, axis=-1)
+
+
+def _resample(rng, measurements, size, estimator):
+    """Estimate the ratio & time of each of a number of resamples of runs.
+
+    Runs are resampled whole, keeping each ratio with its time.
+
+    :param numpy.random.Generator rng: the random stream
+    :param tuple measurements: the ratios & times of the runs
+    :param int size: the number of resamples
+    :param str estimator: mean, median, or min
+    :returns: the estimated ratios & times
+    :rtype: tuple
+    """
+    ratios, times = measurements
+    indices = rng.integers(0, len(times), (size, len(times)))
+    return (_estimate(ratios[indices], estimator),
+            _estimate(times[indices], estimator))
+
+
+def _bootstrap_block(task):
+    """Compute the Weissman scores of a block of bootstrap resamples.
+
+    :param tuple task: a numpy SeedSequence, the number of resamples, the
+        target & source measurements, alpha, and the estimator
+    :returns: the scores
+    :rtype: numpy.ndarray
+    """
+    import numpy  # pylint: disable=import-error
+
+    seed, count, target, source, alpha, estimator = task
+    rng = numpy.random.default_rng(seed)
+    runs = max(len(target[0]), len(source[0]))
+    # bound the memory used by the index arrays
+    rows = max(1, (1 << 22) // runs)
+    scores = []
+    for start in range(0, count, rows):
+        size = min(rows, count - start)
+        r_tar, t_tar = _resample(rng, target, size, estimator)
+        r_src, t_src = _resample(rng, source, size, estimator)
+        scores.append(_weissman_array(r_tar, t_tar, r_src, t_src, alpha))
+    return numpy.concatenate(scores)
+
+
+def weissman_bootstrap(r_tar, t_tar, r_src, t_src, alpha=1.0,
+                       resamples=10000, confidence=0.95, estimator='mean',
+                       processes=1, seed=0):
+    """Estimate a bootstrap confidence interval for a Weissman score.
+
+    The target's & source's runs are each resampled with replacement, each
+    run's ratio staying with its time, and the score of each resample is
+    computed from the estimator (mean, median, or min) of its ratios & times.
+    The interval is the percentile interval of those scores.
+
+    Resamples are drawn in blocks of 1000, each from its own random stream
+    spawned from seed, so the interval depends on seed but not on the
+    number of processes. This requires numpy.
+
+    :param float r_tar: the target algorithm's compression ratio, or one per
+        run
+    :param float t_tar: the target algorithm's compression time, or one per
+        run
+    :param float r_src: a standard algorithm's compression ratio, or one per
+        run
+    :param float t_src: a standard algorithm's compression time, or one per
+        run
+    :param float alpha: a scaling constant (1.0 by default)
+    :param int resamples: the number of bootstrap resamples
+    :param float confidence: the confidence level of the interval
+    :param str estimator: mean, median, or min
+    :param int processes: the number of worker processes to use
+    :param int seed: the seed of the random number generator
+    :returns: the score of the whole measurements & the interval
+    :rtype: BootstrapInterval
+    :raises ValueError: if the measurements are invalid, as in weissman, or
+        another argument is out of range
+
+    >>> interval = weissman_bootstrap([2.1, 2.0, 2.2], [30, 34, 31],
+    ...                               1.5, [60, 58, 65, 61])
+    >>> interval.low < interval.score < interval.high
+    True
+    """
+    import numpy  # pylint: disable=import-error
+
+    if estimator not in _ESTIMATORS:
+        raise ValueError('Value of estimator must be one of ' +
+                         ', '.join(_ESTIMATORS))
+    if not 0 < confidence < 1:
+        raise ValueError('Value of confidence must be between 0 and 1.')
+    if resamples < 1:
+        raise ValueError('Value of resamples must be at least 1.')
+    target = _measurements(r_tar, t_tar, 'target')
+    source = _measurements(r_src, t_src, 'source')
+    # validate the measurements as weissman would
+    _weissman_array(target[0], target[1], source[0][:1], source[1][:1],
+                    alpha)
+    _weissman_array(target[0][:1], target[1][:1], source[0], source[1],
+                    alpha)
+
+    score = float(_weissman_array(*([_estimate(values, estimator)
+                                     for values in target + source] +
+                                    [alpha])))
+    counts = [_BOOTSTRAP_BLOCK] * (resamples // _BOOTSTRAP_BLOCK)
+    if resamples % _BOOTSTRAP_BLOCK:
+        counts.append(resamples % _BOOTSTRAP_BLOCK)
+    tasks = [(child, count, target, source, alpha, estimator)
+             for child, count in zip(
+                 numpy.random.SeedSequence(seed).spawn(len(counts)), counts)]
+
+    if processes > 1 and len(tasks) > 1:
+        import multiprocessing
+
+        # Pool is a context manager only on Python 3
+        # pylint: disable-next=consider-using-with
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+        try:
+            scores = pool.map(_bootstrap_block, tasks)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        scores = [_bootstrap_block(task) for task in tasks]
+
+    low, high = numpy.percentile(numpy.concatenate(scores),
+                                 (50 * (1 - confidence),
+                                  50 * (1 + confidence)))
+    return BootstrapInterval(score, float(low), float(high), confidence,
+                             resamples)
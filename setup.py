@@ -21,10 +21,12 @@
 setuptools configuration file for Narmer
 """
 
+import sys
 from codecs import open
 from os import path
 
 from setuptools import find_packages, setup
+from setuptools.command.build_py import build_py
 
 HERE = path.abspath(path.dirname(__file__))
 
@@ -35,9 +37,36 @@ def readfile(fn):
         return f.read()
 
 
+class BuildPyWithRules(build_py):
+    """Build the package, including its compiled rule artifact."""
+
+    def run(self):
+        """Build the package, then write the rule artifact into it.
+
+        The artifact is optional: if narmer cannot be imported here, e.g.
+        because six is not yet installed on Python 2, it is not written, and
+        the rule tables are compiled when first used instead.
+        """
+        build_py.run(self)
+        if self.dry_run:
+            return
+        sys.path.insert(0, HERE)
+        try:
+            from narmer.phonetic import build_rule_artifact
+        except ImportError:
+            self.warn('narmer cannot be imported; skipping the rule '
+                      'artifact')
+        else:
+            self.announce('writing the rule artifact', 2)
+            build_rule_artifact(path.join(self.build_lib, 'narmer',
+                                          'rules.bin'))
+        finally:
+            sys.path.remove(HERE)
+
+
 setup(
       name='narmer',
-      packages=find_packages(exclude=['tests*']),
+      packages=find_packages(exclude=['tests*', 'benchmarks*']),
       version='0.1.2',
       description='Narmer Experimental NLP/IR library for Python',
       author='Christopher C. Little',
@@ -68,5 +97,13 @@ setup(
       long_description='\n\n'.join([readfile(f) for f in ('README.rst',
                                                           'HISTORY.rst',
                                                           'AUTHORS.rst')]),
+      cmdclass={'build_py': BuildPyWithRules},
       install_requires=['six'],
+      extras_require={'lsh': ['numpy'], 'stats': ['numpy']},
+      entry_points={
+          'console_scripts': ['narmer-ipa=narmer.cli:main',
+                              'narmer-clusters=narmer.clusters:main',
+                              'narmer-lexicon=narmer.lexicon:main',
+                              'narmer-server=narmer.cli:server_main'],
+      },
       )
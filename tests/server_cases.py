@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.server_cases.
+
+This module contains unit tests for narmer.server, which, like narmer.server,
+require Python 3.7 or later; test_server collects them on those versions
+"""
+
+from __future__ import unicode_literals
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import narmer.server
+from narmer.phonetic import german_ipa
+from narmer.server import OverloadedError, TranscriptionServer
+
+
+async def _request(reader, writer, method, target, query=None,
+                   keep_alive=True):
+    """Make an HTTP request and return the response.
+
+    :param asyncio.StreamReader reader: the connection's reader
+    :param asyncio.StreamWriter writer: the connection's writer
+    :param str method: the request method
+    :param str target: the request target
+    :param query: the object to send as the JSON body, or bytes to send as is
+    :param bool keep_alive: whether to keep the connection open
+    :returns: the status & the response object
+    :rtype: tuple
+    """
+    if query is None:
+        body = b''
+    elif isinstance(query, bytes):
+        body = query
+    else:
+        body = json.dumps(query).encode('utf-8')
+    writer.write('{} {} HTTP/1.1\r\nContent-Length: {}\r\n{}\r\n'.format(
+        method, target, len(body),
+        '' if keep_alive else 'Connection: close\r\n').encode('latin-1') +
+        body)
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1')
+        if not line.strip():
+            break
+        name, _, value = line.partition(':')
+        headers[name.lower()] = value.strip()
+    result = await reader.readexactly(int(headers['content-length']))
+    return status, json.loads(result.decode('utf-8'))
+
+
+class TranscriptionServerTestCases(unittest.TestCase):
+    """Test narmer.server.TranscriptionServer."""
+
+    words = ['Müller', 'Schmidt', 'Tschechien', 'Hûs', 'Müller', '']
+
+    def test_transcribe(self):
+        """Test narmer.server.TranscriptionServer.transcribe."""
+        results, stats = asyncio.run(self._run_transcribe())
+        for i, ipas in enumerate(results):
+            words = self.words[(i // 2) % 6:]
+            period = ('nhg', 'mhg')[i % 2]
+            self.assertEqual(ipas, [german_ipa(word, period)
+                                    for word in words])
+        self.assertEqual(stats['requests'], 81)
+        # concurrent requests are coalesced into fewer batches
+        self.assertLess(stats['batch_size']['count'], 80)
+        self.assertLessEqual(stats['batch_size']['max'], 64)
+        self.assertEqual(stats['cache']['hits'], 1)
+        self.assertIn('p99', stats['latency'])
+        self.assertLessEqual(stats['latency']['p50'],
+                             stats['latency']['p99'])
+
+    async def _run_transcribe(self):
+        """Make concurrent requests of a server.
+
+        :returns: the results & the server's statistics
+        :rtype: tuple
+        """
+        server = TranscriptionServer(max_batch_size=64, max_wait=0.01)
+        await server.start(port=None)
+        try:
+            results = await asyncio.gather(*(
+                server.transcribe(self.words[i % 6:], period)
+                for i in range(40) for period in ('nhg', 'MHG')))
+            with self.assertRaises(ValueError):
+                await server.transcribe(['Hûs'], 'ahg')
+            # served from the cache, without queuing
+            self.assertEqual(await server.transcribe(['Hûs'], 'mhg'),
+                             ['xuːs'])
+            return results, server.stats()
+        finally:
+            await server.close()
+
+    def test_backpressure(self):
+        """Test narmer.server.TranscriptionServer's bounded queue."""
+        release = threading.Event()
+        transcribe_batch = narmer.server._transcribe_batch
+
+        def blocked(batch):
+            release.wait(5)
+            return transcribe_batch(batch)
+
+        async def run():
+            server = TranscriptionServer(max_batch_size=1, max_queue=1,
+                                         queue_timeout=0.05)
+            await server.start(port=None)
+            try:
+                first = asyncio.ensure_future(server.transcribe(['Eins']))
+                await asyncio.sleep(0.05)
+                # the first request is being transcribed, the second fills
+                # the queue, and the third cannot be queued
+                second = asyncio.ensure_future(server.transcribe(['Zwei']))
+                await asyncio.sleep(0.01)
+                with self.assertRaises(OverloadedError):
+                    await server.transcribe(['Drei'])
+                self.assertEqual(server.stats()['queued'], 1)
+                release.set()
+                self.assertEqual(await first, ['ains'])
+                self.assertEqual(await second, ['tsvai'])
+                self.assertEqual(await server.transcribe(['Drei']),
+                                 ['drai'])
+                self.assertEqual(server.stats()['rejected'], 1)
+            finally:
+                release.set()
+                await server.close()
+
+        narmer.server._transcribe_batch = blocked
+        try:
+            asyncio.run(run())
+        finally:
+            narmer.server._transcribe_batch = transcribe_batch
+
+    def test_http(self):
+        """Test narmer.server.TranscriptionServer over HTTP."""
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, 'narmer.sock')
+
+        async def run():
+            server = TranscriptionServer(executor='process')
+            sockets = await server.start(port=0, path=path)
+            port = sockets[0].getsockname()[1]
+            try:
+                for reader, writer in (
+                        await asyncio.open_connection('127.0.0.1', port),
+                        await asyncio.open_unix_connection(path)):
+                    self.assertEqual(
+                        await _request(reader, writer, 'POST', '/transcribe',
+                                       {'words': self.words}),
+                        (200, {'ipa': [german_ipa(word)
+                                       for word in self.words]}))
+                    self.assertEqual(
+                        await _request(reader, writer, 'POST', '/transcribe',
+                                       {'word': 'Hûs', 'period': 'mhg'}),
+                        (200, {'ipa': ['xuːs']}))
+                    for query in ({'words': 'Hûs'}, {'word': 1}, {},
+                                  {'word': 'Hûs', 'period': 'ahg'},
+                                  b'{', b'\xff', b'[]'):
+                        status, result = await _request(
+                            reader, writer, 'POST', '/transcribe', query)
+                        self.assertEqual(status, 400)
+                        self.assertIn('error', result)
+                    self.assertEqual((await _request(
+                        reader, writer, 'GET', '/transcribe'))[0], 405)
+                    self.assertEqual((await _request(
+                        reader, writer, 'POST', '/stats'))[0], 405)
+                    self.assertEqual((await _request(
+                        reader, writer, 'GET', '/ipa'))[0], 404)
+                    status, stats = await _request(reader, writer, 'GET',
+                                                   '/stats?x=1',
+                                                   keep_alive=False)
+                    self.assertEqual(status, 200)
+                    self.assertEqual(await reader.read(), b'')
+                    writer.close()
+                # two successful requests per connection
+                self.assertEqual(stats['requests'], 4)
+                self.assertEqual(stats['words'], 2 * (len(self.words) + 1))
+            finally:
+                await server.close()
+
+        try:
+            asyncio.run(run())
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_bad_executor(self):
+        """Test narmer.server.TranscriptionServer with a bad executor."""
+        self.assertRaises(ValueError, TranscriptionServer, executor='gpu')
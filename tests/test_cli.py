@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_cli.
+
+This module contains unit tests for narmer.cli
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from narmer.cli import main, server_main, transcribe_stream
+from narmer.phonetic import IPACache
+
+
+class TranscribeStreamTestCases(unittest.TestCase):
+    """Test narmer.cli.transcribe_stream."""
+
+    def test_transcribe_stream(self):
+        """Test narmer.cli.transcribe_stream."""
+        out = io.StringIO()
+        self.assertEqual(transcribe_stream(['Müller\n', 'Kohl\r\n', 'Müller'],
+                                           out, batch_size=2), 3)
+        self.assertEqual(out.getvalue(), 'Müller\tmyller\nKohl\tkol\n'
+                                         'Müller\tmyller\n')
+
+        out = io.StringIO()
+        transcribe_stream(['Hûs\n'], out, 'mhg', 'jsonl')
+        self.assertEqual(json.loads(out.getvalue()),
+                         {'word': 'Hûs', 'ipa': 'xuːs'})
+
+        cache = IPACache(16)
+        for lines in (['Kohl\n', 'Ehre\n'], ['Ehre\n']):
+            transcribe_stream(lines, io.StringIO(), cache=cache)
+        self.assertEqual(cache.info()[:2], (1, 2))
+
+        self.assertRaises(ValueError, transcribe_stream, [], out, 'ahg')
+        self.assertRaises(ValueError, transcribe_stream, [], out, 'nhg', 'csv')
+
+
+class MainTestCases(unittest.TestCase):
+    """Test narmer.cli.main."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmpdir)
+
+    def test_main(self):
+        """Test narmer.cli.main."""
+        in1 = os.path.join(self.tmpdir, 'in1.txt')
+        in2 = os.path.join(self.tmpdir, 'in2.txt')
+        out = os.path.join(self.tmpdir, 'out.tsv')
+        with io.open(in1, 'w', encoding='latin-1') as infile:
+            infile.write('Müller\nSchmidt\n')
+        with io.open(in2, 'w', encoding='latin-1') as infile:
+            infile.write('Löwenbräu\n')
+
+        self.assertEqual(main(['--input-encoding', 'latin-1', '-o', out,
+                               '--period', 'nhg', in1, in2]), 0)
+        with io.open(out, encoding='utf-8') as outfile:
+            self.assertEqual(outfile.read(), 'Müller\tmyller\n'
+                                             'Schmidt\tʃmit\n'
+                                             'Löwenbräu\tløvenbrøy\n')
+
+
+class ServerMainTestCases(unittest.TestCase):
+    """Test narmer.cli.server_main."""
+
+    def test_server_main(self):
+        """Test narmer.cli.server_main on unsupported versions of Python."""
+        version_info, stderr = sys.version_info, sys.stderr
+        sys.version_info, sys.stderr = (3, 6, 9), io.StringIO()
+        try:
+            status = server_main([])
+            message = sys.stderr.getvalue()
+        finally:
+            sys.version_info, sys.stderr = version_info, stderr
+        self.assertEqual(status, 1)
+        self.assertEqual(message, 'narmer-server requires Python 3.7 or '
+                                  'later; this is Python 3.6.\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
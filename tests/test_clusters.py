@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_clusters.
+
+This module contains unit tests for narmer.clusters
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from collections import Counter, defaultdict
+
+from narmer.clusters import Cluster, ipa_clusters, main
+from narmer.phonetic import german_ipa
+
+
+class IPAClustersTestCases(unittest.TestCase):
+    """Test narmer.clusters.ipa_clusters."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a word list with repetitions & shared pronunciations."""
+        rng = random.Random(0)
+        stems = ['Meyer', 'Maier', 'Meier', 'Mayr', 'Schmidt', 'Schmitt',
+                 'Müller', 'Mueller', 'Fischer', 'Hûs', '', 'Löwenbräu']
+        cls.words = [rng.choice(stems) + rng.choice(('', 'er', 's', 'mann'))
+                     for _ in range(3000)]
+        cls.words += ['Nr{}'.format(i) for i in range(500)]
+        rng.shuffle(cls.words)
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmpdir)
+
+    def _expected(self, period):
+        """Return the clusters of the word list, computed in memory.
+
+        :param str period: a period of German
+        :returns: the clusters
+        :rtype: list
+        """
+        clusters = defaultdict(list)
+        for word, count in Counter(self.words).items():
+            clusters[german_ipa(word, period)].append((word, count))
+        return [Cluster(ipa, sum(count for _, count in clusters[ipa]),
+                        sorted(clusters[ipa]))
+                for ipa in sorted(clusters)]
+
+    def test_ipa_clusters(self):
+        """Test narmer.clusters.ipa_clusters within its memory budget."""
+        clusters = list(ipa_clusters(self.words, tmpdir=self.tmpdir))
+        self.assertEqual(clusters, self._expected('nhg'))
+        self.assertEqual(sum(cluster.count for cluster in clusters),
+                         len(self.words))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+        self.assertEqual(list(ipa_clusters([])), [])
+
+        self.assertRaises(ValueError, ipa_clusters, self.words, 'ahg')
+        self.assertRaises(ValueError, ipa_clusters, self.words, memory=0)
+        self.assertRaises(ValueError, ipa_clusters, self.words, processes=0)
+        self.assertRaises(ValueError, ipa_clusters, self.words, chunksize=0)
+
+    def test_spilled_clusters(self):
+        """Test narmer.clusters.ipa_clusters with spilled runs."""
+        expected = self._expected('mhg')
+        # about 20 distinct words per run, merged 2 runs at a time
+        clusters = ipa_clusters(self.words, 'mhg', memory=6000,
+                                tmpdir=self.tmpdir)
+        self.assertEqual(next(clusters), expected[0])
+        spilled = os.listdir(self.tmpdir)
+        self.assertEqual(len(spilled), 1)
+        self.assertGreater(
+            len(os.listdir(os.path.join(self.tmpdir, spilled[0]))), 1)
+        self.assertEqual(list(clusters), expected[1:])
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+        # abandoned generators remove their runs, too
+        clusters = ipa_clusters(self.words, memory=6000, tmpdir=self.tmpdir)
+        next(clusters)
+        clusters.close()
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+        self.assertEqual(list(ipa_clusters(self.words, memory=100000,
+                                           processes=2, chunksize=100,
+                                           tmpdir=self.tmpdir)),
+                         self._expected('nhg'))
+        # one pool of workers transcribes every run
+        self.assertEqual(list(ipa_clusters(self.words, 'MHG', memory=6000,
+                                           processes=2, chunksize=10,
+                                           tmpdir=self.tmpdir)), expected)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_main(self):
+        """Test narmer.clusters.main."""
+        wordlist = os.path.join(self.tmpdir, 'names.txt')
+        output = os.path.join(self.tmpdir, 'clusters.jsonl')
+        with io.open(wordlist, 'w', encoding='utf-8') as wordfile:
+            wordfile.write('\n'.join(self.words) + '\n')
+        self.assertEqual(main([wordlist, '-o', output, '-p', 'mhg',
+                               '--min-words', '2']), 0)
+        with io.open(output, encoding='utf-8') as clusters:
+            result = [json.loads(line) for line in clusters]
+        expected = [cluster for cluster in self._expected('mhg')
+                    if len(cluster.words) > 1]
+        self.assertEqual(len(result), len(expected))
+        for cluster, expected_cluster in zip(result, expected):
+            self.assertEqual(cluster['ipa'], expected_cluster.ipa)
+            self.assertEqual(cluster['count'], expected_cluster.count)
+            self.assertEqual([tuple(word) for word in cluster['words']],
+                             expected_cluster.words)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_distance.
+
+This module contains unit tests for narmer.distance
+"""
+
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+from narmer.distance import BKTree, levenshtein, phonetic_distance, \
+    phonetic_distance_many
+from narmer.phonetic import german_ipa, ipa_phonemes, phoneme_inventory
+
+
+class LevenshteinTestCases(unittest.TestCase):
+    """Test narmer.distance.levenshtein."""
+
+    def test_levenshtein(self):
+        """Test narmer.distance.levenshtein."""
+        self.assertEqual(levenshtein('', ''), 0)
+        self.assertEqual(levenshtein('', 'kol'), 3)
+        self.assertEqual(levenshtein('kol', ''), 3)
+        self.assertEqual(levenshtein('kol', 'kol'), 0)
+        self.assertEqual(levenshtein('kol', 'kool'), 1)
+        self.assertEqual(levenshtein('myller', 'miler'), 2)
+        self.assertEqual(levenshtein('tʃeçin', 'ʃemi'), 3)
+
+
+class BKTreeTestCases(unittest.TestCase):
+    """Test narmer.distance.BKTree."""
+
+    def setUp(self):
+        """Build a tree over a reproducible random word list."""
+        rng = random.Random(1)
+        self.words = [''.join(rng.choice('abdefgiklmnorstuäöü')
+                              for _ in range(rng.randint(3, 8)))
+                      for _ in range(500)]
+        self.tree = BKTree(self.words)
+
+    def _distances(self, word):
+        """Return the sorted (distance, word) pairs by brute force."""
+        ipa = german_ipa(word)
+        return sorted({(levenshtein(ipa, german_ipa(other)), other)
+                       for other in self.words})
+
+    def test_bktree_within(self):
+        """Test narmer.distance.BKTree.within."""
+        for query in self.words[:10] + ['Müller']:
+            distances = self._distances(query)
+            for max_distance in range(3):
+                result = self.tree.within(query, max_distance)
+                self.assertEqual(result.matches,
+                                 [match for match in distances
+                                  if match[0] <= max_distance])
+                self.assertLessEqual(result.visited, self.tree.node_count)
+
+        result = self.tree.within(german_ipa(self.words[0]), 0,
+                                  transcribed=True)
+        self.assertIn((0, self.words[0]), result.matches)
+        # pruning should avoid a full scan for small radii
+        self.assertLess(result.visited, self.tree.node_count)
+
+        self.assertEqual(BKTree().within('Müller', 2), ([], 0))
+
+    def test_bktree_nearest(self):
+        """Test narmer.distance.BKTree.nearest."""
+        for query in self.words[:10] + ['Müller']:
+            distances = self._distances(query)
+            for k in (1, 3, 10):
+                radius = distances[k - 1][0]
+                self.assertEqual(self.tree.nearest(query, k).matches,
+                                 [match for match in distances
+                                  if match[0] <= radius])
+
+        self.assertEqual(BKTree().nearest('Müller'), ([], 0))
+        self.assertEqual(BKTree(['Kohl']).nearest('Müller', 5).matches,
+                         [(5, 'Kohl')])
+
+    def test_bktree_add(self):
+        """Test narmer.distance.BKTree.add & update."""
+        tree = BKTree(period='mhg')
+        self.assertTrue(tree.add('Müller'))
+        self.assertFalse(tree.add('Müller'))
+        self.assertTrue(tree.add('MÜLLER'))
+        tree.update(['Hûs', 'Hus'])
+        self.assertEqual(len(tree), 4)
+        self.assertEqual(tree.node_count, 3)
+        self.assertEqual(tree.within('Hûs', 0).matches, [(0, 'Hûs')])
+        self.assertEqual(tree.within('Müller', 0).matches,
+                         [(0, 'MÜLLER'), (0, 'Müller')])
+
+
+class PhoneticDistanceTestCases(unittest.TestCase):
+    """Test narmer.distance.phonetic_distance & phonetic_distance_many."""
+
+    def test_ipa_phonemes(self):
+        """Test narmer.phonetic.ipa_phonemes."""
+        self.assertEqual(ipa_phonemes(''), [])
+        self.assertEqual(ipa_phonemes('dʒuŋel'), ['dʒ', 'u', 'ŋ', 'e', 'l'])
+        self.assertEqual(ipa_phonemes('aːbent'), ['aː', 'b', 'e', 'n', 't'])
+        self.assertEqual(ipa_phonemes('pfaːd'), ['pf', 'aː', 'd'])
+
+    def test_phonetic_distance(self):
+        """Test narmer.distance.phonetic_distance."""
+        self.assertEqual(phonetic_distance('', ''), 0)
+        self.assertEqual(phonetic_distance('', 'tʃai'), 2)
+        self.assertEqual(phonetic_distance('tʃai', ''), 2)
+        # multi-character phonemes count as single units
+        self.assertEqual(phonetic_distance('tʃ', 'dʒ'), 0.25)
+        self.assertEqual(phonetic_distance('a', 'aː'), 0.2)
+        self.assertLess(phonetic_distance('tʃ', 'ʃ'),
+                        levenshtein('tʃ', 'ʃ'))
+        # similar phonemes are nearer than dissimilar ones
+        self.assertLess(phonetic_distance('bot', 'pot'),
+                        phonetic_distance('bot', 'lot'))
+        self.assertLess(phonetic_distance('myller', 'miller'),
+                        phonetic_distance('myller', 'maller'))
+        # vowel-consonant & unknown-phoneme substitutions cost 1
+        self.assertEqual(phonetic_distance('ba', 'bk'), 1)
+        self.assertEqual(phonetic_distance('bq', 'bk'), 1)
+
+    def test_phonetic_distance_cutoff(self):
+        """Test narmer.distance.phonetic_distance with max_distance."""
+        rng = random.Random(2)
+        ipas = [german_ipa(''.join(rng.choice('abdefgiklmnorstuäöüch')
+                                   for _ in range(rng.randint(1, 8))))
+                for _ in range(40)]
+        for src in ipas:
+            for tar in ipas:
+                full = phonetic_distance(src, tar)
+                self.assertAlmostEqual(full, phonetic_distance(tar, src))
+                for max_distance in (0, 0.5, 1, 2.5):
+                    bounded = phonetic_distance(src, tar, max_distance)
+                    if full <= max_distance:
+                        self.assertEqual(bounded, full)
+                    else:
+                        self.assertEqual(bounded, float('inf'))
+
+    def test_phonetic_distance_many(self):
+        """Test narmer.distance.phonetic_distance_many."""
+        targets = ['ʃmit', 'myller', 'miller', '']
+        self.assertEqual(phonetic_distance_many('myller', targets),
+                         [phonetic_distance('myller', tar)
+                          for tar in targets])
+        self.assertEqual(phonetic_distance_many('myller', targets, 1),
+                         [float('inf'), 0, 0.25, float('inf')])
+        self.assertEqual(phonetic_distance_many('myller', []), [])
+
+    def test_phonetic_distance_bktree(self):
+        """Test narmer.distance.BKTree with phonetic_distance."""
+        tree = BKTree(['Müller', 'Miller', 'Möller', 'Schmidt'],
+                      metric=phonetic_distance)
+        self.assertEqual(sorted(word for _, word in
+                                tree.within('Mueller', 1.5).matches),
+                         ['Miller', 'Möller', 'Müller'])
+        self.assertEqual(tree.nearest('Müler').matches, [(1, 'Müller')])
+
+        tree = BKTree(['liep', 'leip'], period='mhg', metric=phonetic_distance)
+        self.assertEqual(tree.node_count, 2)
+
+    def test_distinct_phonemes(self):
+        """Test that distinct phonemes are at a positive distance."""
+        phonemes = sorted(set(phoneme_inventory('nhg')) |
+                          set(phoneme_inventory('mhg')))
+        for src in phonemes:
+            for tar in phonemes:
+                if src != tar:
+                    self.assertGreater(phonetic_distance(src, tar), 0,
+                                       (src, tar))
+        self.assertGreater(phonetic_distance('liep', 'leip'), 0)
+        self.assertGreater(phonetic_distance('ieː', 'eiː'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_lexicon.
+
+This module contains unit tests for narmer.lexicon
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from narmer.lexicon import Lexicon, build_lexicon, main
+from narmer.phonetic import german_ipa
+
+
+class LexiconTestCases(unittest.TestCase):
+    """Test narmer.lexicon.build_lexicon & Lexicon."""
+
+    words = ['Müller', 'Schmidt', 'Zimmer', 'Müller', 'Ärger', '', 'Abel']
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'names.lex')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmpdir)
+
+    def test_lexicon(self):
+        """Test narmer.lexicon.build_lexicon & Lexicon."""
+        self.assertEqual(build_lexicon(self.words, self.path, 'MHG'), 6)
+
+        with Lexicon(self.path) as lexicon:
+            self.assertEqual(lexicon.period, 'mhg')
+            self.assertEqual(len(lexicon), 6)
+            self.assertEqual(sorted(lexicon.words()),
+                             sorted(set(self.words)))
+            for word in self.words:
+                self.assertIn(word, lexicon)
+                self.assertEqual(lexicon.get(word), german_ipa(word, 'mhg'))
+                self.assertEqual(lexicon.lookup(word),
+                                 german_ipa(word, 'mhg'))
+
+            self.assertNotIn('Nietzsche', lexicon)
+            self.assertNotIn('Zz', lexicon)
+            self.assertIsNone(lexicon.get('Nietzsche'))
+            self.assertEqual(lexicon.get('Nietzsche', ''), '')
+            self.assertEqual(lexicon.lookup('Nietzsche'),
+                             german_ipa('Nietzsche', 'mhg'))
+
+    def test_empty_lexicon(self):
+        """Test narmer.lexicon.Lexicon with no entries."""
+        self.assertEqual(build_lexicon([], self.path), 0)
+        with Lexicon(self.path) as lexicon:
+            self.assertEqual(len(lexicon), 0)
+            self.assertNotIn('Müller', lexicon)
+            self.assertEqual(lexicon.lookup('Müller'), 'myller')
+
+    def test_bad_lexicon(self):
+        """Test narmer.lexicon.Lexicon with invalid files."""
+        with io.open(self.path, 'wb') as lexfile:
+            lexfile.write(b'NARM')
+        self.assertRaises(ValueError, Lexicon, self.path)
+        with io.open(self.path, 'wb') as lexfile:
+            lexfile.write(b'\0' * 64)
+        self.assertRaises(ValueError, Lexicon, self.path)
+
+    def test_main(self):
+        """Test narmer.lexicon.main."""
+        wordlist = os.path.join(self.tmpdir, 'names.txt')
+        with io.open(wordlist, 'w', encoding='utf-8') as wordfile:
+            wordfile.write('\n'.join(self.words) + '\n')
+        self.assertEqual(main([wordlist, self.path, '-p', 'ohg']), 0)
+        with Lexicon(self.path) as lexicon:
+            self.assertEqual(lexicon.period, 'ohg')
+            self.assertEqual(lexicon.get('Zimmer'), 'tsimmer')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_lsh.
+
+This module contains unit tests for narmer.lsh
+"""
+
+from __future__ import unicode_literals
+
+import unittest
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+else:
+    from narmer.lsh import LSHIndex, MinHash, lsh_threshold, near_duplicates
+    from narmer.phonetic import german_ipa
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class MinHashTestCases(unittest.TestCase):
+    """Test narmer.lsh.MinHash."""
+
+    def test_minhash(self):
+        """Test narmer.lsh.MinHash.signatures."""
+        minhash = MinHash(num_perm=64, batch_size=2)
+        words = ['Müller', 'Mueller', 'Schmidt', 'Müller', '']
+        sigs = minhash.signatures(words)
+        self.assertEqual(sigs.shape, (5, 64))
+        self.assertEqual(sigs.dtype, numpy.uint32)
+        self.assertTrue((sigs[0] == sigs[3]).all())
+        self.assertEqual(MinHash.jaccard(sigs[0], sigs[3]), 1.0)
+        self.assertLess(MinHash.jaccard(sigs[0], sigs[2]), 0.2)
+
+        # signatures are reproducible & independent of batching
+        self.assertTrue((MinHash(num_perm=64).signatures(words) ==
+                         sigs).all())
+        self.assertTrue((minhash.signature('Mueller') == sigs[1]).all())
+        self.assertTrue((minhash.signature(german_ipa('Mueller'),
+                                           transcribed=True) ==
+                         sigs[1]).all())
+        self.assertFalse((MinHash(num_perm=64, seed=1).signature('Müller') ==
+                          sigs[0]).all())
+        self.assertEqual(minhash.signatures([]).shape, (0, 64))
+        self.assertEqual(MinHash(num_perm=8, ngram=1).signatures(['']).shape,
+                         (1, 8))
+
+    def test_minhash_estimate(self):
+        """Test narmer.lsh.MinHash Jaccard estimates."""
+        minhash = MinHash(num_perm=512, ngram=1)
+        # {m, y, l, e, r} vs {m, i, l, e, r}: Jaccard similarity 4/6
+        sigs = minhash.signatures(['myller', 'miller'], transcribed=True)
+        self.assertAlmostEqual(MinHash.jaccard(sigs[0], sigs[1]), 4 / 6,
+                               delta=0.08)
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class LSHIndexTestCases(unittest.TestCase):
+    """Test narmer.lsh.LSHIndex & near_duplicates."""
+
+    def test_lsh_index(self):
+        """Test narmer.lsh.LSHIndex."""
+        minhash = MinHash(num_perm=32)
+        index = LSHIndex(bands=16, rows=2)
+        words = ['Müller', 'Mueller', 'Schmidt', 'Schmitt', 'Zimmermann']
+        self.assertEqual(list(index.add(minhash.signatures(words[:3]))),
+                         [0, 1, 2])
+        self.assertEqual(list(index.add(minhash.signatures(words[3:]))),
+                         [3, 4])
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.candidate_pairs(), {(0, 1), (2, 3)})
+        self.assertEqual(index.query(minhash.signature('Müller')), {0, 1})
+        self.assertEqual(index.query(minhash.signature('Hund')), set())
+
+        # identical signatures join a group, which is bucketed once
+        self.assertEqual(list(index.add(minhash.signatures(['Müller'] * 3))),
+                         [5, 6, 7])
+        self.assertEqual(len(index), 8)
+        self.assertEqual(index.groups(), [[0, 5, 6, 7], [1], [2], [3], [4]])
+        self.assertEqual(index.candidate_pairs(), {(0, 1), (2, 3)})
+        self.assertEqual(index.query(minhash.signature('Müller')),
+                         {0, 1, 5, 6, 7})
+
+        self.assertRaises(ValueError, index.add,
+                          MinHash(num_perm=16).signatures(words))
+
+    def test_near_duplicates(self):
+        """Test narmer.lsh.near_duplicates & lsh_threshold."""
+        self.assertEqual(near_duplicates([]), ([], set()))
+        self.assertEqual(near_duplicates(['Meyer', 'Bach', 'Maier', 'Bach',
+                                          'Bache'], bands=16, rows=2),
+                         ([[0, 2], [1, 3], [4]], {(1, 2)}))
+        self.assertGreater(lsh_threshold(8, 8), lsh_threshold(32, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_narmer.
+
+This module contains unit tests for narmer (the package)
+"""
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import narmer
+import narmer.distance
+import narmer.phonetic
+import narmer.stats
+
+# the greatest time, in seconds, that importing narmer.phonetic may take,
+# once its bytecode is cached
+IMPORT_BUDGET = 0.02
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code, env=None):
+    """Run Python code in a fresh interpreter and return its output.
+
+    :param str code: the code to run
+    :param dict env: additional environment variables
+    :returns: the standard output
+    :rtype: str
+    """
+    environ = dict(os.environ)
+    environ.update(env or {})
+    return subprocess.check_output([sys.executable, '-c', code], cwd=_ROOT,
+                                   env=environ).decode('utf-8').strip()
+
+
+class LazyAttributeTestCases(unittest.TestCase):
+    """Test narmer's lazily loaded attributes."""
+
+    def test_lazy_attributes(self):
+        """Test narmer.__getattr__ & narmer.__dir__."""
+        self.assertIs(narmer.german_ipa, narmer.phonetic.german_ipa)
+        self.assertIs(narmer.IPACache, narmer.phonetic.IPACache)
+        self.assertIs(narmer.weissman, narmer.stats.weissman)
+        self.assertIs(narmer.BKTree, narmer.distance.BKTree)
+        self.assertEqual(narmer.german_ipa('Müller'), 'myller')
+        for name in narmer.__all__:
+            self.assertIn(name, dir(narmer))
+        self.assertIn('german_ipa', dir(narmer))
+        self.assertRaises(AttributeError, getattr, narmer, 'nonexistent')
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'requires PEP 562')
+    def test_lazy_imports(self):
+        """Test that importing narmer imports nothing more than needed."""
+        self.assertEqual(_run('import sys, narmer; print(sorted(\n'
+                              '    m for m in sys.modules\n'
+                              '    if m.startswith("narmer.")))'), '[]')
+        self.assertEqual(_run(
+            'import sys, narmer.phonetic as p\n'
+            'print(sorted(m for m in ("multiprocessing", "re", "six",\n'
+            '                         "threading") if m in sys.modules),\n'
+            '      len(p._TABLES))'), '[] 0')
+        self.assertEqual(_run(
+            'import sys, narmer.stats as s\n'
+            'print(sorted(m for m in ("bz2", "lzma", "six", "zlib")\n'
+            '             if m in sys.modules), list(s.COMPRESSORS))'),
+            "[] ['zlib', 'bz2', 'lzma']")
+        self.assertEqual(_run(
+            'import narmer\n'
+            'print(narmer.nhg_ipa("Kohl"))'), 'kol')
+
+    @unittest.skipIf(sys.version_info < (3, 8), 'requires pycache_prefix')
+    def test_import_budget(self):
+        """Test that importing narmer.phonetic is within its time budget."""
+        prefix = tempfile.mkdtemp()
+        try:
+            env = {'PYTHONPYCACHEPREFIX': prefix,
+                   'PYTHONDONTWRITEBYTECODE': ''}
+            code = ('from timeit import default_timer\n'
+                    'start = default_timer()\n'
+                    'import narmer.phonetic\n'
+                    'print(default_timer() - start)')
+            # the first run caches the bytecode
+            _run(code, env)
+            elapsed = min(float(_run(code, env)) for _ in range(3))
+        finally:
+            shutil.rmtree(prefix)
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
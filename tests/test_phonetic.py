@@ -23,9 +23,36 @@ This module contains unit tests for narmer.phonetic
 
 from __future__ import unicode_literals
 
+import io
+import itertools
+import marshal
+import os
+import random
+import shutil
+import tempfile
+import unicodedata
 import unittest
 
-from narmer.phonetic import german_ipa
+import narmer.phonetic
+from narmer.phonetic import IPACache, IncrementalTranscriber, RuleProfile, \
+    disable_cache, enable_cache, enhg_ipa, german_ipa, german_ipa_column, \
+    german_ipa_many, german_ipa_periods, german_ipa_periods_many, \
+    german_ipa_text, german_ipa_tokens, get_cache, mhg_ipa, nhg_ipa, ohg_ipa
+from narmer.phonetic import build_rule_artifact, ipa_decode, ipa_encode, \
+    ipa_phonemes, phoneme_inventory
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
 
 
 class GermanIPATestCases(unittest.TestCase):
@@ -93,5 +120,612 @@ class GermanIPATestCases(unittest.TestCase):
         self.assertEqual(german_ipa('ohne'), 'one')
 
 
+class PeriodIPATestCases(unittest.TestCase):
+    """Test narmer.phonetic.enhg_ipa, mhg_ipa, & ohg_ipa."""
+
+    def test_enhg_ipa(self):
+        """Test narmer.phonetic.enhg_ipa."""
+        self.assertEqual(enhg_ipa(''), '')
+        self.assertEqual(enhg_ipa('Nacht'), 'naxt')
+        self.assertEqual(enhg_ipa('vröude'), 'frøude')
+        self.assertEqual(enhg_ipa('Tiefe'), 'tife')
+        self.assertEqual(german_ipa('Tschechien', 'ENHG'), 'tʃeçin')
+
+    def test_mhg_ipa(self):
+        """Test narmer.phonetic.mhg_ipa."""
+        self.assertEqual(mhg_ipa(''), '')
+        self.assertEqual(mhg_ipa('Hûs'), 'xuːs')
+        self.assertEqual(mhg_ipa('Sêle'), 'zeːle')
+        self.assertEqual(mhg_ipa('ahte'), 'axte')
+        self.assertEqual(mhg_ipa('liute'), 'lyːte')
+        self.assertEqual(mhg_ipa('küene'), 'kyune')
+        self.assertEqual(mhg_ipa('vröude'), 'frøyde')
+        self.assertEqual(mhg_ipa('sehen'), 'zehen')
+        self.assertEqual(mhg_ipa('hoehe'), 'xøːhe')
+        self.assertEqual(mhg_ipa('Skif'), 'ʃif')
+        self.assertEqual(mhg_ipa('Spil'), 'ʃpil')
+        self.assertEqual(mhg_ipa('zwîvel'), 'tswiːfel')
+        self.assertEqual(mhg_ipa('mære'), 'mɛːre')
+        self.assertEqual(german_ipa('Tiefe', 'mhg'), 'tiefe')
+
+    def test_ohg_ipa(self):
+        """Test narmer.phonetic.ohg_ipa."""
+        self.assertEqual(ohg_ipa(''), '')
+        self.assertEqual(ohg_ipa('Sunne'), 'zunne')
+        self.assertEqual(ohg_ipa('Quelle'), 'kvelle')
+        self.assertEqual(ohg_ipa('küene'), 'kyene')
+        self.assertEqual(ohg_ipa('sehen'), 'zeen')
+        self.assertEqual(german_ipa('guot', 'ohg'), 'guot')
+
+    def test_german_ipa_period(self):
+        """Test narmer.phonetic.german_ipa period validation."""
+        self.assertRaises(ValueError, german_ipa, 'Wasser', 'ahg')
+
+
+class GermanIPAManyTestCases(unittest.TestCase):
+    """Test narmer.phonetic.german_ipa_many."""
+
+    def test_german_ipa_many(self):
+        """Test narmer.phonetic.german_ipa_many."""
+        words = ['Müller', 'Schmidt', 'Müller', '', 'Nietzsche', 'Schmidt']
+        self.assertEqual(german_ipa_many([]), [])
+        self.assertEqual(german_ipa_many(words),
+                         [german_ipa(word) for word in words])
+        self.assertEqual(german_ipa_many(iter(words), 'MHG'),
+                         [german_ipa(word, 'mhg') for word in words])
+
+        gen = german_ipa_many(iter(words), 'ohg', generator=True)
+        self.assertFalse(isinstance(gen, list))
+        self.assertEqual(list(gen),
+                         [german_ipa(word, 'ohg') for word in words])
+
+        self.assertRaises(ValueError, german_ipa_many, words, 'ahg')
+
+    def test_german_ipa_many_parallel(self):
+        """Test narmer.phonetic.german_ipa_many with a process pool."""
+        words = ['Müller', 'Schmidt', 'Müller', '', 'Nietzsche', 'Schmidt',
+                 'Löwenbräu']
+        self.assertEqual(german_ipa_many(words, processes=2, chunksize=2),
+                         [german_ipa(word) for word in words])
+        self.assertEqual(list(german_ipa_many(iter(words), 'mhg',
+                                              generator=True, processes=2,
+                                              chunksize=3)),
+                         [german_ipa(word, 'mhg') for word in words])
+        self.assertEqual(german_ipa_many([], processes=2), [])
+
+        self.assertRaises(ValueError, german_ipa_many, words, processes=0)
+        self.assertRaises(ValueError, german_ipa_many, words, processes=2,
+                          chunksize=0)
+
+
+class IPACacheTestCases(unittest.TestCase):
+    """Test narmer.phonetic.IPACache & enable_cache."""
+
+    def tearDown(self):
+        """Disable the cache after each test."""
+        disable_cache()
+
+    def test_enable_cache(self):
+        """Test narmer.phonetic.enable_cache."""
+        self.assertIsNone(get_cache())
+        cache = enable_cache(maxsize=4)
+        self.assertIs(get_cache(), cache)
+
+        self.assertEqual(german_ipa('Müller'), 'myller')
+        self.assertEqual(nhg_ipa('Müller'), 'myller')
+        self.assertEqual(german_ipa('Müller', 'MHG'), 'myller')
+        self.assertEqual(german_ipa_many(['Tiefe', 'Tiefe'], 'mhg'),
+                         ['tiefe', 'tiefe'])
+        self.assertEqual(cache.info(), (1, 3, 0, 4, 3))
+
+        disable_cache()
+        self.assertIsNone(get_cache())
+        self.assertEqual(german_ipa('Müller'), 'myller')
+        self.assertEqual(cache.info().hits, 1)
+
+        custom = IPACache(2)
+        self.assertIs(enable_cache(cache=custom), custom)
+        self.assertEqual(ohg_ipa('Sunne'), 'zunne')
+        self.assertEqual(len(custom), 1)
+
+    def test_ipa_cache(self):
+        """Test narmer.phonetic.IPACache."""
+        cache = IPACache(maxsize=2)
+        self.assertIsNone(cache.get('nhg', 'Kohl'))
+        cache.put('nhg', 'Kohl', 'kol')
+        cache.put('mhg', 'Kohl', 'koxl')
+        self.assertEqual(cache.get('nhg', 'Kohl'), 'kol')
+        cache.put('nhg', 'Ehre', 'ere')
+        # ('mhg', 'Kohl') was least recently used
+        self.assertIsNone(cache.get('mhg', 'Kohl'))
+        self.assertEqual(cache.get('nhg', 'Ehre'), 'ere')
+        self.assertEqual(cache.info(), (2, 2, 1, 2, 2))
+
+        cache.resize(1)
+        self.assertEqual(cache.info(), (2, 2, 2, 1, 1))
+        self.assertEqual(cache.get('nhg', 'Ehre'), 'ere')
+        self.assertRaises(ValueError, cache.resize, 0)
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 1, 0))
+
+
+class GermanIPAColumnTestCases(unittest.TestCase):
+    """Test narmer.phonetic.german_ipa_column."""
+
+    words = ['Müller', None, 'Schmidt', 'Müller', '', 'Schmidt']
+    ipas = ['myller', None, 'ʃmit', 'myller', '', 'ʃmit']
+
+    def test_german_ipa_column(self):
+        """Test narmer.phonetic.german_ipa_column."""
+        self.assertEqual(german_ipa_column(self.words), self.ipas)
+        self.assertEqual(german_ipa_column(tuple(self.words), 'MHG'),
+                         [None if word is None else german_ipa(word, 'mhg')
+                          for word in self.words])
+        self.assertEqual(german_ipa_column([float('nan'), 'Kohl']),
+                         [None, 'kol'])
+        self.assertEqual(german_ipa_column([]), [])
+        self.assertRaises(ValueError, german_ipa_column, self.words, 'ahg')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_german_ipa_column_numpy(self):
+        """Test narmer.phonetic.german_ipa_column with numpy arrays."""
+        result = german_ipa_column(numpy.array(self.words, dtype=object))
+        self.assertEqual(result.dtype, object)
+        self.assertEqual(result.tolist(), self.ipas)
+
+        words = numpy.array([['Müller', 'Kohl'], ['Kohl', 'Ehre']])
+        result = german_ipa_column(words)
+        self.assertEqual(result.dtype.kind, 'U')
+        self.assertEqual(result.tolist(), [['myller', 'kol'],
+                                           ['kol', 'ere']])
+
+        self.assertRaises(TypeError, german_ipa_column,
+                          numpy.array([b'Kohl', b'Ehre']))
+        self.assertEqual(german_ipa_column(numpy.char.decode(
+            numpy.array([b'Kohl', b'Ehre']))).tolist(), ['kol', 'ere'])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_german_ipa_column_numpy_blocks(self):
+        """Test narmer.phonetic.german_ipa_column with several blocks."""
+        block = narmer.phonetic._COLUMN_BLOCK
+        narmer.phonetic._COLUMN_BLOCK = 4
+        try:
+            words = numpy.array(self.words * 3, dtype=object).reshape(3, 6)
+            result = german_ipa_column(words)
+            self.assertEqual(result.shape, (3, 6))
+            self.assertEqual(result.tolist(), [self.ipas] * 3)
+            # a non-contiguous view
+            result = german_ipa_column(words.T)
+            self.assertEqual(result.tolist(),
+                             [[ipa] * 3 for ipa in self.ipas])
+        finally:
+            narmer.phonetic._COLUMN_BLOCK = block
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_german_ipa_column_pandas(self):
+        """Test narmer.phonetic.german_ipa_column with pandas objects."""
+        series = pandas.Series(self.words, index=list('abcdef'), name='name',
+                               dtype=object)
+        result = german_ipa_column(series)
+        self.assertIsInstance(result, pandas.Series)
+        self.assertEqual(list(result.index), list('abcdef'))
+        self.assertEqual(result.name, 'name')
+        self.assertEqual(result.tolist(), self.ipas)
+
+        series = pandas.Series(self.words, dtype='string')
+        result = german_ipa_column(series)
+        self.assertEqual(result.dtype, series.dtype)
+        self.assertTrue(result.isna()[1])
+        self.assertEqual(result[0], 'myller')
+
+        result = german_ipa_column(pandas.Index(['Kohl', 'Ehre'], name='x'))
+        self.assertIsInstance(result, pandas.Index)
+        self.assertEqual(list(result), ['kol', 'ere'])
+
+        result = german_ipa_column(series.array)
+        self.assertEqual(result.dtype, series.dtype)
+        self.assertEqual(len(result), len(self.words))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_german_ipa_column_arrow(self):
+        """Test narmer.phonetic.german_ipa_column with pyarrow arrays."""
+        array = pyarrow.array(self.words, type=pyarrow.large_string())
+        result = german_ipa_column(array)
+        self.assertEqual(result.type, pyarrow.large_string())
+        self.assertEqual(result.to_pylist(), self.ipas)
+
+        chunked = pyarrow.chunked_array([self.words[:3], self.words[3:]])
+        result = german_ipa_column(chunked)
+        self.assertIsInstance(result, pyarrow.ChunkedArray)
+        self.assertEqual(result.to_pylist(), self.ipas)
+
+        result = german_ipa_column(array.dictionary_encode())
+        self.assertEqual(result.to_pylist(), self.ipas)
+
+
+class GermanIPATextTestCases(unittest.TestCase):
+    """Test narmer.phonetic.german_ipa_tokens & german_ipa_text."""
+
+    text = ("Im Jahre 1848 schrieb der Müller: „Qu'ran\u2019s Löwenbräu ist "
+            'nicht Küh-Bach!“\n\tEnde.')
+
+    def test_german_ipa_tokens(self):
+        """Test narmer.phonetic.german_ipa_tokens."""
+        tokens = list(german_ipa_tokens(self.text))
+        self.assertEqual(''.join(token.text for token in tokens), self.text)
+        for token in tokens:
+            self.assertEqual(self.text[token.start:token.end], token.text)
+            if token.ipa is not None:
+                self.assertEqual(token.ipa, german_ipa(token.text))
+
+        words = [token.text for token in
+                 german_ipa_tokens(self.text, words_only=True)]
+        self.assertEqual(words, ['Im', 'Jahre', 'schrieb', 'der', 'Müller',
+                                 "Qu'ran\u2019s", 'Löwenbräu', 'ist',
+                                 'nicht', 'Küh', 'Bach', 'Ende'])
+        self.assertEqual(list(german_ipa_tokens('')), [])
+        self.assertEqual(list(german_ipa_tokens(iter([]))), [])
+        self.assertRaises(ValueError, german_ipa_tokens, self.text, 'ahg')
+
+    def test_german_ipa_tokens_chunked(self):
+        """Test narmer.phonetic.german_ipa_tokens with chunked input."""
+        expected = list(german_ipa_tokens(self.text, 'mhg'))
+        rng = random.Random(0)
+        for _ in range(50):
+            cuts = sorted(rng.sample(range(1, len(self.text)), 8))
+            chunks = [self.text[start:end] for start, end in
+                      zip([0] + cuts, cuts + [len(self.text)])]
+            self.assertEqual(list(german_ipa_tokens(iter(chunks), 'mhg')),
+                             expected)
+        chars = list(german_ipa_tokens(iter(self.text), 'mhg'))
+        self.assertEqual(chars, expected)
+
+    def test_german_ipa_tokens_decomposed(self):
+        """Test narmer.phonetic.german_ipa_tokens with decomposed input."""
+        text = unicodedata.normalize('NFD', self.text)
+        self.assertNotEqual(text, self.text)
+        tokens = list(german_ipa_tokens(text, 'mhg'))
+        self.assertEqual([token.ipa for token in tokens],
+                         [token.ipa for token in
+                          german_ipa_tokens(self.text, 'mhg')])
+        self.assertEqual([(token.text, token.ipa) for token in
+                          german_ipa_tokens('Mu\u0308ller sagt',
+                                            words_only=True)],
+                         [('Mu\u0308ller', german_ipa('Mu\u0308ller')),
+                          ('sagt', 'zagt')])
+
+        # chunks may end between a letter & its combining marks
+        for cut in range(1, len(text)):
+            self.assertEqual(list(german_ipa_tokens(
+                iter([text[:cut], text[cut:]]), 'mhg')), tokens)
+        self.assertEqual(list(german_ipa_tokens(iter(text), 'mhg')), tokens)
+
+    def test_german_ipa_text(self):
+        """Test narmer.phonetic.german_ipa_text."""
+        self.assertEqual(german_ipa_text(''), '')
+        self.assertEqual(german_ipa_text('Küh-Bach, 2 Mal'),
+                         'ky-bax, 2 mal')
+
+
+class IncrementalTranscriberTestCases(unittest.TestCase):
+    """Test narmer.phonetic.IncrementalTranscriber."""
+
+    def test_incremental_transcriber(self):
+        """Test narmer.phonetic.IncrementalTranscriber."""
+        rng = random.Random(0)
+        words = ['', 'Tschechien', 'Nietzsche', 'exponentiell', 'Spitze',
+                 'Schifffahrt', "Qu'ran", 'Mu\u0308ller', 'Hûs', 'sehen',
+                 'Straße', 'Bachen']
+        for period in ('nhg', 'enhg', 'mhg', 'ohg'):
+            transcriber = IncrementalTranscriber(period)
+            for word in words:
+                ipa = ''
+                pos = 0
+                while pos < len(word):
+                    size = rng.randint(1, 3)
+                    ipa += transcriber.feed(word[pos:pos + size])
+                    pos += size
+                self.assertEqual(ipa + transcriber.peek(),
+                                 german_ipa(word, period))
+                self.assertEqual(ipa + transcriber.flush(),
+                                 german_ipa(word, period))
+
+    def test_incremental_transcriber_window(self):
+        """Test narmer.phonetic.IncrementalTranscriber state bounds."""
+        transcriber = IncrementalTranscriber('MHG')
+        self.assertEqual(transcriber.period, 'mhg')
+        ipa = ''.join(transcriber.feed('schal') for _ in range(1000))
+        # only the lookahead window is retained
+        self.assertLess(len(transcriber.peek()), 10)
+        self.assertEqual(ipa + transcriber.flush(),
+                         german_ipa('schal' * 1000, 'mhg'))
+
+        transcriber.feed('Schiller')
+        transcriber.reset()
+        self.assertEqual(transcriber.feed('ab') + transcriber.flush(), 'ab')
+        self.assertRaises(ValueError, IncrementalTranscriber, 'ahg')
+
+
+class GermanIPAPeriodsTestCases(unittest.TestCase):
+    """Test narmer.phonetic.german_ipa_periods & german_ipa_periods_many."""
+
+    words = ['', 'Müller', 'Sêle', 'Squâle', 'Quälen', 'Süß', 'sehen',
+             'Tschechien', 'Hûs', 'Sy']
+
+    def test_german_ipa_periods(self):
+        """Test narmer.phonetic.german_ipa_periods."""
+        for word in self.words:
+            ipas = german_ipa_periods(word)
+            self.assertEqual(list(ipas), ['nhg', 'enhg', 'mhg', 'ohg'])
+            for period, ipa in ipas.items():
+                self.assertEqual(ipa, german_ipa(word, period))
+
+            ipas = german_ipa_periods(word, ['OHG', 'mhg'])
+            self.assertEqual(list(ipas), ['ohg', 'mhg'])
+            self.assertEqual(ipas['ohg'], german_ipa(word, 'ohg'))
+            self.assertEqual(ipas['mhg'], german_ipa(word, 'mhg'))
+
+        self.assertEqual(german_ipa_periods('Sy', ['nhg', 'ohg']),
+                         {'nhg': 'zy', 'ohg': 'sy'})
+        self.assertEqual(german_ipa_periods('Kohl', []), {})
+        self.assertRaises(ValueError, german_ipa_periods, 'Kohl', ['ahg'])
+
+    def test_german_ipa_periods_many(self):
+        """Test narmer.phonetic.german_ipa_periods_many."""
+        words = self.words + self.words[::-1]
+        results = german_ipa_periods_many(iter(words), ('enhg', 'ohg'))
+        self.assertEqual(results, [german_ipa_periods(word, ('enhg', 'ohg'))
+                                   for word in words])
+        # results for repeated words are independent objects
+        self.assertIsNot(results[0], results[-1])
+        self.assertEqual(german_ipa_periods_many([]), [])
+
+
+class RuleProfileTestCases(unittest.TestCase):
+    """Test narmer.phonetic.RuleProfile."""
+
+    words = ['', 'Müller', 'Tschechien', 'Quälen', 'Hûs', 'Straße', '3x',
+             'Sêle', 'Nietzsche']
+
+    def test_rule_profile(self):
+        """Test narmer.phonetic.RuleProfile."""
+        for period in ('nhg', 'enhg', 'mhg', 'ohg'):
+            expected = [german_ipa(word, period) for word in self.words]
+            with RuleProfile(timing=True) as profile:
+                self.assertEqual([german_ipa(word, period)
+                                  for word in self.words], expected)
+            totals = profile.period_totals()
+            self.assertEqual(list(totals), [period])
+            stats = profile.stats(period)
+            # every normalized character is consumed by exactly one rule
+            self.assertEqual(sum(rule.chars for rule in stats),
+                             totals[period]['chars'])
+            self.assertEqual(totals[period]['calls'], len(self.words))
+            self.assertGreater(totals[period]['time'], 0)
+            self.assertTrue(all(rule.time >= 0 for rule in stats))
+            self.assertEqual(stats, sorted(stats, key=lambda rule: (
+                -rule.firings, -rule.chars)))
+            # the digit matches no rule
+            self.assertIn(('3', None), [(rule.graphemes, rule.ipa)
+                                        for rule in stats])
+            self.assertIn(period + ':', profile.report(5))
+
+        # once stopped, nothing more is collected
+        count = len(profile.stats())
+        nhg_ipa('Zwölf')
+        self.assertEqual(len(profile.stats()), count)
+        profile.clear()
+        self.assertEqual(profile.stats(), [])
+        self.assertEqual(profile.as_dict(), {})
+
+    def test_rule_profile_counts(self):
+        """Test narmer.phonetic.RuleProfile counts."""
+        profile = RuleProfile()
+        profile.start()
+        self.assertRaises(RuntimeError, profile.start)
+        try:
+            nhg_ipa('Schach')
+            nhg_ipa('Schule')
+            transcriber = IncrementalTranscriber()
+            transcriber.feed('Schal')
+            transcriber.flush()
+        finally:
+            profile.stop()
+        profile.stop()
+        counts = {(rule.graphemes, rule.ipa): (rule.firings, rule.chars)
+                  for rule in profile.stats('NHG')}
+        self.assertEqual(counts[('SCH', 'ʃ')], (3, 9))
+        self.assertEqual(counts[('CH', 'x')], (1, 2))
+        self.assertEqual(profile.stats('mhg'), [])
+
+        result = profile.as_dict()
+        self.assertEqual(list(result), ['nhg'])
+        self.assertEqual(result['nhg']['time'], 0.0)
+        rule = result['nhg']['rules'][0]
+        self.assertEqual(sorted(rule), ['chars', 'firings', 'graphemes',
+                                        'ipa', 'left', 'right', 'time'])
+        self.assertIsInstance(rule['right'], list)
+
+    def test_rule_profile_nesting(self):
+        """Test narmer.phonetic.RuleProfile stopped out of order."""
+        engine = narmer.phonetic._transcribe_span
+        first, second = RuleProfile(), RuleProfile()
+        first.start()
+        second.start()
+        nhg_ipa('Schach')
+        first.stop()
+        nhg_ipa('Schule')
+        second.stop()
+        self.assertIs(narmer.phonetic._transcribe_span, engine)
+        nhg_ipa('Schal')
+        self.assertEqual(first.stats(), [])
+        self.assertEqual(second.period_totals()['nhg']['calls'], 2)
+
+        first.start()
+        second.start()
+        second.stop()
+        nhg_ipa('Schach')
+        first.stop()
+        self.assertIs(narmer.phonetic._transcribe_span, engine)
+        self.assertEqual(first.period_totals()['nhg']['calls'], 1)
+
+    def test_rule_profile_lazy(self):
+        """Test that creating a RuleProfile compiles no rule tables."""
+        tables = dict(narmer.phonetic._TABLES)
+        narmer.phonetic._TABLES.clear()
+        try:
+            profile = RuleProfile()
+            self.assertEqual(len(narmer.phonetic._TABLES), 0)
+            with profile:
+                mhg_ipa('Hûs')
+            self.assertEqual(list(narmer.phonetic._TABLES), ['mhg'])
+            self.assertEqual(list(profile.period_totals()), ['mhg'])
+        finally:
+            narmer.phonetic._TABLES.clear()
+            narmer.phonetic._TABLES.update(tables)
+
+
+class RuleArtifactTestCases(unittest.TestCase):
+    """Test narmer.phonetic.build_rule_artifact & the loading of artifacts."""
+
+    def setUp(self):
+        """Point the module at an artifact in a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'rules.bin')
+        self.artifact = narmer.phonetic._RULES_ARTIFACT
+        self.tables = dict(narmer.phonetic._TABLES)
+        narmer.phonetic._RULES_ARTIFACT = self.path
+        narmer.phonetic._TABLES.clear()
+
+    def tearDown(self):
+        """Restore the module's artifact & tables."""
+        narmer.phonetic._RULES_ARTIFACT = self.artifact
+        narmer.phonetic._RULE_ARTIFACTS.clear()
+        narmer.phonetic._TABLES.clear()
+        narmer.phonetic._TABLES.update(self.tables)
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, tables, header=None):
+        """Write an artifact of the given tables, which is not stamped.
+
+        :param dict tables: period: (digest, compiled table)
+        :param bytes header: the header (by default, the current one)
+        """
+        with io.open(self.path, 'wb') as artifact:
+            artifact.write((header or narmer.phonetic._artifact_header()) +
+                           marshal.dumps((None, {
+                               period: (digest, marshal.dumps(table))
+                               for period, (digest, table) in
+                               tables.items()})))
+
+    def test_build_rule_artifact(self):
+        """Test narmer.phonetic.build_rule_artifact."""
+        self.assertEqual(build_rule_artifact(self.path), self.path)
+        tables = narmer.phonetic._read_rule_artifact(self.path)
+        self.assertEqual(sorted(tables), ['enhg', 'mhg', 'nhg', 'ohg'])
+        for period, (rules, _) in narmer.phonetic._PERIOD_RULES.items():
+            # the source is unchanged, so its digests are not checked
+            self.assertIsNone(tables[period][0])
+            self.assertEqual(narmer.phonetic._load_compiled(period, tables),
+                             narmer.phonetic._compile_rules(rules))
+        self.assertEqual(german_ipa('Hûs', 'mhg'), 'xuːs')
+        self.assertIn(self.path, narmer.phonetic._RULE_ARTIFACTS)
+
+    def test_stale_artifacts(self):
+        """Test that stale or invalid rule artifacts are ignored."""
+        rules = narmer.phonetic._PERIOD_RULES['nhg'][0]
+        digest = narmer.phonetic._rules_digest(rules)
+        loaded = ({'K': 'x'}, {}, 1)
+
+        # a table whose rules' digest matches is loaded, as is
+        self._write({'nhg': (digest, loaded)})
+        self.assertEqual(narmer.phonetic._TABLES['nhg'][0], loaded)
+        self.assertEqual(nhg_ipa('Kohl'), 'x')
+
+        # one whose rules have changed is compiled instead
+        narmer.phonetic._RULE_ARTIFACTS.clear()
+        narmer.phonetic._TABLES.clear()
+        self._write({'nhg': (digest ^ 1, loaded)})
+        self.assertEqual(nhg_ipa('Kohl'), 'kol')
+
+        # as are the tables of other engine versions, missing periods,
+        # damaged artifacts, and missing artifacts
+        self._write({'nhg': (digest, loaded)},
+                    narmer.phonetic._artifact_header()[:7] + b'\xff' * 5)
+        self.assertEqual(narmer.phonetic._read_rule_artifact(self.path), {})
+        self._write({'mhg': (digest, loaded)})
+        self.assertIsNone(narmer.phonetic._load_compiled(
+            'nhg', narmer.phonetic._read_rule_artifact(self.path)))
+        with io.open(self.path, 'wb') as artifact:
+            artifact.write(narmer.phonetic._artifact_header() + b'\x00')
+        self.assertEqual(narmer.phonetic._read_rule_artifact(self.path), {})
+        os.remove(self.path)
+        self.assertEqual(narmer.phonetic._read_rule_artifact(self.path), {})
+
+        # loading can be disabled
+        narmer.phonetic._RULES_ARTIFACT = None
+        narmer.phonetic._TABLES.clear()
+        self.assertEqual(nhg_ipa('Kohl'), 'kol')
+
+
+class PhonemeEncodingTestCases(unittest.TestCase):
+    """Test narmer.phonetic.ipa_encode & ipa_decode."""
+
+    words = ['Müller', 'Schmidt', 'Tschechien', 'Löwenbräu', 'Hûs', '',
+             'Dschungel', 'Pfeife', 'Zwieback', 'Ävoue', 'Kaiser', 'Bahia',
+             'Qualle', 'Nation', 'Haus', 'Tiuwel', 'Mære', 'Ēre']
+
+    def test_inventory(self):
+        """Test narmer.phonetic.phoneme_inventory."""
+        for period in ('nhg', 'enhg', 'mhg', 'ohg'):
+            inventory = phoneme_inventory(period)
+            self.assertEqual(len(set(inventory)), len(inventory))
+            self.assertLess(len(inventory), 256)
+            # every phoneme of every transcription, including those formed
+            # across rule boundaries, must be in the inventory
+            outputs = sorted({
+                rule[3] for rule in narmer.phonetic._PERIOD_RULES[period][0]})
+            found = set()
+            for rules in itertools.product(outputs, repeat=3):
+                found.update(ipa_phonemes(''.join(rules)))
+            self.assertEqual(found, set(inventory))
+        self.assertIs(phoneme_inventory('NHG'), phoneme_inventory('ohg'))
+        self.assertRaises(ValueError, phoneme_inventory, 'ahg')
+
+    def test_encode_decode(self):
+        """Test narmer.phonetic.ipa_encode & ipa_decode."""
+        for period in ('nhg', 'enhg', 'mhg', 'ohg'):
+            for word in self.words:
+                ipa = german_ipa(word, period)
+                codes = ipa_encode(ipa, period)
+                self.assertIsInstance(codes, bytes)
+                self.assertEqual(len(codes), len(ipa_phonemes(ipa)))
+                self.assertEqual(ipa_decode(codes, period), ipa)
+                self.assertEqual(german_ipa(word, period, encoded=True),
+                                 codes)
+
+        codes = ipa_encode('tʃeçin')
+        self.assertEqual(ipa_decode(bytearray(codes)), 'tʃeçin')
+        self.assertEqual(ipa_decode(list(codes)), 'tʃeçin')
+        self.assertEqual(ipa_encode(''), b'')
+        self.assertEqual(ipa_decode(b''), '')
+
+        self.assertRaises(ValueError, ipa_encode, 'xuːs')
+        self.assertRaises(ValueError, ipa_encode, 'kol', 'ahg')
+        self.assertRaises(ValueError, ipa_decode, b'\x25')
+        self.assertEqual(ipa_decode(b'\x25', 'mhg'), 'yː')
+
+    def test_german_ipa_many_encoded(self):
+        """Test narmer.phonetic.german_ipa_many with encoded output."""
+        expected = [ipa_encode(german_ipa(word, 'mhg'), 'mhg')
+                    for word in self.words]
+        self.assertEqual(german_ipa_many(self.words, 'MHG', encoded=True),
+                         expected)
+        self.assertEqual(german_ipa_many(self.words, 'mhg', processes=2,
+                                         chunksize=5, encoded=True),
+                         expected)
+
+
 if __name__ == '__main__':
     unittest.main()
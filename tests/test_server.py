@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_server.
+
+This module contains unit tests for narmer.server
+"""
+
+from __future__ import unicode_literals
+
+import sys
+import unittest
+
+# narmer.server, and so its tests, use syntax of Python 3.7
+if sys.version_info >= (3, 7):
+    from .server_cases import TranscriptionServerTestCases
+
+    __all__ = ['TranscriptionServerTestCases']
+
+
+if __name__ == '__main__':
+    unittest.main()
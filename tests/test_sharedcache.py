@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 by Christopher C. Little.
+# This file is part of Narmer.
+#
+# Narmer is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Narmer is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Narmer. If not, see <http://www.gnu.org/licenses/>.
+
+"""narmer.tests.test_sharedcache.
+
+This module contains unit tests for narmer.sharedcache
+"""
+
+from __future__ import unicode_literals
+
+import multiprocessing
+import pickle
+import unittest
+
+from narmer.phonetic import disable_cache, enable_cache, german_ipa
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
+else:
+    from narmer.sharedcache import SharedIPACache
+
+
+def _fill(name, words):
+    """Transcribe words with a shared cache, as another process.
+
+    :param str name: the name of the cache
+    :param list words: the words to transcribe
+    """
+    cache = SharedIPACache(name)
+    enable_cache(cache=cache)
+    for word in words:
+        german_ipa(word, 'mhg')
+    disable_cache()
+    cache.close()
+
+
+@unittest.skipIf(shared_memory is None,
+                 'multiprocessing.shared_memory is not available')
+class SharedIPACacheTestCases(unittest.TestCase):
+    """Test narmer.sharedcache.SharedIPACache."""
+
+    words = ['Müller', 'Schmidt', 'Zimmer', 'Ärger', 'Hûs']
+
+    def setUp(self):
+        """Create a cache."""
+        self.cache = SharedIPACache(maxsize=64)
+
+    def tearDown(self):
+        """Destroy the cache."""
+        disable_cache()
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_get_put(self):
+        """Test narmer.sharedcache.SharedIPACache.get & put."""
+        cache = self.cache
+        self.assertEqual(cache.maxsize, 64)
+        self.assertIsNone(cache.get('nhg', 'Müller'))
+        cache.put('nhg', 'Müller', 'myller')
+        cache.put('mhg', 'Müller', 'mylːer')
+        cache.put('nhg', '', '')
+        self.assertEqual(cache.get('nhg', 'Müller'), 'myller')
+        self.assertEqual(cache.get('mhg', 'Müller'), 'mylːer')
+        self.assertEqual(cache.get('nhg', ''), '')
+        cache.put('nhg', 'Müller', 'mʏlɐ')
+        self.assertEqual(cache.get('nhg', 'Müller'), 'mʏlɐ')
+        self.assertEqual(cache.info(), (4, 1, 0, 64, 3))
+
+        # too large for a slot
+        cache.put('nhg', 'x' * 100, 'x' * 100)
+        self.assertIsNone(cache.get('nhg', 'x' * 100))
+        self.assertEqual(len(cache), 3)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get('nhg', 'Müller'))
+        self.assertEqual(cache.info(), (0, 1, 0, 64, 0))
+
+        self.assertRaises(ValueError, SharedIPACache, maxsize=0)
+        self.assertRaises(ValueError, SharedIPACache, slot_size=16)
+
+    def test_eviction(self):
+        """Test narmer.sharedcache.SharedIPACache eviction."""
+        with SharedIPACache(maxsize=3, ways=4) as cache:
+            self.assertEqual(cache.maxsize, 4)
+            for word in self.words[:4]:
+                cache.put('nhg', word, german_ipa(word))
+            # mark Müller as recently used, so Schmidt is evicted
+            self.assertEqual(cache.get('nhg', 'Müller'), 'myller')
+            cache.put('nhg', 'Hûs', 'hus')
+            self.assertEqual(cache.evictions, 1)
+            self.assertEqual(len(cache), 4)
+            self.assertIsNone(cache.get('nhg', 'Schmidt'))
+            for word in ('Müller', 'Zimmer', 'Ärger', 'Hûs'):
+                self.assertIsNotNone(cache.get('nhg', word))
+
+    def test_torn_entry(self):
+        """Test narmer.sharedcache.SharedIPACache with torn entries."""
+        cache = self.cache
+        cache.put('nhg', 'Müller', 'myller')
+        words = cache._words
+        slot = next(slot for slot in range(16, len(words), 32)
+                    if words[slot + 4])
+        # a writer in progress
+        words[slot] |= 1
+        self.assertIsNone(cache.get('nhg', 'Müller'))
+        words[slot] += 1
+        self.assertEqual(cache.get('nhg', 'Müller'), 'myller')
+        # a torn value
+        cache._buf[4 * slot + 24 + 11] ^= 0xFF
+        self.assertIsNone(cache.get('nhg', 'Müller'))
+
+    def test_shared(self):
+        """Test narmer.sharedcache.SharedIPACache across processes."""
+        context = multiprocessing.get_context('spawn')
+        process = context.Process(target=_fill,
+                                  args=(self.cache.name, self.words))
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        for word in self.words:
+            self.assertEqual(self.cache.get('mhg', word),
+                             german_ipa(word, 'mhg'))
+
+        enable_cache(cache=self.cache)
+        self.assertEqual(german_ipa('Hûs', 'mhg'), 'xuːs')
+        self.assertEqual(self.cache.info().hits, len(self.words) + 1)
+
+        other = pickle.loads(pickle.dumps(self.cache))
+        try:
+            self.assertEqual(other.name, self.cache.name)
+            self.assertEqual(other.get('mhg', 'Hûs'), 'xuːs')
+        finally:
+            other.close()
+
+    def test_bad_cache(self):
+        """Test narmer.sharedcache.SharedIPACache with a non-cache block."""
+        block = shared_memory.SharedMemory(create=True, size=1024)
+        try:
+            self.assertRaises(ValueError, SharedIPACache, block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
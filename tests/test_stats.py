@@ -21,12 +21,25 @@
 This module contains unit tests for narmer.stats
 """
 
-from __future__ import unicode_literals
+from __future__ import division, unicode_literals
 
+import io
 import math
+import os
+import random
+import shutil
+import tempfile
 import unittest
+import zlib
 
-from narmer.stats import weissman
+from narmer.stats import COMPRESSORS, QuantileSketch, RunningStats, \
+    compression_benchmark, compression_table, one_shot, weissman, \
+    weissman_bootstrap
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
 
 class WeissmanTestCases(unittest.TestCase):
@@ -50,6 +63,304 @@ class WeissmanTestCases(unittest.TestCase):
         self.assertAlmostEqual(weissman(2.53, 57.06, 1.23, 23),
                                1.5947740798552632)
 
+    @unittest.skipIf(numpy is None, 'requires numpy')
+    def test_weissman_array(self):
+        """Test narmer.stats.weissman with arrays."""
+        rng = random.Random(0)
+        times = [1, 5, math.e, 0.5, 23, 57.06]
+        args = [(rng.choice((1, 1.23, 2.53, rng.uniform(0.1, 10))),
+                 rng.choice(times + [rng.uniform(0.01, 100)]),
+                 rng.choice((1, 1.23, 2.53)),
+                 rng.choice(times),
+                 rng.choice((1, 2, 0.5)))
+                for _ in range(2000)]
+        scores = weissman(*zip(*args))
+        self.assertIsInstance(scores, numpy.ndarray)
+        self.assertEqual(scores.tolist(), [weissman(*arg) for arg in args])
+
+        # broadcasting
+        scores = weissman(numpy.array([[1.2], [2.4]]), [1, 1.6, 5], 4.8, 5)
+        self.assertEqual(scores.shape, (2, 3))
+        self.assertEqual(scores.tolist(),
+                         [[weissman(r_tar, t_tar, 4.8, 5)
+                           for t_tar in (1, 1.6, 5)]
+                          for r_tar in (1.2, 2.4)])
+        self.assertEqual(weissman(1, [1], 1, 1, 2).tolist(), [2.0])
+        self.assertEqual(weissman([], [], 1, 1).tolist(), [])
+
+        with self.assertRaises(ValueError) as context:
+            weissman([1, 1, 1, 1], [1, 0, 1, -2], 1, 1)
+        self.assertIn('times', str(context.exception))
+        self.assertIn('indices: 1, 3', str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            weissman([[1, 1], [1, 0]], 1, 1, 1)
+        self.assertIn('ratios', str(context.exception))
+        self.assertIn('(1, 1)', str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            weissman(1, 1, [0] * 12, 1)
+        self.assertIn('9, ...', str(context.exception))
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class WeissmanBootstrapTestCases(unittest.TestCase):
+    """Test narmer.stats.weissman_bootstrap."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate measurements of repeated runs."""
+        rng = random.Random(0)
+        cls.t_tar = [rng.gauss(30, 3) for _ in range(50)]
+        cls.r_tar = [rng.gauss(2, 0.05) for _ in range(50)]
+        cls.t_src = [rng.gauss(60, 5) for _ in range(80)]
+
+    def test_weissman_bootstrap(self):
+        """Test narmer.stats.weissman_bootstrap."""
+        interval = weissman_bootstrap(self.r_tar, self.t_tar, 1.5,
+                                      self.t_src, resamples=2500)
+        self.assertEqual(interval.score, weissman(
+            float(numpy.mean(self.r_tar)), float(numpy.mean(self.t_tar)),
+            1.5, float(numpy.mean(self.t_src))))
+        self.assertLess(interval.low, interval.score)
+        self.assertLess(interval.score, interval.high)
+        self.assertEqual((interval.confidence, interval.resamples),
+                         (0.95, 2500))
+
+        # results depend on the seed, but not on the number of processes
+        self.assertEqual(weissman_bootstrap(self.r_tar, self.t_tar, 1.5,
+                                            self.t_src, resamples=2500,
+                                            processes=2), interval)
+        self.assertNotEqual(weissman_bootstrap(self.r_tar, self.t_tar, 1.5,
+                                               self.t_src, resamples=2500,
+                                               seed=1), interval)
+
+        narrow = weissman_bootstrap(self.r_tar, self.t_tar, 1.5, self.t_src,
+                                    resamples=2500, confidence=0.5,
+                                    estimator='median', alpha=2)
+        self.assertLess(narrow.high - narrow.low,
+                        interval.high - interval.low)
+        self.assertEqual(narrow.score, weissman(
+            float(numpy.median(self.r_tar)), float(numpy.median(self.t_tar)),
+            1.5, float(numpy.median(self.t_src)), 2))
+
+        constant = weissman_bootstrap(2, [5, 5], 1, 10, resamples=10,
+                                      estimator='min')
+        self.assertEqual(constant, (weissman(2, 5, 1, 10),
+                                    weissman(2, 5, 1, 10),
+                                    weissman(2, 5, 1, 10), 0.95, 10))
+
+    def test_weissman_bootstrap_errors(self):
+        """Test narmer.stats.weissman_bootstrap with invalid arguments."""
+        self.assertRaises(ValueError, weissman_bootstrap, 1, [1, 0], 1, 1)
+        self.assertRaises(ValueError, weissman_bootstrap, 1, 1, [1, -1], 1)
+        self.assertRaises(ValueError, weissman_bootstrap, [1, 2], [1, 2, 3],
+                          1, 1)
+        self.assertRaises(ValueError, weissman_bootstrap, 1, [], 1, 1)
+        self.assertRaises(ValueError, weissman_bootstrap, 1, [[1]], 1, 1)
+        self.assertRaises(ValueError, weissman_bootstrap, 1, 1, 1, 1,
+                          estimator='max')
+        self.assertRaises(ValueError, weissman_bootstrap, 1, 1, 1, 1,
+                          confidence=1)
+        self.assertRaises(ValueError, weissman_bootstrap, 1, 1, 1, 1,
+                          resamples=0)
+
+
+class CompressionBenchmarkTestCases(unittest.TestCase):
+    """Test narmer.stats.compression_benchmark."""
+
+    corpus = b''.join(b'Zeile %d: Tschechien, M\xc3\xbcller\n' % line
+                      for line in range(5000))
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmpdir)
+
+    def test_compression_benchmark(self):
+        """Test narmer.stats.compression_benchmark."""
+        results = compression_benchmark(self.corpus, repeats=2, warmup=0)
+        self.assertEqual([result.codec for result in results],
+                         list(COMPRESSORS))
+        self.assertEqual(results[0].weissman, 1.0)
+        for result, factory in zip(results, COMPRESSORS.values()):
+            compressor = factory()
+            expected = len(compressor.compress(self.corpus) +
+                           compressor.flush())
+            self.assertEqual(result.size, len(self.corpus))
+            self.assertEqual(result.compressed_size, expected)
+            self.assertEqual(result.ratio, len(self.corpus) / expected)
+            self.assertEqual(len(result.times), 2)
+            self.assertEqual(result.time, min(result.times))
+            self.assertEqual(result.weissman, weissman(
+                result.ratio, max(result.time * 1e6, 1), results[0].ratio,
+                max(results[0].time * 1e6, 1)))
+
+        table = compression_table(results)
+        self.assertEqual(len(table.splitlines()), len(results) + 1)
+        self.assertIn('zlib', table)
+
+    def test_compression_benchmark_corpora(self):
+        """Test narmer.stats.compression_benchmark on corpus sources."""
+        path = os.path.join(self.tmpdir, 'corpus.txt')
+        with io.open(path, 'wb') as corpusfile:
+            corpusfile.write(self.corpus)
+        codecs = {'fast': lambda: zlib.compressobj(1),
+                  'oneshot': one_shot(zlib.compress)}
+        expected = compression_benchmark(self.corpus, codecs, 'oneshot',
+                                         repeats=1, chunk_size=4096)
+        chunks = [self.corpus[i:i + 1000]
+                  for i in range(0, len(self.corpus), 1000)]
+        with io.open(path, 'rb') as corpusfile:
+            corpusfile.read(10)
+            for corpus in (path, [path, path], iter(chunks), corpusfile):
+                results = compression_benchmark(corpus, codecs, 'oneshot',
+                                                repeats=1, clock='cpu',
+                                                chunk_size=4096)
+                sizes = [(result.codec, result.size, result.compressed_size)
+                         for result in results]
+                if isinstance(corpus, list):
+                    self.assertEqual([size[1] for size in sizes],
+                                     [2 * len(self.corpus)] * 2)
+                elif corpus is corpusfile:
+                    # a file object is read from its current position
+                    self.assertEqual([size[1] for size in sizes],
+                                     [len(self.corpus) - 10] * 2)
+                else:
+                    self.assertEqual(sizes, [
+                        (result.codec, result.size, result.compressed_size)
+                        for result in expected])
+        self.assertEqual(results[1].codec, 'oneshot')
+        self.assertEqual(results[1].weissman, 1.0)
+
+        self.assertRaises(ValueError, compression_benchmark, b'', ['zip'])
+        self.assertRaises(ValueError, compression_benchmark, b'', ['zlib'],
+                          'bz2')
+        self.assertRaises(ValueError, compression_benchmark, b'', ['zlib'],
+                          clock='gpu')
+        self.assertRaises(ValueError, compression_benchmark, b'', ['zlib'],
+                          repeats=0)
+        self.assertRaises(ValueError, compression_benchmark, b'', [])
+
+
+class RunningStatsTestCases(unittest.TestCase):
+    """Test narmer.stats.RunningStats & QuantileSketch."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate samples, mostly from a long-tailed distribution."""
+        rng = random.Random(0)
+        cls.samples = [rng.lognormvariate(-7, 1.5) for _ in range(20000)] + \
+            [0.0, 0, -3.5, -0.002, 1e6]
+
+    def _assert_within_accuracy(self, sketch, samples):
+        """Assert that sketch's quantiles are within its accuracy.
+
+        :param QuantileSketch sketch: a sketch of samples
+        :param list samples: the samples
+        """
+        ordered = sorted(samples)
+        quantiles = [0, 0.01, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1]
+        for q, estimate in zip(quantiles, sketch.quantiles(quantiles)):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertLessEqual(abs(estimate - exact),
+                                 sketch.relative_accuracy * abs(exact) +
+                                 1e-12)
+
+    def test_running_stats(self):
+        """Test narmer.stats.RunningStats."""
+        stats = RunningStats()
+        self.assertEqual(len(stats), 0)
+        self.assertTrue(math.isnan(stats.variance))
+        self.assertTrue(math.isnan(stats.pvariance))
+        stats.add(3)
+        self.assertEqual((stats.mean, stats.pvariance, stats.min, stats.max),
+                         (3, 0, 3, 3))
+        self.assertTrue(math.isnan(stats.variance))
+        self.assertNotIn('p50', stats.summary())
+
+        mean = math.fsum(self.samples) / len(self.samples)
+        variance = math.fsum((sample - mean) ** 2
+                             for sample in self.samples) / \
+            (len(self.samples) - 1)
+
+        one = RunningStats()
+        for sample in self.samples:
+            one.add(sample)
+        parts = [RunningStats(), RunningStats(), RunningStats()]
+        parts[0].update(self.samples[:7000])
+        parts[1].update(iter(self.samples[7000:7001]))
+        parts[1].update([])
+        for sample in self.samples[7001:]:
+            parts[2].add(sample)
+        merged = RunningStats()
+        for part in parts:
+            merged.merge(part)
+        for stats in (one, merged):
+            self.assertEqual(stats.count, len(self.samples))
+            self.assertAlmostEqual(stats.mean, mean, delta=1e-9 * mean)
+            self.assertAlmostEqual(stats.variance, variance,
+                                   delta=1e-9 * variance)
+            self.assertAlmostEqual(stats.stdev, math.sqrt(variance),
+                                   delta=1e-9 * variance)
+            self.assertEqual((stats.min, stats.max), (-3.5, 1e6))
+
+        with_sketch = RunningStats(0.01)
+        self.assertRaises(ValueError, with_sketch.merge, one)
+        self.assertRaises(ValueError, one.merge, with_sketch)
+        self.assertEqual(with_sketch.summary()['p99'], None)
+        with_sketch.update(self.samples)
+        summary = with_sketch.summary()
+        self.assertEqual(sorted(summary), ['count', 'max', 'mean', 'min',
+                                           'p50', 'p95', 'p99', 'stdev'])
+        self._assert_within_accuracy(with_sketch.sketch, self.samples)
+
+    def test_quantile_sketch(self):
+        """Test narmer.stats.QuantileSketch."""
+        self.assertRaises(ValueError, QuantileSketch, 0)
+        self.assertRaises(ValueError, QuantileSketch, 1)
+        sketch = QuantileSketch(0.02)
+        self.assertEqual(sketch.quantile(0.5), None)
+        self.assertRaises(ValueError, sketch.add, float('nan'))
+
+        for sample in self.samples:
+            sketch.add(sample)
+        self.assertEqual(len(sketch), len(self.samples))
+        self._assert_within_accuracy(sketch, self.samples)
+        self.assertRaises(ValueError, sketch.quantiles, [1.5])
+        self.assertEqual(sketch.quantile(0), sketch.quantiles([0])[0])
+
+        merged = QuantileSketch(0.02)
+        for start in range(0, len(self.samples), 6000):
+            part = QuantileSketch(0.02)
+            part.update(self.samples[start:start + 6000])
+            merged.merge(part)
+        quantiles = [0.1, 0.5, 0.9, 0.99]
+        self.assertEqual(merged.quantiles(quantiles),
+                         sketch.quantiles(quantiles))
+        self.assertRaises(ValueError, merged.merge, QuantileSketch(0.01))
+
+    @unittest.skipIf(numpy is None, 'requires numpy')
+    def test_numpy_batches(self):
+        """Test narmer.stats.RunningStats & QuantileSketch with numpy."""
+        stats = RunningStats(0.01)
+        array = numpy.array(self.samples)
+        stats.update(array[:10000])
+        stats.update(array[10000:].reshape(-1, 5))
+        stats.update(numpy.array([]))
+        expected = RunningStats(0.01)
+        expected.update(self.samples)
+        self.assertEqual(stats.count, expected.count)
+        self.assertAlmostEqual(stats.mean, expected.mean,
+                               delta=1e-9 * expected.mean)
+        self.assertAlmostEqual(stats.variance, expected.variance,
+                               delta=1e-9 * expected.variance)
+        self.assertEqual((stats.min, stats.max), (-3.5, 1e6))
+        self._assert_within_accuracy(stats.sketch, self.samples)
+        self.assertRaises(ValueError, stats.sketch.update,
+                          numpy.array([1, numpy.nan]))
+
 
 if __name__ == '__main__':
     unittest.main()